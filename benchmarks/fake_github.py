@@ -0,0 +1,244 @@
+import base64
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import GitHubFixtures
+
+
+class FakeGitHubAPI:
+    """
+    Представляет локальный HTTP-сервер, имитирующий нужную часть API GitHub:
+    /users/{user}/repos (с постраничной выдачей и заголовком Link),
+    /repos/{user}/{repo}/stats/contributors и POST /graphql (запрос списка репозиториев
+    GitHubParser.repos_query с курсорной пагинацией и полем rateLimit).
+
+    Умеет имитировать задержку сети, ответы 202 (статистика еще вычисляется)
+    и 403 при превышении вторичного лимита запросов (с заголовком Retry-After),
+    а также отвечает 304 на условные запросы.
+    """
+
+    def __init__(self, fixtures: GitHubFixtures, latency: float = 0.0, accepted_every: int = 0,
+                 accepted_retries: int = 1, rate_limit_every: int = 0, retry_after: float = 0.1) -> None:
+        """
+        Конструктор класса FakeGitHubAPI.
+
+        Args:
+            fixtures(GitHubFixtures): данные, которые отдает сервер
+            latency(float): задержка перед каждым ответом, секунд
+            accepted_every(int): каждый такой репозиторий сначала отвечает 202 (0 - никогда)
+            accepted_retries(int): сколько раз подряд такой репозиторий отвечает 202
+            rate_limit_every(int): каждый такой запрос статистики отвечает 403 вторичного лимита (0 - никогда)
+            retry_after(float): значение заголовка Retry-After ответа 403, секунд
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.accepted_every = accepted_every
+        self.accepted_retries = accepted_retries
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.counters = Counter()
+        self.__stats_calls = Counter()
+        self.__lock = threading.Lock()
+        #  Окно основного лимита одно на весь запуск, как у GitHub
+        self.__reset = int(time.time()) + 3600
+        self.__graphql_remaining = 5000
+        self.__server: ThreadingHTTPServer | None = None
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGitHubAPI":
+        """Запускает сервер на свободном порту в фоновом потоке."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                api._handle(self)
+
+            def do_POST(self) -> None:
+                api._handle_post(self)
+
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.__server.daemon_threads = True
+        self.__thread = threading.Thread(target=self.__server.serve_forever, name="fake-github", daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__thread.join()
+            self.__server = None
+
+    def __enter__(self) -> "FakeGitHubAPI":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> int:
+        with self.__lock:
+            self.counters[key] += 1
+            return self.counters[key]
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        """Разбирает путь запроса и отправляет ответ."""
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(request.path)
+        parts = url.path.strip("/").split("/")
+
+        if len(parts) == 3 and parts[0] == "users" and parts[2] == "repos":
+            self._count("listing")
+            self._listing(request, parts[1], parse_qs(url.query))
+        elif len(parts) == 5 and parts[0] == "repos" and parts[3:] == ["stats", "contributors"]:
+            self._stats(request, parts[1], parts[2])
+        else:
+            self._count("not_found")
+            self._send(request, 404, json.dumps({"message": "Not Found"}).encode())
+
+    def _handle_post(self, request: BaseHTTPRequestHandler) -> None:
+        """Отвечает на POST /graphql."""
+        if self.latency:
+            time.sleep(self.latency)
+        body = request.rfile.read(int(request.headers.get("Content-Length", 0)))
+        if urlparse(request.path).path != "/graphql":
+            self._count("not_found")
+            self._send(request, 404, json.dumps({"message": "Not Found"}).encode())
+            return
+        self._count("graphql")
+        self._graphql(request, json.loads(body).get("variables") or {})
+
+    def _graphql(self, request: BaseHTTPRequestHandler, variables: dict) -> None:
+        """
+        Отдает страницу репозиториев владельца в формате ответа GraphQL. Курсор - закодированное
+        смещение в списке; стоимость запроса - 1 балл.
+        """
+        username = variables.get("login")
+        first = min(int(variables.get("first") or 100), 100)
+        after = variables.get("after")
+        offset = int(base64.b64decode(after).decode().removeprefix("cursor:")) if after else 0
+
+        with self.__lock:
+            self.__graphql_remaining -= 1
+            remaining = self.__graphql_remaining
+        data = {"rateLimit": {"limit": 5000, "cost": 1, "remaining": remaining,
+                              "resetAt": datetime.fromtimestamp(self.__reset, timezone.utc)
+                              .strftime("%Y-%m-%dT%H:%M:%SZ")}}
+
+        if username not in self.fixtures.usernames:
+            data["repositoryOwner"] = None
+            errors = [{"type": "NOT_FOUND", "path": ["repositoryOwner"],
+                       "message": f"Could not resolve to a RepositoryOwner with the login of '{username}'."}]
+            self._send(request, 200, json.dumps({"data": data, "errors": errors}).encode())
+            return
+
+        repos = self.fixtures.listing(username)
+        chunk = repos[offset:offset + first]
+        end = offset + len(chunk)
+        nodes = []
+        for repo in chunk:
+            commits = self.fixtures.commits(username, repo["name"])
+            nodes.append({
+                "name": repo["name"],
+                "nameWithOwner": repo["full_name"],
+                "pushedAt": repo["pushed_at"],
+                "isFork": False,
+                "isArchived": False,
+                "isEmpty": commits == 0,
+                "defaultBranchRef": {"target": {"history": {"totalCount": commits}}} if commits else None,
+                "mentionableUsers": {"totalCount": self.fixtures.contributors if commits else 1},
+            })
+        data["repositoryOwner"] = {"repositories": {
+            "pageInfo": {"hasNextPage": end < len(repos),
+                         "endCursor": base64.b64encode(f"cursor:{end}".encode()).decode() if chunk else None},
+            "nodes": nodes,
+        }}
+        self._send(request, 200, json.dumps({"data": data}).encode())
+
+    def _listing(self, request: BaseHTTPRequestHandler, username: str, query: dict[str, list[str]]) -> None:
+        """Отдает страницу списка репозиториев с заголовком Link: rel="next" (404 - неизвестный пользователь)."""
+        if username not in self.fixtures.usernames:
+            self._send(request, 404, json.dumps({"message": "Not Found"}).encode())
+            return
+        page = int(query.get("page", ["1"])[0])
+        per_page = min(int(query.get("per_page", ["30"])[0]), 100)
+        repos = self.fixtures.listing(username)
+        chunk = repos[(page - 1) * per_page:page * per_page]
+
+        headers = {}
+        if page * per_page < len(repos):
+            next_url = f"{self.url}/users/{username}/repos?per_page={per_page}&page={page + 1}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        self._send(request, 200, json.dumps(chunk).encode(), headers)
+
+    def _stats(self, request: BaseHTTPRequestHandler, username: str, repo_name: str) -> None:
+        """Отдает статистику контрибьюторов, при необходимости имитируя 202 и 403."""
+        body = self.fixtures.body(username, repo_name)
+        if body is None:
+            self._count("not_found")
+            self._send(request, 404, json.dumps({"message": "Not Found"}).encode())
+            return
+
+        calls = self._count("stats")
+        with self.__lock:
+            self.__stats_calls[(username, repo_name)] += 1
+            repo_calls = self.__stats_calls[(username, repo_name)]
+
+        if self.rate_limit_every and calls % self.rate_limit_every == 0:
+            self._count("rate_limited")
+            message = "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."
+            self._send(request, 403, json.dumps({"message": message}).encode(),
+                       {"Retry-After": str(self.retry_after)})
+            return
+
+        repo_index = int(repo_name.removeprefix("repo") or 0)
+        if self.accepted_every and repo_index % self.accepted_every == 0 and repo_calls <= self.accepted_retries:
+            self._count("accepted")
+            self._send(request, 202, b"")
+            return
+
+        etag = f'"{username}-{repo_name}-{self.fixtures.seed}"'
+        if request.headers.get("If-None-Match") == etag:
+            self._count("not_modified")
+            self._send(request, 304, b"", {"ETag": etag})
+            return
+
+        self._count("ok")
+        self._send(request, 200, body, {"ETag": etag})
+
+    def _send(self, request: BaseHTTPRequestHandler, status: int, body: bytes,
+              headers: dict[str, str] | None = None) -> None:
+        """Отправляет ответ с заголовками лимита запросов, как у GitHub."""
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json; charset=utf-8")
+        request.send_header("X-RateLimit-Limit", "5000")
+        request.send_header("X-RateLimit-Remaining", "4999")
+        request.send_header("X-RateLimit-Reset", str(self.__reset))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        if status != 304:
+            request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        if status != 304:
+            request.wfile.write(body)
+            self._count_bytes(len(body))
+
+    def _count_bytes(self, size: int) -> None:
+        with self.__lock:
+            self.counters["bytes"] += size
@@ -0,0 +1,112 @@
+import json
+import random
+from typing import Any
+
+WEEK_SECONDS = 7 * 24 * 3600
+#  Воскресенье 2019-01-06 00:00 UTC: недели в /stats/contributors начинаются с воскресенья
+FIRST_WEEK = 1546732800
+
+
+class GitHubFixtures:
+    """
+    Представляет синтетический набор данных GitHub: N репозиториев на пользователя,
+    M контрибьюторов на репозиторий и W недель на контрибьютора.
+
+    Ответы сериализуются в JSON один раз при генерации, чтобы стоимость сериализации
+    не попадала в замеры клиента.
+    """
+
+    def __init__(self, users: int = 1, repos: int = 100, contributors: int = 5, weeks: int = 52,
+                 seed: int = 0, empty_every: int = 0) -> None:
+        """
+        Конструктор класса GitHubFixtures.
+
+        Args:
+            users(int): количество пользователей (user0, user1, ...)
+            repos(int): количество репозиториев у каждого пользователя
+            contributors(int): количество контрибьюторов в каждом репозитории
+            weeks(int): количество недель в ряду каждого контрибьютора
+            seed(int): зерно генератора случайных чисел (одинаковое зерно - одинаковые данные)
+            empty_every(int): каждый такой репозиторий пустой - без коммитов и контрибьюторов (0 - никогда)
+        """
+        self.users = users
+        self.repos = repos
+        self.contributors = contributors
+        self.weeks = weeks
+        self.seed = seed
+        self.empty_every = empty_every
+
+        rnd = random.Random(seed)
+        self.__listings: dict[str, list[dict[str, Any]]] = {}
+        self.__bodies: dict[tuple[str, str], bytes] = {}
+        self.__commits: dict[tuple[str, str], int] = {}
+        self.__rows = 0
+
+        for user_index in range(users):
+            username = f"user{user_index}"
+            listing = []
+            for repo_index in range(repos):
+                repo_name = f"repo{repo_index}"
+                listing.append({
+                    "name": repo_name,
+                    "full_name": f"{username}/{repo_name}",
+                    "pushed_at": f"2024-01-{repo_index % 28 + 1:02d}T00:00:00Z",
+                })
+                empty = empty_every and repo_index % empty_every == 0
+                payload = self._contributors(rnd, 0 if empty else contributors, weeks)
+                self.__bodies[(username, repo_name)] = json.dumps(payload).encode()
+                self.__commits[(username, repo_name)] = sum(item["total"] for item in payload)
+                self.__rows += len(payload)
+            self.__listings[username] = listing
+
+    @staticmethod
+    def _contributors(rnd: random.Random, contributors: int, weeks: int) -> list[dict[str, Any]]:
+        """Генерирует ответ /stats/contributors одного репозитория."""
+        payload = []
+        for index in range(contributors):
+            series = []
+            for week in range(weeks):
+                #  Примерно половина недель без активности - как у реальных репозиториев
+                active = rnd.random() < 0.5
+                series.append({
+                    "w": FIRST_WEEK + week * WEEK_SECONDS,
+                    "a": rnd.randint(1, 500) if active else 0,
+                    "d": rnd.randint(0, 200) if active else 0,
+                    "c": rnd.randint(1, 10) if active else 0,
+                })
+            payload.append({
+                "author": {"login": f"dev{index}"},
+                "total": sum(week["c"] for week in series),
+                "weeks": series,
+            })
+        return payload
+
+    @property
+    def usernames(self) -> list[str]:
+        return list(self.__listings)
+
+    def listing(self, username: str) -> list[dict[str, Any]]:
+        """Возвращает список репозиториев пользователя (как в ответе /users/{user}/repos)."""
+        return self.__listings.get(username, [])
+
+    def body(self, username: str, repo_name: str) -> bytes | None:
+        """Возвращает сериализованный ответ /stats/contributors репозитория или None."""
+        return self.__bodies.get((username, repo_name))
+
+    def payload(self, username: str, repo_name: str) -> list[dict[str, Any]]:
+        """Возвращает разобранный ответ /stats/contributors репозитория."""
+        return json.loads(self.__bodies[(username, repo_name)])
+
+    def commits(self, username: str, repo_name: str) -> int:
+        """Возвращает количество коммитов репозитория (для метаданных GraphQL)."""
+        return self.__commits.get((username, repo_name), 0)
+
+    @property
+    def rows(self) -> int:
+        """Количество строк contributors во всем наборе."""
+        return self.__rows
+
+    def describe(self) -> dict[str, int]:
+        """Параметры набора для отчета."""
+        return {"users": self.users, "repos": self.repos, "contributors": self.contributors,
+                "weeks": self.weeks, "seed": self.seed, "empty_every": self.empty_every}
@@ -0,0 +1,316 @@
+"""
+Офлайн-бенчмарки: скорость получения данных GitHubParser на локальном имитаторе API,
+скорость записи PostgresDB (или SQLiteDB) и скорость экспорта. Результаты пишутся в JSON-отчет,
+который можно сравнить с отчетом предыдущей версии (--compare).
+
+Запуск из корня проекта:
+    python -m benchmarks.run --repos 500 --contributors 5 --weeks 104 --output bench_report.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from benchmarks.fake_github import FakeGitHubAPI
+from benchmarks.fixtures import GitHubFixtures
+from src.functions import GitHubParser
+from src.records import StatsBatch
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Разбирает аргументы командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарки сбора, записи и экспорта статистики.")
+    parser.add_argument("--users", type=int, default=1, help="количество пользователей")
+    parser.add_argument("--repos", type=int, default=200, help="репозиториев на пользователя")
+    parser.add_argument("--contributors", type=int, default=5, help="контрибьюторов на репозиторий")
+    parser.add_argument("--weeks", type=int, default=104, help="недель на контрибьютора")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора данных")
+    parser.add_argument("--empty-every", type=int, default=0,
+                        help="каждый такой репозиторий пустой, без коммитов (0 - никогда)")
+    parser.add_argument("--graphql", action="store_true",
+                        help="получать список репозиториев через GraphQL (статистика - только для непустых)")
+    parser.add_argument("--workers", type=int, default=8, help="max_workers GitHubParser")
+    parser.add_argument("--latency", type=float, default=0.005, help="задержка ответа имитатора API, секунд")
+    parser.add_argument("--accepted-every", type=int, default=0,
+                        help="каждый такой репозиторий сначала отвечает 202 (0 - никогда)")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="каждый такой запрос статистики отвечает 403 вторичного лимита (0 - никогда)")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов каждого замера (в отчет идет лучший)")
+    parser.add_argument("--only", nargs="+", choices=["fetch", "ingest", "export"],
+                        default=["fetch", "ingest", "export"], help="какие бенчмарки запускать")
+    parser.add_argument("--backend", choices=["postgres", "sqlite"], default="postgres",
+                        help="БД для замеров записи и экспорта")
+    parser.add_argument("--db-config", default=str(ROOT / "database.ini"), help="файл параметров БД")
+    parser.add_argument("--db-name", default="github_bench",
+                        help="БД для замеров (пересоздается при каждом запуске); для sqlite - файл "
+                             "<db-name>.db во временной директории")
+    parser.add_argument("--output", default="bench_report.json", help="файл JSON-отчета")
+    parser.add_argument("--compare", help="отчет предыдущей версии для сравнения")
+    return parser.parse_args()
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """Подавляет печать прогресса измеряемого кода, чтобы она не искажала замер."""
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+
+def best_of(repeat: int, run) -> dict[str, Any]:
+    """
+    Выполняет замер repeat раз и возвращает лучший (по времени) результат
+    с добавленными временами всех повторов.
+    """
+    results = [run() for _ in range(repeat)]
+    best = min(results, key=lambda result: result["seconds"])
+    best["runs"] = [round(result["seconds"], 4) for result in results]
+    return best
+
+
+def bench_fetch(fixtures: GitHubFixtures, args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Измеряет скорость получения статистики GitHubParser.iter_repo_data на имитаторе API.
+    """
+    def run() -> dict[str, Any]:
+        with FakeGitHubAPI(fixtures, latency=args.latency, accepted_every=args.accepted_every,
+                           rate_limit_every=args.rate_limit_every) as api:
+            git_hub_api = GitHubParser(["bench-token"], url=api.url, max_workers=args.workers, retry_deadline=60,
+                                       graphql=args.graphql)
+            repos = rows = 0
+            started = time.perf_counter()
+            with quiet():
+                for username in fixtures.usernames:
+                    for repo, repo_stats, repo_weeks in git_hub_api.iter_repo_data(username, ordered=False):
+                        repos += 1
+                        rows += len(repo_stats)
+            seconds = time.perf_counter() - started
+            git_hub_api.close()
+            counters = dict(api.counters)
+
+        requests_count = sum(counters.get(key, 0) for key in ("listing", "graphql", "stats", "not_found"))
+        return {
+            "seconds": seconds,
+            "repos": repos,
+            "rows": rows,
+            "repos_per_sec": repos / seconds,
+            "requests_per_sec": requests_count / seconds,
+            "server": counters,
+            "unresolved": len(git_hub_api.unresolved_repos),
+            "stats_skipped": git_hub_api.metrics.counter("github_stats_skipped_total"),
+        }
+
+    return best_of(args.repeat, run)
+
+
+def collect_rows(fixtures: GitHubFixtures) -> tuple[StatsBatch, list[Any]]:
+    """Разбирает все ответы набора в пакет строк contributors и недельные ряды (без сети)."""
+    parser = GitHubParser(["bench-token"], url="http://fake-github")
+    data, weeks = StatsBatch(), []
+    for username in fixtures.usernames:
+        for repo in fixtures.listing(username):
+            repo_stats, repo_weeks = parser.parse_contributors(username, repo["name"],
+                                                               fixtures.payload(username, repo["name"]))
+            data.extend(repo_stats)
+            weeks.extend(repo_weeks)
+    parser.close()
+    return data, weeks
+
+
+def open_db(args: argparse.Namespace):
+    """Создает (пересоздает) БД для замеров."""
+    with quiet():
+        if args.backend == "sqlite":
+            from src.sqlite_db import SQLiteDB
+
+            db = SQLiteDB(Path(tempfile.gettempdir()) / f"{args.db_name}.db")
+        else:
+            from config import config
+            from src.postgres_db import PostgresDB
+
+            params = dict(config(args.db_config))
+            params["dbname"] = args.db_name
+            db = PostgresDB(params)
+        for table in ("repos", "contributors", "contributor_weeks"):
+            db.create_table(table)
+    return db
+
+
+def reset_tables(db) -> None:
+    """Очищает таблицы перед очередным замером записи."""
+    from src.sqlite_db import SQLiteDB
+
+    with db.transaction() as cur:
+        if isinstance(db, SQLiteDB):
+            for table in ("contributor_weeks", "contributors", "repos"):
+                cur.execute(f"DELETE FROM {table};")
+        else:
+            cur.execute("TRUNCATE contributor_weeks, contributors, repos RESTART IDENTITY CASCADE;")
+
+
+def bench_ingest(db, fixtures: GitHubFixtures, args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Измеряет скорость записи bulk_insert для каждого способа загрузки БД
+    (copy и values для PostgresDB, executemany для SQLiteDB).
+    """
+    data, weeks = collect_rows(fixtures)
+    week_rows = sum(len(series) for series in weeks)
+    results = {}
+
+    for method in (("executemany",) if args.backend == "sqlite" else ("copy", "values")):
+        def run() -> dict[str, Any]:
+            reset_tables(db)
+            started = time.perf_counter()
+            with quiet():
+                db.bulk_insert(data, weeks, method=method)
+            seconds = time.perf_counter() - started
+            rows = len(data) + week_rows
+            return {"seconds": seconds, "rows": rows, "rows_per_sec": rows / seconds}
+
+        results[method] = best_of(args.repeat, run)
+    return results
+
+
+def bench_export(db, args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Измеряет скорость export_data_to_JSON для каждой таблицы и формата
+    и export_data_to_columnar.
+    Файлы пишутся во временную директорию.
+    """
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            for table in ("contributors", "contributor_weeks"):
+                with db.transaction() as cur:
+                    cur.execute(f"SELECT COUNT(*) FROM {table};")
+                    rows = cur.fetchone()[0]
+
+                for fmt, compress in (("json", False), ("ndjson", False), ("ndjson", True)):
+                    def run() -> dict[str, Any]:
+                        started = time.perf_counter()
+                        with quiet():
+                            db.export_data_to_JSON(table, fmt=fmt, compress=compress)
+                        seconds = time.perf_counter() - started
+                        file_path = Path("src", "data", f"{table}.{fmt}" + (".gz" if compress else ""))
+                        return {"seconds": seconds, "rows": rows, "rows_per_sec": rows / seconds,
+                                "bytes": file_path.stat().st_size}
+
+                    results[f"{table}.{fmt}" + (".gz" if compress else "")] = best_of(args.repeat, run)
+
+                def run_columnar() -> dict[str, Any]:
+                    started = time.perf_counter()
+                    with quiet():
+                        file_path = db.export_data_to_columnar(table)
+                    seconds = time.perf_counter() - started
+                    return {"seconds": seconds, "rows": rows, "rows_per_sec": rows / seconds,
+                            "bytes": Path(file_path).stat().st_size}
+
+                results[f"{table}.col"] = best_of(args.repeat, run_columnar)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_revision() -> str | None:
+    """Возвращает текущий коммит репозитория (для сопоставления отчетов)."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(report: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    """Собирает метрики скорости (*_per_sec) отчета в плоский словарь."""
+    metrics = {}
+    for key, value in report.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name))
+        elif key.endswith("_per_sec"):
+            metrics[name] = value
+    return metrics
+
+
+def compare(report: dict[str, Any], baseline_path: str) -> None:
+    """Печатает изменение метрик скорости относительно отчета предыдущей версии."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    current, previous = flatten(report["results"]), flatten(baseline["results"])
+    print(f"Сравнение с {baseline_path} (ревизия {baseline['meta'].get('revision')}):")
+    for name, value in current.items():
+        if name in previous and previous[name]:
+            change = (value - previous[name]) / previous[name] * 100
+            print(f"  {name}: {previous[name]:.0f} -> {value:.0f} ({change:+.1f}%)")
+
+
+def main() -> None:
+    args = parse_args()
+    fixtures = GitHubFixtures(args.users, args.repos, args.contributors, args.weeks, args.seed, args.empty_every)
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "fixtures": fixtures.describe(),
+            "workers": args.workers,
+            "latency": args.latency,
+            "accepted_every": args.accepted_every,
+            "rate_limit_every": args.rate_limit_every,
+            "graphql": args.graphql,
+            "backend": args.backend,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+
+    if "fetch" in args.only:
+        report["results"]["fetch"] = bench_fetch(fixtures, args)
+        print(f"fetch: {report['results']['fetch']['repos_per_sec']:.1f} репозиториев/с")
+
+    if "ingest" in args.only or "export" in args.only:
+        try:
+            db = open_db(args)
+        except Exception as e:
+            print(f"БД недоступна, замеры записи и экспорта пропущены: {e}")
+            report["results"]["skipped"] = str(e)
+        else:
+            try:
+                #  Экспорту нужны данные в таблицах - запись выполняется в любом случае
+                ingest = bench_ingest(db, fixtures, args)
+                if "ingest" in args.only:
+                    report["results"]["ingest"] = ingest
+                    for method, result in ingest.items():
+                        print(f"ingest ({method}): {result['rows_per_sec']:.0f} строк/с")
+                if "export" in args.only:
+                    report["results"]["export"] = bench_export(db, args)
+                    for name, result in report["results"]["export"].items():
+                        print(f"export {name}: {result['rows_per_sec']:.0f} строк/с")
+            finally:
+                with quiet():
+                    db.close()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Отчет сохранен в {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,295 @@
+import argparse
 import os
+import time
 
+import requests
 from dotenv import load_dotenv
 
 from config import config
+from src.checkpoint import CrawlCheckpoint
+from src.db_manager import AbstractDBManager
 from src.functions import GitHubParser
+from src.metrics import Metrics
+from src.pipeline import CrawlPipeline, trim_synced_weeks
 from src.postgres_db import PostgresDB
+from src.records import StatsBatch
+from src.sqlite_db import SQLiteDB
+from src.work_queue import PostgresWorkQueue
 
 
-def main():
-    # Подключаемся к БД
-    params = config()
-    print(type(params["port"]))
-    db = PostgresDB(params)
-    # db.drop_db("github")
-    db.create_table("repos")
-    db.create_table("contributors")
+def parse_args() -> argparse.Namespace:
+    """
+    Разбирает аргументы командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Сбор статистики по репозиториям пользователей GitHub.")
+    parser.add_argument("usernames", nargs="*", help="пользователи или организации GitHub")
+    parser.add_argument("--users-file", help="файл со списком пользователей (по одному на строку)")
+    parser.add_argument("--state-file", default=".crawl_state.json",
+                        help="файл контрольных точек для продолжения прерванного обхода")
+    parser.add_argument("--reset", action="store_true", help="начать обход заново, игнорируя контрольные точки")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="поставить изменившиеся репозитории пользователей в общую очередь crawl_queue")
+    parser.add_argument("--worker", action="store_true",
+                        help="режим воркера: забирать репозитории из очереди crawl_queue, пока она не опустеет")
+    parser.add_argument("--worker-batch", type=int, default=10, help="сколько репозиториев воркер берет за раз")
+    parser.add_argument("--poll", type=float, default=0,
+                        help="интервал опроса пустой очереди, секунд (0 - завершиться, когда очередь пуста)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="конвейерный режим: запись в БД пакетами параллельно с запросами к API")
+    parser.add_argument("--graphql", action="store_true",
+                        help="получать список репозиториев с метаданными через GraphQL (по 100 за запрос) "
+                             "и не запрашивать статистику пустых репозиториев")
+    parser.add_argument("--sqlite", metavar="FILE",
+                        help="хранить данные в файле SQLite вместо Postgres (без очереди --enqueue/--worker)")
+    parser.add_argument("--metrics", help="сохранить метрики в файл: *.prom - формат Prometheus, иначе JSON")
+    parser.add_argument("--profile", nargs="?", const="-",
+                        help="профилировать запуск cProfile; без значения - напечатать самые затратные функции")
+    args = parser.parse_args()
+    if args.sqlite and (args.enqueue or args.worker):
+        parser.error("очередь crawl_queue хранится в Postgres: --enqueue и --worker несовместимы с --sqlite")
+    return args
+
+
+def read_usernames(args: argparse.Namespace) -> list[str]:
+    """
+    Собирает список пользователей из аргументов и файла, сохраняя порядок и убирая повторы.
+    """
+    usernames = list(args.usernames)
+    if args.users_file:
+        with open(args.users_file, encoding="utf-8") as f:
+            usernames.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return list(dict.fromkeys(usernames)) or ["Altair788"]
+
+
+def read_api_keys() -> list[str]:
+    """
+    Читает токены GitHub из переменной окружения GITHUB_API_KEY (несколько токенов - через запятую).
+
+    Returns:
+        list[str]: токены без пробелов по краям; пустые значения (например, после завершающей запятой)
+        отбрасываются.
+    Raises:
+        SystemExit: переменная не задана или не содержит ни одного токена.
+    """
+    api_keys = [key.strip() for key in os.getenv("GITHUB_API_KEY", "").split(",") if key.strip()]
+    if not api_keys:
+        raise SystemExit("Не задан токен GitHub: укажите GITHUB_API_KEY в окружении или в файле .env "
+                         "(несколько токенов - через запятую).")
+    return api_keys
+
+
+def save_repo(db: AbstractDBManager, state: dict[str, dict], username: str, repo: dict, repo_stats: StatsBatch,
+              repo_weeks: list) -> None:
+    """
+    Записывает данные одного репозитория и его состояние синхронизации одной транзакцией.
+    """
+    full_name = f"{username}/{repo['name']}"
+    repo_weeks, last_week = trim_synced_weeks(state, full_name, repo_weeks)
+    db.bulk_insert(repo_stats, repo_weeks, sync_state=[(full_name, repo.get("pushed_at"), last_week)])
+
+
+def list_changed_repos(username: str, git_hub_api: GitHubParser, db: AbstractDBManager,
+                       done_repos: set[str] = frozenset()) -> list[dict] | None:
+    """
+    Получает изменившиеся с последней синхронизации и еще не обработанные репозитории пользователя.
+
+    Returns:
+        list[dict] | None: репозитории к обработке или None, если список репозиториев получить
+        не удалось (пользователь не найден, ошибка API) - остальные аккаунты обходятся дальше.
+    """
+    try:
+        return [
+            repo for repo in db.get_changed_repos(username, git_hub_api.iter_repos(username))
+            if repo["name"] not in done_repos
+        ]
+    except requests.RequestException as e:
+        print(f"{username}: не удалось получить список репозиториев, аккаунт будет обработан "
+              f"при следующем запуске: {e}")
+        return None
+
+
+def run_worker(git_hub_api: GitHubParser, db: PostgresDB, queue: PostgresWorkQueue, batch_size: int,
+               poll: float) -> None:
+    """
+    Забирает репозитории из очереди crawl_queue и обрабатывает их, пока очередь не опустеет
+    (или бесконечно с интервалом опроса poll). Аренда захваченных репозиториев продлевается
+    фоновым heartbeat.
+    """
+    queue.start_heartbeat()
+    try:
+        while True:
+            claimed = queue.claim(batch_size)
+            if not claimed:
+                if not poll:
+                    break
+                time.sleep(poll)
+                continue
+
+            state = db.get_sync_state()
+            by_user: dict[str, list[dict]] = {}
+            for item in claimed:
+                by_user.setdefault(item["username"], []).append(item)
+
+            for username, repos in by_user.items():
+                processed = set()
+                for repo, repo_stats, repo_weeks in git_hub_api.iter_repo_data(username, repos, ordered=False):
+                    try:
+                        save_repo(db, state, username, repo, repo_stats, repo_weeks)
+                    except Exception as e:
+                        queue.fail(username, repo["name"], str(e))
+                    else:
+                        queue.complete(username, repo["name"])
+                    processed.add(repo["name"])
+
+                for repo in repos:
+                    if repo["name"] not in processed:
+                        queue.fail(username, repo["name"],
+                                   "статистика не получена: ошибка API или дедлайн повторов")
+    finally:
+        queue.stop_heartbeat()
+    print(f"Воркер {queue.worker_id} завершил работу: {queue.stats()}")
+
+
+def crawl_account(username: str, git_hub_api: GitHubParser, db: AbstractDBManager,
+                  checkpoint: CrawlCheckpoint) -> None:
+    """
+    Обходит репозитории одного пользователя, записывая каждый репозиторий в БД
+    отдельной транзакцией и отмечая его в контрольных точках.
+    """
+    state = db.get_sync_state()
+
+    #  Запрашиваем статистику только по изменившимся и еще не обработанным репозиториям
+    repos = list_changed_repos(username, git_hub_api, db, checkpoint.done_repos(username))
+    if repos is None:
+        return
+    print(f"{username}: репозиториев к обработке: {len(repos)}")
+
+    for repo, repo_stats, repo_weeks in git_hub_api.iter_repo_data(username, repos, ordered=False):
+        save_repo(db, state, username, repo, repo_stats, repo_weeks)
+        checkpoint.mark_repo_done(username, repo["name"])
+
+    if any(owner == username for owner, _ in git_hub_api.unresolved_repos):
+        print(f"{username}: часть репозиториев не обработана, они будут запрошены при следующем запуске.")
+    else:
+        checkpoint.mark_account_done(username)
+
+
+def crawl_pipeline(usernames: list[str], git_hub_api: GitHubParser, db: AbstractDBManager,
+                   checkpoint: CrawlCheckpoint) -> None:
+    """
+    Обходит аккаунты конвейером CrawlPipeline: запросы к API, разбор ответов и пакетная
+    запись в БД выполняются одновременно. Репозиторий отмечается в контрольных точках
+    после фиксации пакета, в который он попал.
+    """
+    failed = set()
+
+    def jobs():
+        for username in usernames:
+            if checkpoint.is_account_done(username):
+                print(f"{username}: уже обработан, пропускаем.")
+                continue
+            repos = list_changed_repos(username, git_hub_api, db, checkpoint.done_repos(username))
+            if repos is None:
+                failed.add(username)
+                continue
+            print(f"{username}: репозиториев к обработке: {len(repos)}")
+            yield username, repos
+
+    started = time.perf_counter()
+    stats = CrawlPipeline(git_hub_api, db).run(
+        jobs(), on_written=lambda username, repo: checkpoint.mark_repo_done(username, repo["name"])
+    )
+    elapsed = time.perf_counter() - started
+    print(f"Конвейер: репозиториев {stats['repos']}, строк {stats['rows']}, недель {stats['weeks']}, "
+          f"пакетов {stats['batches']} за {elapsed:.1f} с")
+
+    unresolved = {owner for owner, _ in git_hub_api.unresolved_repos}
+    for username in usernames:
+        if username in failed:
+            continue
+        if username in unresolved:
+            print(f"{username}: часть репозиториев не обработана, они будут запрошены при следующем запуске.")
+        else:
+            checkpoint.mark_account_done(username)
+
+
+def run(args: argparse.Namespace, metrics: Metrics) -> None:
+    """
+    Выполняет обход в выбранном режиме.
+    """
+    usernames = read_usernames(args)
+    #  Токены проверяются до подключения к БД, чтобы не создавать ее впустую
+    load_dotenv()
+    api_keys = read_api_keys()
+
+    # Подключаемся к БД (инкрементальный режим: БД и данные прошлых запусков сохраняются)
+    if args.sqlite:
+        db = SQLiteDB(args.sqlite, incremental=True, metrics=metrics)
+    else:
+        params = config()
+        #  Воркеру и конвейеру нужен пул: heartbeat и стадии конвейера работают с БД из отдельных потоков
+        db = PostgresDB(params, incremental=True, pool_size=4 if args.worker or args.pipeline else None,
+                        metrics=metrics)
+    for table in ("repos", "contributors", "contributor_weeks", "repo_sync_state"):
+        db.create_table(table)
     #
     #  Подключаемся к API
-    load_dotenv()
-    api_key = os.getenv("GITHUB_API_KEY")
-    git_hub_api = GitHubParser(api_key)
-    data = git_hub_api.get_repos_stats("Altair788")
+    git_hub_api = GitHubParser(api_keys, metrics=metrics, graphql=args.graphql)
+
+    if args.enqueue or args.worker:
+        queue = PostgresWorkQueue(db)
+        queue.create_table()
+        if args.enqueue:
+            for username in usernames:
+                repos = list_changed_repos(username, git_hub_api, db)
+                if repos is None:
+                    continue
+                count = queue.enqueue(username, repos)
+                print(f"{username}: поставлено в очередь репозиториев: {count}")
+        if args.worker:
+            run_worker(git_hub_api, db, queue, args.worker_batch, args.poll)
+            db.refresh_materialized_views()
+        return
+
+    checkpoint = CrawlCheckpoint(args.state_file)
+    if args.reset:
+        checkpoint.clear()
+
+    if args.pipeline:
+        crawl_pipeline(usernames, git_hub_api, db, checkpoint)
+    else:
+        for username in usernames:
+            if checkpoint.is_account_done(username):
+                print(f"{username}: уже обработан, пропускаем.")
+                continue
+            crawl_account(username, git_hub_api, db, checkpoint)
+    #  Агрегаты пересчитываются один раз за обход, а не после записи каждого репозитория
+    db.refresh_materialized_views()
+
+    #  Обход завершен целиком - следующий запуск начнется с начала
+    if all(checkpoint.is_account_done(username) for username in usernames):
+        checkpoint.clear()
 
-    #  Сохраняем данные в БД
-    db.insert_data_to_table(data, "repos")
-    db.insert_data_to_table(data, "contributors")
     print(db.get_data_from_table("contributors", 2))
     print(db.get_data_from_table("repos", 3))
     db.export_data_to_JSON("repos")
     db.export_data_to_JSON("contributors")
 
 
+def main():
+    args = parse_args()
+    metrics = Metrics()
+    try:
+        if args.profile:
+            with metrics.profile(None if args.profile == "-" else args.profile):
+                run(args, metrics)
+        else:
+            run(args, metrics)
+    finally:
+        if args.metrics:
+            metrics.write(args.metrics)
+            print(f"Метрики сохранены в {args.metrics}")
+
+
 if __name__ == '__main__':
     main()
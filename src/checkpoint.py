@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class CrawlCheckpoint:
+    """
+    Представляет файл контрольных точек обхода: какие аккаунты и репозитории уже обработаны.
+
+    Файл - журнал JSON-строк: отметка репозитория дописывается в конец одной строкой,
+    без перезаписи файла. Когда аккаунт обработан полностью, отметки его репозиториев
+    больше не нужны, и журнал атомарно переписывается в сжатом виде. После падения
+    или прерывания обход продолжается с того места, где остановился.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Конструктор класса CrawlCheckpoint.
+
+        Args:
+            path(str | Path): путь к файлу состояния (создается при первой отметке)
+        """
+        self.__path = Path(path)
+        self.__lock = threading.Lock()
+        self.__done_accounts: set[str] = set()
+        self.__repos: dict[str, set[str]] = {}
+        if self.__path.exists():
+            self._load()
+            #  Сжимаем журнал сразу: заодно отбрасывается строка, недописанная при падении
+            self._save()
+
+    @property
+    def path(self):
+        return self.__path
+
+    def _load(self) -> None:
+        """Восстанавливает состояние из журнала."""
+        with open(self.__path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    #  Последняя строка могла остаться недописанной при падении
+                    continue
+                if "accounts" in record:
+                    #  Формат прежних версий: все состояние одним JSON-объектом
+                    for username, account in record["accounts"].items():
+                        if account.get("done"):
+                            self.__done_accounts.add(username)
+                        else:
+                            self.__repos.setdefault(username, set()).update(account.get("repos", []))
+                elif record.get("done"):
+                    self.__done_accounts.add(record["account"])
+                    self.__repos.pop(record["account"], None)
+                else:
+                    self.__repos.setdefault(record["account"], set()).add(record["repo"])
+
+    def _append(self, record: dict) -> None:
+        """Дописывает отметку в конец журнала. Вызывается под блокировкой."""
+        with open(self.__path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _save(self) -> None:
+        """Атомарно переписывает журнал в сжатом виде. Вызывается под блокировкой."""
+        tmp_path = self.__path.with_name(f"{self.__path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for username in self.__done_accounts:
+                f.write(json.dumps({"account": username, "done": True}) + "\n")
+            for username, repos in self.__repos.items():
+                for repo_name in repos:
+                    f.write(json.dumps({"account": username, "repo": repo_name}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.__path)
+
+    def is_account_done(self, username: str) -> bool:
+        """Проверяет, обработан ли аккаунт полностью."""
+        with self.__lock:
+            return username in self.__done_accounts
+
+    def done_repos(self, username: str) -> set[str]:
+        """Возвращает имена уже обработанных репозиториев аккаунта."""
+        with self.__lock:
+            return set(self.__repos.get(username, ()))
+
+    def mark_repo_done(self, username: str, repo_name: str) -> None:
+        """Отмечает репозиторий аккаунта как обработанный."""
+        with self.__lock:
+            repos = self.__repos.setdefault(username, set())
+            if repo_name not in repos:
+                repos.add(repo_name)
+                #  Без fsync: данные репозитория уже зафиксированы в БД, и потерянная при падении
+                #  отметка приведет лишь к тому, что get_changed_repos отфильтрует его повторно
+                self._append({"account": username, "repo": repo_name})
+
+    def mark_account_done(self, username: str) -> None:
+        """Отмечает аккаунт как полностью обработанный и отбрасывает отметки его репозиториев."""
+        with self.__lock:
+            self.__done_accounts.add(username)
+            self.__repos.pop(username, None)
+            self._save()
+
+    def clear(self) -> None:
+        """Удаляет файл состояния после успешного завершения обхода."""
+        with self.__lock:
+            self.__done_accounts.clear()
+            self.__repos.clear()
+            self.__path.unlink(missing_ok=True)
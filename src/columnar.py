@@ -0,0 +1,248 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterable
+
+#  Необязательная зависимость: с NumPy колонки отдаются как ndarray-представления файла,
+#  без нее - как memoryview (тоже без копирования).
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b"GHSTCOL1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_HEADER_SIZE = struct.Struct("<I")
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _little_endian(values: array) -> memoryview:
+    """Байты массива в порядке little-endian (формат файла не зависит от платформы)."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return memoryview(values).cast("B")
+
+
+def write_columnar(path: str | Path, table: str, columns: tuple[str, ...], rows: Iterable[tuple],
+                   string_columns: Iterable[str] = ()) -> int:
+    """
+    Записывает строки в бинарный колоночный файл.
+
+    Формат: 8 байт сигнатуры GHSTCOL1, длина заголовка (uint32 LE) и JSON-заголовок
+    (таблица, количество строк, смещения колонок), затем секции колонок, выровненные по 64 байта.
+    Целочисленная колонка - массив int64 LE. Строковая колонка кодируется словарем:
+    коды int32 LE по строкам, смещения значений словаря int64 LE (count + 1) и значения в UTF-8.
+
+    Args:
+        path(str | Path): файл (записывается через временный файл и подменяется целиком)
+        table(str): название таблицы (сохраняется в заголовке)
+        columns(tuple[str, ...]): названия колонок в порядке значений строки
+        rows(Iterable[tuple]): строки
+        string_columns(Iterable[str]): строковые колонки (остальные - целые числа)
+    Returns:
+        int: количество записанных строк.
+    """
+    string_columns = set(string_columns)
+    values = {name: array("i") if name in string_columns else array("q") for name in columns}
+    dictionaries: dict[str, dict[str, int]] = {name: {} for name in columns if name in string_columns}
+
+    targets = [(values[name], dictionaries.get(name)) for name in columns]
+    rows_count = 0
+    for row in rows:
+        for (target, dictionary), value in zip(targets, row):
+            if dictionary is not None:
+                code = dictionary.get(value)
+                if code is None:
+                    code = dictionary[value] = len(dictionary)
+                value = code
+            target.append(value)
+        rows_count += 1
+
+    sections: list[memoryview] = []
+    layout = []
+    for name in columns:
+        if name in dictionaries:
+            encoded = [text.encode("utf-8") for text in dictionaries[name]]
+            offsets = array("q", [0])
+            for item in encoded:
+                offsets.append(offsets[-1] + len(item))
+            layout.append({"name": name, "type": "dict", "codes": len(sections),
+                           "offsets": len(sections) + 1, "data": len(sections) + 2,
+                           "count": len(encoded), "size": offsets[-1]})
+            sections += [_little_endian(values[name]), _little_endian(offsets), memoryview(b"".join(encoded))]
+        else:
+            layout.append({"name": name, "type": "int64", "data": len(sections)})
+            sections.append(_little_endian(values[name]))
+
+    def header(section_offsets: list[int]) -> bytes:
+        described = []
+        for column in layout:
+            column = dict(column)
+            for key in ("codes", "offsets", "data"):
+                if key in column:
+                    column[key] = section_offsets[column[key]]
+            described.append(column)
+        return json.dumps({"version": FORMAT_VERSION, "table": table, "rows": rows_count,
+                           "columns": described}).encode("utf-8")
+
+    #  Длина заголовка зависит от смещений секций, а смещения - от длины заголовка:
+    #  сдвигаем начало данных, пока заголовок не поместится перед ним
+    base = 0
+    while True:
+        section_offsets = []
+        offset = base
+        for section in sections:
+            section_offsets.append(offset)
+            offset = _aligned(offset + len(section))
+        header_bytes = header(section_offsets)
+        needed = _aligned(len(MAGIC) + _HEADER_SIZE.size + len(header_bytes))
+        if needed <= base:
+            break
+        base = needed
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_SIZE.pack(len(header_bytes)))
+            f.write(header_bytes)
+            for section_offset, section in zip(section_offsets, sections):
+                f.write(b"\0" * (section_offset - f.tell()))
+                f.write(section)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+    return rows_count
+
+
+class ColumnarReader:
+    """
+    Представляет чтение файла write_columnar через отображение в память (mmap).
+
+    Файл открывается мгновенно: данные не читаются и не копируются, а колонки отдаются
+    как представления отображенной памяти - numpy.ndarray (если NumPy установлен)
+    или memoryview. Агрегаты по колонкам (sum, bincount по кодам словаря) считаются
+    прямо по страницам файла.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Конструктор класса ColumnarReader.
+
+        Args:
+            path(str | Path): файл, созданный write_columnar (export_data_to_columnar)
+        Raises:
+            ValueError: файл не является колоночным файлом поддерживаемой версии.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            #  Пустой файл отобразить нельзя - сигнатура проверяется до mmap
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Файл '{self.path}' не является колоночным экспортом.")
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (header_size,) = _HEADER_SIZE.unpack_from(self.__mmap, len(MAGIC))
+        start = len(MAGIC) + _HEADER_SIZE.size
+        header = json.loads(self.__mmap[start:start + header_size])
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия колоночного файла: {header.get('version')}.")
+        self.table: str = header["table"]
+        self.rows: int = header["rows"]
+        self.__columns: dict[str, dict[str, Any]] = {column["name"]: column for column in header["columns"]}
+        self.__dictionaries: dict[str, list[str]] = {}
+
+    @property
+    def columns(self) -> list[str]:
+        """Названия колонок в порядке записи."""
+        return list(self.__columns)
+
+    def is_dictionary(self, name: str) -> bool:
+        """Кодируется ли колонка словарем (строковая колонка)."""
+        return self.__describe(name)["type"] == "dict"
+
+    def __describe(self, name: str) -> dict[str, Any]:
+        column = self.__columns.get(name)
+        if column is None:
+            raise KeyError(f"Колонка '{name}' не найдена. Колонки файла: {', '.join(self.__columns)}.")
+        return column
+
+    def __view(self, offset: int, count: int, typecode: str) -> Any:
+        """Представление count значений typecode ('q' или 'i', little-endian) начиная с offset."""
+        size = count * array(typecode).itemsize
+        if numpy is not None:
+            return numpy.frombuffer(self.__mmap, dtype="<i8" if typecode == "q" else "<i4",
+                                    count=count, offset=offset)
+        if sys.byteorder != "little":
+            values = array(typecode, self.__mmap[offset:offset + size])
+            values.byteswap()
+            return values
+        return memoryview(self.__mmap)[offset:offset + size].cast(typecode)
+
+    def column(self, name: str) -> Any:
+        """
+        Отдает колонку без копирования.
+
+        Args:
+            name(str): название колонки
+        Returns:
+            numpy.ndarray | memoryview: значения int64 или, для строковой колонки, коды словаря int32.
+        """
+        column = self.__describe(name)
+        if column["type"] == "dict":
+            return self.__view(column["codes"], self.rows, "i")
+        return self.__view(column["data"], self.rows, "q")
+
+    __getitem__ = column
+
+    def dictionary(self, name: str) -> list[str]:
+        """
+        Значения словаря строковой колонки (индекс в списке - код в column(name)).
+        """
+        column = self.__describe(name)
+        if column["type"] != "dict":
+            raise ValueError(f"Колонка '{name}' не кодируется словарем.")
+        values = self.__dictionaries.get(name)
+        if values is None:
+            offsets = array("q", self.__mmap[column["offsets"]:column["offsets"] + (column["count"] + 1) * 8])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            data = self.__mmap[column["data"]:column["data"] + column["size"]]
+            values = [data[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+            self.__dictionaries[name] = values
+        return values
+
+    def strings(self, name: str) -> list[str]:
+        """Раскодированные значения строковой колонки (создает список из rows строк)."""
+        dictionary = self.dictionary(name)
+        return [dictionary[code] for code in self.column(name)]
+
+    def close(self) -> None:
+        """
+        Закрывает отображение файла. Если снаружи остались представления колонок,
+        отображение закроется после их освобождения.
+        """
+        try:
+            self.__mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "ColumnarReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __repr__(self) -> str:
+        return f"ColumnarReader({str(self.path)!r}, table={self.table!r}, rows={self.rows})"
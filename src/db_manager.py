@@ -0,0 +1,516 @@
+import gzip
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from src.columnar import write_columnar
+from src.records import StatsBatch
+from src.series import ContributorWeeks
+
+
+class AbstractDBManager(ABC):
+    """
+    Представляет абстрактный класс AbstractDBManager.
+
+    Содержит то, что не зависит от СУБД: схему колонок, запись пакетов статистики,
+    кэширование чтения, экспорт в JSON и колоночный формат, аналитические запросы
+    и метрики. Наследники реализуют соединение, транзакции и особенности диалекта SQL.
+    """
+    contributor_columns = ("contributor_name", "total_commits", "weekly_timestamp", "weekly_lines_added",
+                           "weekly_lines_deleted", "weekly_commit_count", "repo_id")
+    week_columns = ("repo_id", "contributor_name", "week_timestamp", "lines_added", "lines_deleted", "commit_count")
+    week_seconds = 7 * 24 * 60 * 60
+    repo_totals_query = """
+        SELECT r.repo_name, r.repo_url,
+               COUNT(c.id) AS contributors,
+               COALESCE(SUM(c.total_commits), 0) AS total_commits,
+               COALESCE(MAX(w.lines_added), 0) AS lines_added,
+               COALESCE(MAX(w.lines_deleted), 0) AS lines_deleted
+        FROM repos r
+        LEFT JOIN contributors c ON c.repo_id = r.id
+        LEFT JOIN (
+            SELECT repo_id, SUM(lines_added) AS lines_added, SUM(lines_deleted) AS lines_deleted
+            FROM contributor_weeks GROUP BY repo_id
+        ) w ON w.repo_id = r.id
+        GROUP BY r.id
+    """
+    contributor_totals_query = """
+        SELECT c.contributor_name, c.repos, c.total_commits,
+               COALESCE(w.lines_added, 0) AS lines_added,
+               COALESCE(w.lines_deleted, 0) AS lines_deleted
+        FROM (
+            SELECT contributor_name, COUNT(*) AS repos, SUM(total_commits) AS total_commits
+            FROM contributors GROUP BY contributor_name
+        ) c
+        LEFT JOIN (
+            SELECT contributor_name, SUM(lines_added) AS lines_added, SUM(lines_deleted) AS lines_deleted
+            FROM contributor_weeks GROUP BY contributor_name
+        ) w USING (contributor_name)
+    """
+    export_columns = {
+        "repos": ("repo_name", "repo_url"),
+        "contributors": contributor_columns,
+        "contributor_weeks": week_columns,
+    }
+    #  Строковые колонки экспорта (в колоночном формате кодируются словарем)
+    string_columns = ("repo_name", "repo_url", "contributor_name")
+    batch_size = 1000
+
+    #  Особенности диалекта, задаются наследниками: базовый класс ошибок драйвера,
+    #  позиционный параметр запроса, значение LIMIT без ограничения и способ загрузки по умолчанию
+    database_error: type[Exception]
+    placeholder: str
+    no_limit: int | None
+    load_method: str
+
+    @abstractmethod
+    def drop_db(self, dbname: str) -> None:
+        """
+        Удаляет БД
+        Args:
+             dbname(str): наименование БД
+        """
+        pass
+
+    @abstractmethod
+    def drop_table(self, table: str) -> None:
+        """
+        Абстрактный метод для удаления таблицы.
+
+        Args:
+             table(str): наименование таблицы.
+
+        """
+        pass
+
+    def refresh_materialized_views(self) -> None:
+        """
+        Обновляет предрасчитанные агрегаты после серии записей (по умолчанию их нет).
+        """
+        pass
+
+    @abstractmethod
+    def _transaction(self, operation: str = "transaction") -> Iterator[Any]:
+        """
+        Контекстный менеджер транзакции конкретной СУБД: отдает курсор, фиксирует изменения
+        при успехе и откатывает при ошибке.
+        """
+        pass
+
+    @contextmanager
+    def transaction(self, operation: str = "transaction") -> Iterator[Any]:
+        """
+        Выполняет блок в одной транзакции и отдает курсор DB-API. Предназначен для компонентов,
+        которые хранят свои таблицы в той же БД (очередь PostgresWorkQueue, бенчмарки).
+
+        Args:
+            operation(str): метка operation метрики db_transaction_seconds
+        """
+        with self._transaction(operation=operation) as cur:
+            yield cur
+
+    @abstractmethod
+    def get_sync_state(self) -> dict[str, dict[str, Any]]:
+        """
+        Получает сохраненное состояние синхронизации репозиториев.
+
+        Returns:
+            dict[str, dict[str, Any]]: full_name репозитория -> {"pushed_at", "last_week"}.
+        """
+        pass
+
+    def get_changed_repos(self, username: str, repos: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Отбирает репозитории, изменившиеся (по pushed_at) с последней синхронизации.
+
+        Args:
+            username(str): владелец репозиториев
+            repos(Iterable[dict[str, Any]]): репозитории из GitHubParser.iter_repos
+        Returns:
+            list[dict[str, Any]]: новые и измененные репозитории.
+        """
+        state = self.get_sync_state()
+        return [
+            repo for repo in repos
+            if state.get(f"{username}/{repo['name']}", {}).get("pushed_at") != repo.get("pushed_at")
+        ]
+
+    def insert_data_to_table(self, data: StatsBatch | list[dict[str, Any]], table: str,
+                             method: str | None = None) -> None:
+        """
+        Заполняет таблицу данными.
+
+        Каждый репозиторий записывается один раз, сколько бы строк по нему ни было в data.
+        Вставка выполняется как upsert: существующие строки обновляются.
+
+        Args:
+             data(StatsBatch | list[dict[str, Any]]): пакет строк или список словарей с данными из GitHub
+             table(str): наименование таблицы
+             method(str | None): способ загрузки (по умолчанию - load_method наследника)
+        """
+        data = self._as_batch(data)
+        method = method or self.load_method
+
+        if table == "repos":
+            with self._transaction(operation="insert") as cur:
+                self._insert_repos(cur, data)
+
+        elif table == "contributors":
+            with self._transaction(operation="insert") as cur:
+                repo_ids = self._get_repo_ids(cur, data.repos)
+                self._insert_contributors(cur, data, repo_ids, method)
+
+        else:
+            raise ValueError(f"Таблица '{table}' не найдена.")
+        self.result_cache.invalidate(table)
+
+    def bulk_insert(self, data: StatsBatch | Iterable[dict[str, Any]], weeks: Iterable[ContributorWeeks] | None = None,
+                    method: str | None = None,
+                    sync_state: Iterable[tuple[str, str | None, int | None]] | None = None) -> None:
+        """
+        Записывает репозитории, контрибьюторов, недельные ряды и состояние синхронизации
+        в одной транзакции.
+
+        Args:
+            data(StatsBatch | Iterable[dict[str, Any]]): пакет строк статистики из GitHubParser
+            (или строки в формате словарей)
+            weeks(Iterable[ContributorWeeks] | None): недельные ряды контрибьюторов
+            method(str | None): способ загрузки (по умолчанию - load_method наследника)
+            sync_state(Iterable[tuple] | None): состояние синхронизации (full_name, pushed_at, last_week)
+        """
+        data = self._as_batch(data)
+        method = method or self.load_method
+        started = time.perf_counter()
+        with self._transaction(operation="bulk_insert") as cur:
+            repo_ids = self._insert_repos(cur, data)
+            rows_count = self._insert_contributors(cur, data, repo_ids, method)
+            if weeks is not None:
+                rows_count += self._insert_weeks(cur, weeks, repo_ids, method)
+            if sync_state is not None:
+                self._update_sync_state(cur, sync_state)
+        self.result_cache.invalidate("repos", "contributors", "contributor_weeks")
+        self._record_write(rows_count, time.perf_counter() - started)
+
+    def insert_weeks(self, weeks: Iterable[ContributorWeeks], method: str | None = None) -> None:
+        """
+        Загружает недельные ряды контрибьюторов в таблицу contributor_weeks.
+
+        Args:
+            weeks(Iterable[ContributorWeeks]): недельные ряды из GitHubParser.iter_repo_data
+            method(str | None): способ загрузки (по умолчанию - load_method наследника)
+        """
+        weeks = list(weeks)
+        started = time.perf_counter()
+        with self._transaction(operation="insert_weeks") as cur:
+            repo_ids = self._get_repo_ids(cur, {series.repo_url for series in weeks})
+            rows_count = self._insert_weeks(cur, weeks, repo_ids, method or self.load_method)
+        self.result_cache.invalidate("contributor_weeks")
+        self._record_write(rows_count, time.perf_counter() - started)
+
+    def _record_write(self, rows_count: int, elapsed: float) -> None:
+        """Учитывает в метриках скорость последней записи, строк/с."""
+        if elapsed > 0:
+            self.metrics.set("db_write_rows_per_second", rows_count / elapsed)
+
+    @staticmethod
+    def _as_batch(data: StatsBatch | Iterable[dict[str, Any]]) -> StatsBatch:
+        """Приводит строки в формате словарей к пакету StatsBatch."""
+        return data if isinstance(data, StatsBatch) else StatsBatch.from_dicts(data)
+
+    def _insert_contributors(self, cur, data: StatsBatch, repo_ids: dict[str, int], method: str) -> int:
+        """
+        Записывает строки контрибьюторов пакета.
+
+        Returns:
+            int: количество записанных строк.
+        """
+        return self._merge_rows(cur, "contributors", self.contributor_columns, ("repo_id", "contributor_name"),
+                                data.rows(repo_ids), method)
+
+    def _insert_weeks(self, cur, weeks: Iterable[ContributorWeeks], repo_ids: dict[str, int], method: str) -> int:
+        """
+        Записывает недельные ряды в contributor_weeks, разворачивая колонки в строки на лету.
+
+        Returns:
+            int: количество записанных строк.
+        """
+        def rows() -> Iterator[tuple]:
+            for series in weeks:
+                repo_id = repo_ids.get(series.repo_url)
+                if repo_id is None:
+                    raise ValueError(f"Репозиторий '{series.repo_name}' не найден.")
+                yield from series.rows(repo_id)
+
+        return self._merge_rows(cur, "contributor_weeks", self.week_columns,
+                                ("repo_id", "contributor_name", "week_timestamp"), rows(), method)
+
+    @abstractmethod
+    def _insert_repos(self, cur, data: StatsBatch) -> dict[str, int]:
+        """
+        Пакетно вставляет (или обновляет) репозитории пакета.
+
+        Returns:
+            dict[str, int]: соответствие url репозитория его идентификатору.
+        """
+        pass
+
+    @abstractmethod
+    def _get_repo_ids(self, cur, repos: Iterable[Any]) -> dict[str, int]:
+        """
+        Получает идентификаторы репозиториев (RepoRef или url).
+
+        Returns:
+            dict[str, int]: соответствие url репозитория его идентификатору.
+        """
+        pass
+
+    @abstractmethod
+    def _merge_rows(self, cur, table: str, columns: tuple[str, ...], key_columns: tuple[str, ...],
+                    rows: Iterable[tuple], method: str) -> int:
+        """
+        Записывает строки в table как upsert по key_columns.
+
+        Returns:
+            int: количество вставленных или обновленных строк table.
+        """
+        pass
+
+    @abstractmethod
+    def _update_sync_state(self, cur, sync_state: Iterable[tuple[str, str | None, int | None]]) -> None:
+        """
+        Записывает состояние синхронизации репозиториев (full_name, pushed_at, last_week).
+        """
+        pass
+
+    @abstractmethod
+    def _query(self, query: str, params: tuple | dict = ()) -> list[dict[str, Any]]:
+        """
+        Выполняет запрос на чтение и возвращает строки в виде словарей (ключи - имена колонок).
+        Ошибки драйвера не перехватывает.
+        """
+        pass
+
+    @abstractmethod
+    def _export_rows(self, table: str, columns: tuple[str, ...], itersize: int) -> Iterator[Iterable[tuple]]:
+        """
+        Контекстный менеджер: отдает строки колонок columns таблицы table,
+        читаемые из БД порциями по itersize.
+        """
+        pass
+
+    def get_data_from_table(self, table: str, count: int) -> list[dict[str, Any]]:
+        """
+        Получает данные из таблицы.
+
+        Результат кэшируется в result_cache по (таблица, запрос, лимит) до записи в таблицу
+        этим экземпляром или истечения TTL; повторное чтение не обращается к БД.
+
+        Args:
+            table (str): название таблицы.
+            count (int): количество записей для получения.
+
+        Returns:
+            list[dict[str, Any]]: список словарей с данными.
+        """
+        # Проверка на допустимые имена таблиц
+        valid_tables = ["repos", "contributors"]
+        if table not in valid_tables:
+            raise ValueError(f"Недопустимое имя таблицы: {table}. Допустимые таблицы: {', '.join(valid_tables)}.")
+
+        order = "repo_name" if table == "repos" else "weekly_lines_added"
+        query = (f"SELECT {', '.join(self.export_columns[table])} FROM {table} "
+                 f"ORDER BY {order} LIMIT {self.placeholder};")
+        try:
+            data, cached = self.result_cache.get_or_load(table, (table, query, count),
+                                                         lambda: self._query(query, (count,)))
+        except self.database_error as db_error:
+            logging.error(f"Ошибка базы данных при получении данных из таблицы '{table}': {db_error}")
+            return []  # Возвращаем пустой список в случае ошибки
+        except Exception as e:
+            logging.error(f"Неизвестная ошибка при получении данных из таблицы '{table}': {e}")
+            return []  # Возвращаем пустой список в случае ошибки
+        self.metrics.inc("db_cache_total", table=table, result="hit" if cached else "miss")
+        #  Словари копируются, чтобы изменения вызывающего кода не попали в кэш
+        return [dict(row) for row in data]
+
+    def _fetch_dicts(self, query: str, params: tuple | dict = ()) -> list[dict[str, Any]]:
+        """
+        Выполняет аналитический запрос и возвращает строки в виде словарей.
+        При ошибке БД пишет ее в лог и возвращает пустой список.
+        """
+        try:
+            return self._query(query, params)
+        except self.database_error as db_error:
+            logging.error(f"Ошибка базы данных при выполнении аналитического запроса: {db_error}")
+            return []
+
+    def _repo_totals_source(self) -> str:
+        """Источник итогов по репозиториям для get_repo_totals."""
+        return f"({self.repo_totals_query}) AS totals"
+
+    def _contributor_totals_source(self) -> str:
+        """Источник итогов по контрибьюторам для get_top_contributors."""
+        return f"({self.contributor_totals_query}) AS totals"
+
+    def get_repo_totals(self, count: int | None = None) -> list[dict[str, Any]]:
+        """
+        Получает итоги по репозиториям, посчитанные в БД: число контрибьюторов,
+        сумму коммитов и добавленных/удаленных строк.
+
+        Args:
+            count(int | None): лимит вывода (None - все репозитории)
+        Returns:
+            list[dict[str, Any]]: итоги по репозиториям, по убыванию числа коммитов.
+        """
+        return self._fetch_dicts(f"""
+            SELECT * FROM {self._repo_totals_source()}
+            ORDER BY total_commits DESC, repo_name
+            LIMIT {self.placeholder};
+        """, (self.no_limit if count is None else count,))
+
+    def get_top_contributors(self, count: int = 10) -> list[dict[str, Any]]:
+        """
+        Получает топ контрибьюторов по сумме коммитов во всех репозиториях.
+
+        Args:
+            count(int): количество контрибьюторов
+        Returns:
+            list[dict[str, Any]]: контрибьюторы с числом репозиториев, коммитов и строк.
+        """
+        return self._fetch_dicts(f"""
+            SELECT * FROM {self._contributor_totals_source()}
+            ORDER BY total_commits DESC, contributor_name
+            LIMIT {self.placeholder};
+        """, (count,))
+
+    @abstractmethod
+    def _weekly_churn_query(self, preceding: int) -> str:
+        """
+        Запрос get_weekly_churn на диалекте СУБД с именованными параметрами repo_name и span;
+        preceding - число предыдущих недель в окне скользящего среднего.
+        """
+        pass
+
+    def get_weekly_churn(self, weeks: int = 12, window: int = 4,
+                         repo_name: str | None = None) -> list[dict[str, Any]]:
+        """
+        Получает недельную динамику изменений (churn = добавленные + удаленные строки)
+        за последние weeks недель со скользящим средним по window неделям.
+
+        Args:
+            weeks(int): глубина выборки в неделях от последней загруженной недели
+            window(int): ширина окна скользящего среднего, недель
+            repo_name(str | None): ограничить выборку одним репозиторием
+        Returns:
+            list[dict[str, Any]]: по одной записи на неделю в порядке возрастания.
+        """
+        return self._fetch_dicts(self._weekly_churn_query(max(int(window) - 1, 0)),
+                                 {"repo_name": repo_name, "span": weeks * self.week_seconds})
+
+    def _check_export_table(self, table: str) -> None:
+        """Проверяет, что таблицу можно экспортировать."""
+        if table not in self.export_columns:
+            raise ValueError(f"Недопустимое имя таблицы: {table}. "
+                             f"Допустимые таблицы: {', '.join(self.export_columns)}.")
+
+    def _record_export(self, file_path: str, table: str, fmt: str, rows_count: int, started: float) -> None:
+        """Учитывает выгрузку в метриках и сообщает о ней."""
+        elapsed = time.monotonic() - started
+        rate = rows_count / elapsed if elapsed else float(rows_count)
+        self.metrics.inc("db_rows_exported_total", rows_count, table=table, format=fmt)
+        self.metrics.observe("db_export_seconds", elapsed, table=table, format=fmt)
+        print(f"Данные успешно сохранены в {file_path}: {rows_count} строк, {rate:.0f} строк/с")
+
+    def export_data_to_JSON(self, table: str, fmt: str = "json", compress: bool = False,
+                            itersize: int = 5000) -> None:
+        """
+        Экспортирует данные таблицы в файл src/data/<table>.json (или .ndjson, .gz)
+        в формате JSON.
+
+        Строки читаются из БД порциями по itersize и пишутся в файл по одной,
+        поэтому потребление памяти не зависит от размера таблицы.
+
+        Args:
+             table(str): название таблицы
+             fmt(str): "json" - компактный JSON-массив (одна запись на строку),
+             "ndjson" - по одному JSON-объекту на строку
+             compress(bool): сжимать ли файл gzip
+             itersize(int): количество строк, читаемых из БД за один раз
+        """
+        self._check_export_table(table)
+        if fmt not in ("json", "ndjson"):
+            raise ValueError(f"Недопустимый формат: {fmt}. Допустимые форматы: json, ndjson.")
+
+        # Создаем путь к файлу
+        file_path = os.path.join("src", "data", f"{table}.{fmt}" + (".gz" if compress else ""))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.tmp"
+
+        columns = self.export_columns[table]
+        rows_count = 0
+        started = time.monotonic()
+
+        try:
+            with self._export_rows(table, columns, itersize) as rows, \
+                    (gzip.open(tmp_path, "wt", encoding="utf-8") if compress
+                     else open(tmp_path, "w", encoding="utf-8")) as f:
+                if fmt == "json":
+                    f.write("[")
+                for row in rows:
+                    record = json.dumps(dict(zip(columns, row)))
+                    if fmt == "json":
+                        f.write(",\n" if rows_count else "\n")
+                        f.write(record)
+                    else:
+                        f.write(record)
+                        f.write("\n")
+                    rows_count += 1
+                if fmt == "json":
+                    f.write("\n]\n")
+
+        except self.database_error as db_error:
+            logging.error(f"Ошибка базы данных при получении данных из таблицы '{table}': {db_error}")
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+        except Exception as e:
+            logging.error(f"Неизвестная ошибка при получении данных из таблицы '{table}': {e}")
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+
+        # Подменяем файл целиком только после успешной выгрузки
+        os.replace(tmp_path, file_path)
+        self._record_export(file_path, table, fmt, rows_count, started)
+
+    def export_data_to_columnar(self, table: str, itersize: int = 5000) -> str | None:
+        """
+        Экспортирует данные таблицы в бинарный колоночный файл src/data/<table>.col
+        (целочисленные колонки - массивы int64, строки - словарь и коды, см. src.columnar).
+        Файл открывается без разбора через ColumnarReader.
+
+        Args:
+             table(str): название таблицы
+             itersize(int): количество строк, читаемых из БД за один раз
+        Returns:
+            str | None: путь к файлу (None - при ошибке выгрузки).
+        """
+        self._check_export_table(table)
+
+        file_path = os.path.join("src", "data", f"{table}.col")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        columns = self.export_columns[table]
+        started = time.monotonic()
+
+        try:
+            with self._export_rows(table, columns, itersize) as rows:
+                rows_count = write_columnar(file_path, table, columns, rows, self.string_columns)
+        except self.database_error as db_error:
+            logging.error(f"Ошибка базы данных при получении данных из таблицы '{table}': {db_error}")
+            return None
+
+        self._record_export(file_path, table, "columnar", rows_count, started)
+        return file_path
@@ -1,11 +1,24 @@
 import os
 import time
+from datetime import datetime
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, Sequence
+from urllib.parse import urlparse
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from src.http_cache import ResponseCache
+from src.json_stream import STREAMING, ContributorPayload, decode_contributors, loads, stream_contributors
+from src.metrics import Metrics
+from src.rate_limit import TokenPool
+from src.records import StatsBatch
+from src.scheduler import RetryLater, RetryScheduler
+from src.series import ContributorWeeks
 
 
 class API(ABC):
@@ -60,97 +73,724 @@ class GitHubParser(Parser):
 
     Наследует функциональность от абстрактного класса API.
     """
+    per_page = 100
+    stream_chunk_size = 64 * 1024
+    #  Пауза перед повтором после вторичного лимита (403 без Retry-After при оставшихся токенах)
+    secondary_rate_limit_delay = 60.0
+    #  GraphQL отдает не больше 100 узлов на страницу соединения
+    graphql_page_size = 100
+    #  Сколько раз выполнять запрос GraphQL, упирающийся в лимит, прежде чем сдаться
+    graphql_max_attempts = 5
+    #  rateLimit не расходует баллы и возвращает стоимость самого запроса
+    repos_query = """
+        query($login: String!, $first: Int!, $after: String) {
+          rateLimit { limit cost remaining resetAt }
+          repositoryOwner(login: $login) {
+            repositories(first: $first, after: $after, ownerAffiliations: OWNER,
+                         orderBy: {field: NAME, direction: ASC}) {
+              pageInfo { hasNextPage endCursor }
+              nodes {
+                name
+                nameWithOwner
+                pushedAt
+                isFork
+                isArchived
+                isEmpty
+                defaultBranchRef { target { ... on Commit { history { totalCount } } } }
+                mentionableUsers { totalCount }
+              }
+            }
+          }
+        }
+    """
 
-    def __init__(self, api_key: str | Path, url=None, headers=None) -> None:
+    def __init__(self, api_key: str | Path | Sequence[str], url=None, headers=None, max_workers: int = 8,
+                 cache_dir: str | Path | None = None, retry_deadline: float = 600.0,
+                 metrics: Metrics | None = None, stream_json: bool = True, graphql: bool = False,
+                 graphql_url: str | None = None) -> None:
         """
         Конструктор класса GitHubParser, который наследует функциональность от
         родительского класса Parser.
         Args:
-            api_key(str | Path): API_KEY
+            api_key(str | Path | Sequence[str]): API_KEY или список токенов; запросы распределяются
+            между токенами с учетом остатка лимита каждого из них
+            url(str): базовый url API GitHub
+            headers(dict[str, Any]): заголовки запросов
+            max_workers(int): максимальное количество одновременных запросов к API
+            cache_dir(str | Path | None): директория персистентного кэша ответов (None - без кэша)
+            retry_deadline(float): сколько секунд повторять запрос одного репозитория, вернувший 202
+            или лимит запросов (отсчитывается от первого такого ответа)
+            metrics(Metrics | None): реестр метрик (по умолчанию - собственный)
+            stream_json(bool): разбирать ответы /stats/contributors потоком, если установлен ijson
+            и кэш выключен (пиковая память в несколько раз ниже, разбор медленнее);
+            иначе тело разбирается целиком через orjson (если установлен) или json
+            graphql(bool): получать список репозиториев с метаданными (pushed_at, число коммитов
+            ветки по умолчанию) через GraphQL по graphql_page_size репозиториев за запрос;
+            статистика запрашивается только для репозиториев, где есть коммиты
+            graphql_url(str | None): эндпоинт GraphQL (по умолчанию - {url}/graphql)
         """
-        super().__init__(url, headers)
-
         if url is None:
-            self.__url = "https://api.github.com"
-        self.__api_key = api_key
+            url = "https://api.github.com"
+        tokens = [str(api_key)] if isinstance(api_key, (str, Path)) else list(api_key)
         if headers is None:
-            self.__headers = {
+            headers = {
                 "Accept": "application/vnd.github+json",
-                "Authorization": f"Bearer {api_key}"
+                "Authorization": f"Bearer {tokens[0]}"
             }
+        super().__init__(url, headers)
+
+        if max_workers < 1:
+            raise ValueError("Количество одновременных запросов должно быть положительным числом.")
+        self.__api_key = api_key
+        self.__tokens = TokenPool(tokens)
+        #  У GraphQL отдельный лимит в баллах стоимости запросов - учитывается отдельным пулом
+        self.__graphql_tokens = TokenPool(tokens)
+        self.__graphql = graphql
+        self.__graphql_url = graphql_url if graphql_url is not None else f"{url}/graphql"
+        self.__max_workers = max_workers
+        self.__cache = ResponseCache(cache_dir) if cache_dir is not None else None
+        self.__retry_deadline = retry_deadline
+        self.__unresolved_repos: list[tuple[str, str]] = []
+        self.__metrics = metrics if metrics is not None else Metrics()
+        #  Кэшу нужно тело ответа целиком, поэтому потоковый разбор возможен только без кэша
+        self.__stream_json = stream_json and STREAMING and self.__cache is None
+
+        #  Общий пул keep-alive соединений для всех потоков
+        self.__session = requests.Session()
+        self.__session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, pool_block=True)
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
 
     @property
     def api_key(self):
         return self.__api_key
 
+    @property
+    def max_workers(self):
+        return self.__max_workers
+
+    @property
+    def cache(self):
+        return self.__cache
+
+    @property
+    def tokens(self):
+        return self.__tokens
+
+    @property
+    def metrics(self):
+        return self.__metrics
+
+    @property
+    def graphql(self):
+        return self.__graphql
+
+    @property
+    def graphql_tokens(self):
+        return self.__graphql_tokens
+
+    @property
+    def unresolved_repos(self):
+        """Репозитории (владелец, имя), статистику которых не удалось получить: ошибка API или дедлайн повторов."""
+        return self.__unresolved_repos
+
+    def _get(self, url: str, params: dict[str, Any] | None = None, block: bool = True,
+             stream: bool = False) -> requests.Response:
+        """
+        Выполняет GET-запрос через общий пул соединений токеном с наибольшим остатком лимита.
+
+        Если включен кэш, запрос отправляется условным (If-None-Match / If-Modified-Since),
+        и ответ 304 Not Modified подменяется сохраненным ответом. Ответы 304 не расходуют
+        лимит запросов GitHub.
+        Args:
+            url(str): url запроса
+            params(dict[str, Any] | None): параметры запроса
+            block(bool): ждать сброса лимита, если все токены исчерпаны; иначе выбросить RetryLater
+            stream(bool): не загружать тело ответа сразу (только без кэша: кэшу нужно тело целиком);
+            ответ нужно закрыть после чтения
+        Returns:
+            requests.Response: ответ сервера или ответ из кэша.
+        """
+        endpoint = self._endpoint(url)
+        with self.__metrics.timer("github_token_wait_seconds"):
+            token = self.__tokens.acquire(block=block)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        if self.__cache is None:
+            response = self._send(endpoint, url, params=params, headers=headers, stream=stream)
+            self.__tokens.update(token, response.headers)
+            return response
+
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        entry = self.__cache.get(full_url)
+        headers.update(self.__cache.conditional_headers(entry))
+        response = self._send(endpoint, full_url, headers=headers)
+        self.__tokens.update(token, response.headers)
+
+        if response.status_code == 304 and entry is not None:
+            self.__cache.record(hit=True)
+            self.__metrics.inc("github_cache_total", endpoint=endpoint, result="hit")
+            return self.__cache.to_response(full_url, entry)
+
+        self.__cache.record(hit=False)
+        self.__metrics.inc("github_cache_total", endpoint=endpoint, result="miss")
+        self.__cache.put(full_url, response)
+        return response
+
+    def _send(self, endpoint: str, url: str, method: str = "GET", **kwargs: Any) -> requests.Response:
+        """
+        Отправляет запрос через общую сессию, учитывая его длительность, статус и объем ответа в метриках.
+        """
+        started = time.perf_counter()
+        response = self.__session.request(method, url, **kwargs)
+        status = response.status_code
+        self.__metrics.observe("github_request_seconds", time.perf_counter() - started,
+                               endpoint=endpoint, status=status)
+        self.__metrics.inc("github_requests_total", endpoint=endpoint, status=status)
+        if not kwargs.get("stream"):
+            #  Объем потокового ответа учитывается при его чтении
+            self.__metrics.inc("github_response_bytes_total", len(response.content), endpoint=endpoint)
+        return response
+
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """Определяет метку эндпоинта для метрик по url запроса."""
+        path = urlparse(url).path
+        if path.endswith("/stats/contributors"):
+            return "stats_contributors"
+        if path.startswith("/users/") and path.endswith("/repos"):
+            return "user_repos"
+        if path.endswith("/graphql"):
+            return "graphql"
+        return "other"
+
+    def _decode(self, response: requests.Response) -> Any:
+        """Разбирает JSON ответа, учитывая время разбора в метриках."""
+        with self.__metrics.timer("github_json_decode_seconds", endpoint=self._endpoint(response.url)):
+            return loads(response.content)
+
     def get_repos_stats(self, username: str) -> list[dict[str, Any]]:
         """
-        Собирает статистику по репозиториям заданного пользователя на GitHub
+        Собирает статистику по репозиториям заданного пользователя на GitHub.
+
+        Статистика по репозиториям запрашивается параллельно (не более max_workers
+        запросов одновременно), порядок результатов совпадает с порядком репозиториев.
         Args:
             username(str): данные по пользователю,
             статистику по репозиториям которого будем получать
         Returns:
             list[dict[str, Any]]: список словарей, содержащих статистику по каждому репозиторию.
         """
-        repos_stats = []
+        return list(self.iter_repos_stats(username))
 
-        #  Получаем список репозиториев пользователя
-        url = f"{self.__url}/users/{username}/repos"
+    def get_repos_batch(self, username: str) -> StatsBatch:
+        """
+        Собирает статистику по репозиториям пользователя в один пакет StatsBatch
+        (компактная замена get_repos_stats для записи в БД).
+        Args:
+            username(str): пользователь GitHub
+        Returns:
+            StatsBatch: пакет строк статистики по всем репозиториям пользователя.
+        """
+        batch = StatsBatch()
+        for repo, repo_stats in self._iter_repo_results(username, self._get_repo_stats):
+            if repo_stats:
+                batch.extend(repo_stats)
+        return batch
 
-        try:
+    def iter_repos(self, username: str) -> Iterator[dict[str, Any]]:
+        """
+        Постранично получает список репозиториев пользователя, следуя заголовкам
+        Link: rel="next", и отдает репозитории по одному по мере получения страниц.
+        В режиме graphql список получается через iter_repos_metadata.
+        Args:
+            username(str): пользователь GitHub
+        Returns:
+            Iterator[dict[str, Any]]: генератор словарей с данными репозиториев.
+        """
+        if self.__graphql:
+            yield from self.iter_repos_metadata(username)
+            return
+
+        url = f"{self.url}/users/{username}/repos"
+        params = {"per_page": self.per_page}
 
-            response = requests.get(url, headers=self.headers)
+        while url:
+            response = self._get(url, params=params)
             response.raise_for_status()
-            repos = response.json()
-
-            for repo in repos:
-
-                repo_name = repo['name']
-                repo_url = f"https://api.github.com/repos/{username}/{repo_name}/stats/contributors"
-                repo_response = requests.get(repo_url, headers=self.headers)
-
-                try:
-                    repo_response.raise_for_status()
-                    if repo_response.text:
-
-                        contributors = repo_response.json()
-
-                        for contributor in contributors:
-                            if isinstance(contributor, dict) and "author" in contributor:
-                                contributor_name = contributor.get("author", {}).get("login", "Unknown contributor")
-                                total_commits = contributor.get("total", 0)
-                                if contributor["weeks"]:
-                                    weekly_timestamp = contributor["weeks"][0].get("w")
-                                    weekly_lines_added = contributor["weeks"][0].get("a")
-                                    weekly_lines_deleted = contributor["weeks"][0].get("d")
-                                    weekly_commit_count = contributor["weeks"][0].get("c")
-
-                                    repo_stats = {
-                                        "repo_name": repo_name,
-                                        "repo_url": repo_url,
-                                        "contributor_name": contributor_name,
-                                        "total_commits": total_commits,
-                                        "weekly_timestamp": weekly_timestamp,
-                                        "weekly_lines_added": weekly_lines_added,
-                                        "weekly_lines_deleted": weekly_lines_deleted,
-                                        "weekly_commit_count": weekly_commit_count
-                                    }
-                                    repos_stats.append(repo_stats)
-                                else:
-                                    print(f"No weekly data for contributor {contributor_name}")
-                    else:
-                        print(f"Получен пустой ответ для репозитория {repo_name}")
-                except requests.HTTPError as e:
-                    if repo_response.status_code == 403 and "rate limit exceeded" in str(e):
-                        print("Достигнут лимит запросов. Ожидание 60 секунд...")
-                        time.sleep(60)  # Ждем 60 секунд перед повторной попыткой
+            yield from self._decode(response)
+
+            #  Ссылка на следующую страницу уже содержит все параметры запроса
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+    def iter_repos_metadata(self, username: str) -> Iterator[dict[str, Any]]:
+        """
+        Получает репозитории пользователя с метаданными через GraphQL: до graphql_page_size
+        репозиториев за запрос, следующая страница - по курсору endCursor.
+
+        Стоимость каждого запроса (rateLimit.cost) учитывается в метрике github_graphql_cost_total,
+        а остаток баллов - в пуле graphql_tokens.
+        Args:
+            username(str): пользователь или организация GitHub
+        Returns:
+            Iterator[dict[str, Any]]: репозитории с ключами name, full_name, pushed_at, fork, archived,
+            is_empty, default_branch_commits, mentionable_users (в формате списка REST, см. needs_stats).
+        Raises:
+            requests.HTTPError: ошибка HTTP или GraphQL (например, пользователь не найден).
+        """
+        variables = {"login": username, "first": self.graphql_page_size, "after": None}
+        while True:
+            data = self._graphql(self.repos_query, variables)
+            owner = data.get("repositoryOwner")
+            if owner is None:
+                raise requests.HTTPError(f"пользователь или организация {username} не найдены")
+
+            repositories = owner["repositories"]
+            for node in repositories["nodes"]:
+                yield self._repo_metadata(username, node)
+
+            page_info = repositories["pageInfo"]
+            if not page_info["hasNextPage"]:
+                break
+            variables["after"] = page_info["endCursor"]
+
+    @staticmethod
+    def _repo_metadata(username: str, node: dict[str, Any]) -> dict[str, Any]:
+        """Приводит узел Repository из GraphQL к словарю в формате списка репозиториев REST."""
+        history = (((node.get("defaultBranchRef") or {}).get("target")) or {}).get("history")
+        return {
+            "name": node["name"],
+            "full_name": node.get("nameWithOwner") or f"{username}/{node['name']}",
+            "pushed_at": node.get("pushedAt"),
+            "fork": node.get("isFork", False),
+            "archived": node.get("isArchived", False),
+            "is_empty": node.get("isEmpty", False),
+            #  Нет ветки по умолчанию - нет и коммитов
+            "default_branch_commits": history["totalCount"] if history else 0,
+            #  Точного числа контрибьюторов в GraphQL нет: mentionableUsers - оценка сверху
+            "mentionable_users": (node.get("mentionableUsers") or {}).get("totalCount"),
+        }
+
+    @staticmethod
+    def needs_stats(repo: dict[str, Any]) -> bool:
+        """
+        Нужен ли запрос /stats/contributors для репозитория: по метаданным GraphQL пустые
+        репозитории и репозитории без коммитов в ветке по умолчанию пропускаются
+        (у репозиториев из списка REST этих ключей нет - статистика запрашивается всегда).
+        """
+        return not repo.get("is_empty") and repo.get("default_branch_commits") != 0
+
+    def _graphql(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        """
+        Выполняет запрос GraphQL токеном с наибольшим остатком баллов.
+
+        При превышении лимита (403/429 или ошибка RATE_LIMITED) ждет и повторяет запрос: до сброса
+        лимита, по Retry-After или с экспоненциальной задержкой RetryScheduler - не более
+        graphql_max_attempts попыток и не дольше retry_deadline.
+        Args:
+            query(str): текст запроса
+            variables(dict[str, Any]): переменные запроса
+        Returns:
+            dict[str, Any]: поле data ответа.
+        Raises:
+            requests.HTTPError: ошибка HTTP, ошибки GraphQL в ответе или лимит не сброшен за отведенные попытки.
+        """
+        scheduler = RetryScheduler(deadline=self.__retry_deadline)
+
+        def backoff(response: requests.Response | None, reason: str, delay: float | None) -> None:
+            """Ждет перед повтором запроса или выбрасывает HTTPError, если попытки исчерпаны."""
+            self.__metrics.inc("github_retries_total")
+            if scheduler.attempts(query) + 1 >= self.graphql_max_attempts \
+                    or not scheduler.park(query, query, delay):
+                raise requests.HTTPError(f"ошибка GraphQL: {reason}, попытки повтора исчерпаны",
+                                         response=response)
+            time.sleep(scheduler.next_delay())
+            scheduler.pop_ready()
+
+        while True:
+            try:
+                with self.__metrics.timer("github_token_wait_seconds"):
+                    token = self.__graphql_tokens.acquire(block=False)
+            except RetryLater as e:
+                #  Баллы всех токенов исчерпаны: ожидание сброса тоже ограничено попытками и дедлайном
+                backoff(None, str(e), e.delay)
+                continue
+            response = self._send("graphql", self.__graphql_url, method="POST",
+                                  json={"query": query, "variables": variables},
+                                  headers={"Authorization": f"Bearer {token}"})
+            self.__graphql_tokens.update(token, response.headers)
+            try:
+                self._check_rate_limit(response, self.__graphql_tokens)
+            except RetryLater as e:
+                backoff(response, str(e), e.delay)
+                continue
+            response.raise_for_status()
+
+            body = self._decode(response)
+            data = body.get("data") or {}
+            if data.get("rateLimit"):
+                self._record_graphql_cost(token, data["rateLimit"])
+
+            errors = body.get("errors")
+            if errors and any(error.get("type") == "RATE_LIMITED" for error in errors):
+                self.__metrics.inc("github_rate_limited_total", status="graphql")
+                print("Достигнут лимит запросов GraphQL, ожидание сброса лимита.")
+                #  Пока пул считает баллы доступными, wait_time() равно 0 - тогда нужна экспоненциальная задержка
+                backoff(response, "достигнут лимит запросов", self.__graphql_tokens.wait_time() or None)
+                continue
+            if errors:
+                messages = "; ".join(error.get("message", str(error)) for error in errors)
+                raise requests.HTTPError(f"ошибка GraphQL: {messages}", response=response)
+            return data
+
+    def _record_graphql_cost(self, token: str, rate_limit: dict[str, Any]) -> None:
+        """
+        Учитывает стоимость запроса GraphQL и обновляет остаток баллов токена по полю rateLimit.
+        """
+        self.__metrics.inc("github_graphql_cost_total", rate_limit.get("cost", 0))
+        self.__metrics.set("github_graphql_remaining", rate_limit.get("remaining", 0))
+        headers = {"X-RateLimit-Remaining": str(rate_limit.get("remaining", 0))}
+        if rate_limit.get("limit"):
+            headers["X-RateLimit-Limit"] = str(rate_limit["limit"])
+        if rate_limit.get("resetAt"):
+            reset = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00")).timestamp()
+            headers["X-RateLimit-Reset"] = str(int(reset))
+        self.__graphql_tokens.update(token, headers)
+
+    def iter_repos_stats(self, username: str) -> Iterator[dict[str, Any]]:
+        """
+        Лениво собирает статистику по репозиториям пользователя.
+
+        Запросы статистики начинают выполняться, пока список репозиториев еще загружается;
+        строки отдаются в порядке репозиториев.
+        Args:
+            username(str): пользователь GitHub
+        Returns:
+            Iterator[dict[str, Any]]: генератор словарей со статистикой по контрибьюторам.
+        """
+        for repo, repo_stats in self._iter_repo_results(username, self._get_repo_stats):
+            if repo_stats:
+                yield from repo_stats.to_dicts()
+
+    def iter_repo_data(self, username: str, repos: Iterable[dict[str, Any]] | None = None, ordered: bool = True
+                       ) -> Iterator[tuple[dict[str, Any], StatsBatch, list[ContributorWeeks]]]:
+        """
+        Лениво собирает статистику и полные недельные ряды контрибьюторов по репозиториям пользователя.
+
+        Args:
+            username(str): пользователь GitHub
+            repos(Iterable[dict[str, Any]] | None): репозитории для обработки
+            (по умолчанию - все репозитории пользователя)
+            ordered(bool): отдавать в порядке репозиториев (False - по мере готовности, без ожидания
+            отложенных репозиториев)
+        Returns:
+            Iterator[tuple]: генератор троек (репозиторий, пакет строк статистики StatsBatch, недельные ряды).
+            Репозитории, не обработанные до дедлайна повторов или из-за ошибки API,
+            пропускаются и попадают в unresolved_repos.
+        """
+        for repo, repo_data in self._iter_repo_results(username, self._get_repo_data, repos, ordered):
+            if repo_data is None:
+                continue
+            repo_stats, repo_weeks = repo_data
+            yield repo, repo_stats, repo_weeks
+
+    def iter_repo_payloads(self, username: str, repos: Iterable[dict[str, Any]] | None = None,
+                           ordered: bool = True) -> Iterator[tuple[dict[str, Any], list[ContributorPayload]]]:
+        """
+        Лениво получает необработанные ответы /stats/contributors по репозиториям пользователя
+        (для разбора отдельной стадией через parse_contributors).
+
+        Args:
+            username(str): пользователь GitHub
+            repos(Iterable[dict[str, Any]] | None): репозитории для обработки
+            (по умолчанию - все репозитории пользователя)
+            ordered(bool): отдавать в порядке репозиториев (False - по мере готовности)
+        Returns:
+            Iterator[tuple]: генератор пар (репозиторий, список ContributorPayload).
+            Репозитории, не обработанные до дедлайна повторов или из-за ошибки API, пропускаются.
+        """
+        for repo, contributors in self._iter_repo_results(username, self._get_contributors, repos, ordered):
+            if contributors is not None:
+                yield repo, contributors
+
+    def _iter_repo_results(self, username: str, fetch: Callable[..., Any],
+                           repos: Iterable[dict[str, Any]] | None = None,
+                           ordered: bool = True) -> Iterator[tuple[dict[str, Any], Any]]:
+        """
+        Выполняет fetch(username, repo_name) для каждого репозитория пользователя в пуле потоков
+        и отдает пары (репозиторий, результат) в порядке репозиториев или по мере готовности.
+
+        В обработке одновременно находится не более 2 * max_workers репозиториев, включая
+        отложенные и готовые, но ожидающие отдачи по порядку. Если fetch выбрасывает
+        RetryLater (202 или лимит запросов), репозиторий откладывается в RetryScheduler,
+        а пул продолжает обрабатывать остальные репозитории. Репозитории, не обработанные
+        до дедлайна или завершившиеся ошибкой запроса, попадают в unresolved_repos,
+        а их результатом становится None.
+        Для репозиториев, которым статистика не нужна (см. needs_stats), fetch вызывается
+        с fetch_stats=False сразу, без запроса к API.
+        Args:
+            username(str): пользователь GitHub
+            fetch(Callable[..., Any]): функция получения данных по одному репозиторию
+            repos(Iterable[dict[str, Any]] | None): репозитории для обработки
+            (по умолчанию - все репозитории пользователя)
+            ordered(bool): отдавать в порядке репозиториев; при False отложенный репозиторий
+            не задерживает отдачу следующих за ним
+        Returns:
+            Iterator[tuple[dict[str, Any], Any]]: генератор пар (репозиторий, результат).
+        """
+        executor = ThreadPoolExecutor(max_workers=self.__max_workers)
+        scheduler = RetryScheduler(deadline=self.__retry_deadline)
+        repos = enumerate(self.iter_repos(username) if repos is None else repos)
+        listing_done = False
+        listed: dict[int, dict[str, Any]] = {}
+        results: dict[int, Any] = {}
+        running = {}
+        next_index = 0
+
+        def submit(index: int) -> None:
+            future = executor.submit(fetch, username, listed[index]["name"])
+            running[future] = index
+
+        try:
+            while True:
+                for index in scheduler.pop_ready():
+                    submit(index)
+
+                #  Окно ограничивает все полученные, но еще не отданные репозитории: выполняемые,
+                #  отложенные и готовые, но ждущие отдачи по порядку. Иначе один отложенный
+                #  репозиторий в голове заставил бы буферизовать весь аккаунт
+                while not listing_done and len(listed) < 2 * self.__max_workers:
+                    try:
+                        index, repo = next(repos)
+                    except StopIteration:
+                        listing_done = True
                     else:
+                        listed[index] = repo
+                        if self.needs_stats(repo):
+                            submit(index)
+                        else:
+                            results[index] = fetch(username, repo["name"], fetch_stats=False)
+
+                if ordered:
+                    while next_index in results:
+                        yield listed.pop(next_index), results.pop(next_index)
+                        next_index += 1
+                else:
+                    for index in list(results):
+                        yield listed.pop(index), results.pop(index)
+
+                if listing_done and not running and not len(scheduler):
+                    break
+
+                if not running:
+                    if len(scheduler):
+                        #  Остались только отложенные репозитории - ждем ближайшего повтора
+                        time.sleep(scheduler.next_delay())
+                    #  Иначе окно освободилось после отдачи результатов - продолжаем получать список
+                    continue
+
+                done, _ = wait(running, timeout=scheduler.next_delay(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except RetryLater as e:
+                        self.__metrics.inc("github_retries_total")
+                        if e.delay:
+                            self.__metrics.observe("github_retry_delay_seconds", e.delay)
+                        if not scheduler.park(index, index, e.delay):
+                            repo_name = listed[index]["name"]
+                            print(f"Не удалось получить статистику репозитория {repo_name} до дедлайна: {e}")
+                            self.__unresolved_repos.append((username, repo_name))
+                            self.__metrics.inc("github_unresolved_total")
+                            results[index] = None
+                    except requests.RequestException as e:
+                        #  Ошибку одного репозитория не выдаем за пустую статистику: он попадает
+                        #  в unresolved_repos и будет запрошен снова при следующем запуске
+                        repo_name = listed[index]["name"]
                         print(f"Ошибка при получении статистических данных {repo_name}: {e}")
+                        self.__unresolved_repos.append((username, repo_name))
+                        self.__metrics.inc("github_fetch_errors_total")
+                        results[index] = None
 
         except requests.HTTPError as e:
             print(f"Ошибка при обращении к репозиториям пользователя {username}: {e}")
 
-        return repos_stats
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_repo_stats(self, username: str, repo_name: str, fetch_stats: bool = True) -> StatsBatch:
+        """
+        Собирает статистику по контрибьюторам одного репозитория.
+        Args:
+            username(str): владелец репозитория
+            repo_name(str): наименование репозитория
+            fetch_stats(bool): запрашивать ли статистику (False - пустой результат без запроса)
+        Returns:
+            StatsBatch: пакет строк статистики по контрибьюторам репозитория.
+        Raises:
+            RetryLater: статистика еще вычисляется (202) или исчерпан лимит запросов.
+        """
+        return self._get_repo_data(username, repo_name, with_weeks=False, fetch_stats=fetch_stats)[0]
+
+    def _get_repo_data(self, username: str, repo_name: str, with_weeks: bool = True,
+                       fetch_stats: bool = True) -> tuple[StatsBatch, list[ContributorWeeks]]:
+        """
+        Собирает статистику и недельные ряды контрибьюторов одного репозитория за один запрос.
+        Args:
+            username(str): владелец репозитория
+            repo_name(str): наименование репозитория
+            with_weeks(bool): собирать ли полные недельные ряды
+            fetch_stats(bool): запрашивать ли статистику (False - пустой результат без запроса)
+        Returns:
+            tuple: (пакет строк статистики StatsBatch, список недельных рядов ContributorWeeks).
+        Raises:
+            RetryLater: статистика еще вычисляется (202) или исчерпан лимит запросов.
+        """
+        contributors = self._get_contributors(username, repo_name, fetch_stats)
+        return self.parse_contributors(username, repo_name, contributors, with_weeks)
+
+    def _get_contributors(self, username: str, repo_name: str, fetch_stats: bool = True) -> list[ContributorPayload]:
+        """
+        Получает ответ /stats/contributors одного репозитория, сокращенный до нужных полей.
+
+        В режиме stream_json тело ответа читается потоком и разбирается по мере получения
+        (см. json_stream.stream_contributors).
+        Args:
+            username(str): владелец репозитория
+            repo_name(str): наименование репозитория
+            fetch_stats(bool): запрашивать ли статистику (False - пустой список без запроса)
+        Returns:
+            list[ContributorPayload]: контрибьюторы.
+        Raises:
+            RetryLater: статистика еще вычисляется (202) или исчерпан лимит запросов.
+            requests.HTTPError: ошибка API (4xx, 5xx) или пустое тело ответа 200.
+        """
+        if not fetch_stats:
+            self.__metrics.inc("github_stats_skipped_total")
+            return []
+
+        repo_url = self._stats_url(username, repo_name)
+        repo_response = self._get(repo_url, block=False, stream=self.__stream_json)
+
+        try:
+            if repo_response.status_code == 202:
+                self.__metrics.inc("github_accepted_total")
+                raise RetryLater(f"статистика репозитория {repo_name} еще вычисляется")
+            self._check_rate_limit(repo_response)
+            if repo_response.status_code == 204:
+                #  Репозиторий без коммитов: статистики нет
+                return []
+
+            repo_response.raise_for_status()
+            contributors = self._decode_contributors(repo_response)
+            if contributors is None:
+                raise requests.HTTPError(f"получен пустой ответ для репозитория {repo_name}",
+                                         response=repo_response)
+            return contributors
+        finally:
+            repo_response.close()
+
+    def _decode_contributors(self, response: requests.Response) -> list[ContributorPayload] | None:
+        """
+        Разбирает ответ /stats/contributors: потоком, если тело еще не загружено, иначе целиком.
+
+        Returns:
+            list[ContributorPayload] | None: контрибьюторы или None, если тело ответа пустое.
+        """
+        endpoint = "stats_contributors"
+        if not self.__stream_json:
+            #  Тело уже загружено (ответ сервера или из кэша)
+            if not response.content.strip():
+                return None
+            with self.__metrics.timer("github_json_decode_seconds", endpoint=endpoint):
+                return decode_contributors(response.content)
+
+        chunks = response.iter_content(chunk_size=self.stream_chunk_size)
+        first = next(chunks, b"")
+        if not first.strip():
+            return None
+        with self.__metrics.timer("github_stream_decode_seconds", endpoint=endpoint):
+            contributors, nbytes = stream_contributors(chain([first], chunks))
+        self.__metrics.inc("github_response_bytes_total", nbytes, endpoint=endpoint)
+        return contributors
+
+    def _stats_url(self, username: str, repo_name: str) -> str:
+        """Формирует url статистики контрибьюторов репозитория."""
+        return f"{self.url}/repos/{username}/{repo_name}/stats/contributors"
+
+    def parse_contributors(self, username: str, repo_name: str,
+                           contributors: Iterable[ContributorPayload | dict[str, Any]],
+                           with_weeks: bool = True) -> tuple[StatsBatch, list[ContributorWeeks]]:
+        """
+        Преобразует ответ /stats/contributors в строки статистики и недельные ряды.
+
+        Наименование и url репозитория хранятся в пакете один раз, а не в каждой строке.
+        Args:
+            username(str): владелец репозитория
+            repo_name(str): наименование репозитория
+            contributors(Iterable[ContributorPayload | dict[str, Any]]): контрибьюторы из _get_contributors
+            или в формате GitHub
+            with_weeks(bool): собирать ли полные недельные ряды
+        Returns:
+            tuple: (пакет строк статистики StatsBatch, список недельных рядов ContributorWeeks).
+        """
+        repo_stats = StatsBatch()
+        repo_weeks_list = []
+        repo = repo_stats.add_repo(repo_name, self._stats_url(username, repo_name))
+
+        for contributor in contributors:
+            if isinstance(contributor, dict):
+                if "author" not in contributor:
+                    continue
+                contributor = ContributorPayload.from_dict(contributor)
+            elif not isinstance(contributor, ContributorPayload):
+                continue
+
+            contributor_name = contributor.login or "Unknown contributor"
+            if len(contributor):
+                repo_stats.append(repo, contributor_name, contributor.total, *contributor.first_week())
+                if with_weeks:
+                    repo_weeks_list.append(contributor.series(repo.repo_name, repo.repo_url, contributor_name))
+            else:
+                print(f"No weekly data for contributor {contributor_name}")
+
+        return repo_stats, repo_weeks_list
+
+    def _check_rate_limit(self, response: requests.Response, tokens: TokenPool | None = None) -> None:
+        """
+        Проверяет, не исчерпан ли лимит запросов.
+
+        Args:
+            response(requests.Response): ответ сервера
+            tokens(TokenPool | None): пул токенов, которым выполнен запрос (по умолчанию - пул REST)
+        Raises:
+            RetryLater: лимит исчерпан; delay - время до появления свободного токена
+                (при вторичном лимите без Retry-After - не меньше secondary_rate_limit_delay).
+        """
+        if response.status_code not in (403, 429):
+            return
+        exhausted = response.headers.get("X-RateLimit-Remaining") == "0"
+        if response.status_code == 403 and not exhausted and "rate limit" not in response.text.lower():
+            return
+
+        if "Retry-After" in response.headers:
+            delay = float(response.headers["Retry-After"])
+        elif exhausted:
+            delay = (tokens or self.__tokens).wait_time()
+        else:
+            #  Вторичный лимит: токены еще не исчерпаны и wait_time() вернет 0,
+            #  а GitHub рекомендует подождать не меньше минуты
+            delay = self.secondary_rate_limit_delay
+        self.__metrics.inc("github_rate_limited_total", status=response.status_code)
+        print("Достигнут лимит запросов, запрос будет повторен позже.")
+        raise RetryLater("достигнут лимит запросов", delay)
+
+    def close(self) -> None:
+        """Закрывает пул HTTP-соединений."""
+        self.__session.close()
 
 
 if __name__ == '__main__':
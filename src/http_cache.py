@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseCache:
+    """
+    Представляет персистентный кэш HTTP-ответов на диске для условных запросов
+    (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+
+    Каждая запись хранится в двух файлах: <key>.meta.json с валидаторами и заголовками
+    и <key>.body с телом ответа. Ключ записи - sha256 от полного url запроса.
+    Записи вытесняются по давности использования при превышении max_bytes
+    и удаляются при обращении, если они старше max_age секунд.
+    """
+    stored_headers = ("ETag", "Last-Modified", "Link", "Content-Type")
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 256 * 1024 * 1024,
+                 max_age: float | None = 7 * 24 * 60 * 60) -> None:
+        """
+        Конструктор класса ResponseCache.
+
+        Args:
+            cache_dir(str | Path): директория для хранения кэша
+            max_bytes(int): максимальный суммарный размер тел ответов в кэше, байт
+            max_age(float | None): максимальный возраст записи в секундах (None - без ограничения)
+        """
+        self.__dir = Path(cache_dir)
+        self.__dir.mkdir(parents=True, exist_ok=True)
+        self.__max_bytes = max_bytes
+        self.__max_age = max_age
+        self.__lock = threading.Lock()
+
+        #  Индекс записей: ключ -> размер тела, от давно использованных к недавним
+        self.__index: OrderedDict[str, int] = OrderedDict()
+        self.__size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        meta_files = sorted(self.__dir.glob("*.meta.json"), key=lambda path: path.stat().st_mtime)
+        for meta_file in meta_files:
+            key = meta_file.name.removesuffix(".meta.json")
+            body_file = self.__dir / f"{key}.body"
+            if body_file.exists():
+                size = body_file.stat().st_size
+                self.__index[key] = size
+                self.__size += size
+            else:
+                meta_file.unlink(missing_ok=True)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        """
+        Возвращает запись кэша для url или None, если записи нет или она устарела.
+
+        Args:
+            url(str): полный url запроса
+        Returns:
+            dict[str, Any] | None: словарь с ключами "headers", "stored_at" и "body".
+        """
+        key = self._key(url)
+        with self.__lock:
+            if key not in self.__index:
+                return None
+            try:
+                meta = json.loads((self.__dir / f"{key}.meta.json").read_text(encoding="utf-8"))
+                body = (self.__dir / f"{key}.body").read_bytes()
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+
+            if self.__max_age is not None and time.time() - meta["stored_at"] > self.__max_age:
+                self._remove(key)
+                return None
+
+            self.__index.move_to_end(key)
+            meta["body"] = body
+            return meta
+
+    @staticmethod
+    def conditional_headers(entry: dict[str, Any] | None) -> dict[str, str]:
+        """
+        Формирует заголовки условного запроса по сохраненным валидаторам.
+
+        Args:
+            entry(dict[str, Any] | None): запись кэша
+        Returns:
+            dict[str, str]: заголовки If-None-Match / If-Modified-Since.
+        """
+        if entry is None:
+            return {}
+        headers = {}
+        if "ETag" in entry["headers"]:
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if "Last-Modified" in entry["headers"]:
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def put(self, url: str, response: requests.Response) -> None:
+        """
+        Сохраняет успешный ответ с валидаторами в кэш.
+
+        Args:
+            url(str): полный url запроса
+            response(requests.Response): ответ сервера
+        """
+        if response.status_code != 200:
+            return
+        if "ETag" not in response.headers and "Last-Modified" not in response.headers:
+            return
+
+        key = self._key(url)
+        body = response.content
+        meta = {
+            "url": url,
+            "stored_at": time.time(),
+            "headers": {name: response.headers[name] for name in self.stored_headers if name in response.headers},
+        }
+
+        with self.__lock:
+            #  Пишем во временные файлы и атомарно подменяем, чтобы не оставить битую запись
+            body_tmp = self.__dir / f"{key}.body.tmp"
+            meta_tmp = self.__dir / f"{key}.meta.json.tmp"
+            body_tmp.write_bytes(body)
+            meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(body_tmp, self.__dir / f"{key}.body")
+            os.replace(meta_tmp, self.__dir / f"{key}.meta.json")
+
+            self.__size -= self.__index.pop(key, 0)
+            self.__index[key] = len(body)
+            self.__size += len(body)
+
+            while self.__size > self.__max_bytes and len(self.__index) > 1:
+                oldest_key = next(iter(self.__index))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Удаляет запись кэша. Вызывается под блокировкой."""
+        self.__size -= self.__index.pop(key, 0)
+        (self.__dir / f"{key}.meta.json").unlink(missing_ok=True)
+        (self.__dir / f"{key}.body").unlink(missing_ok=True)
+
+    @staticmethod
+    def to_response(url: str, entry: dict[str, Any]) -> requests.Response:
+        """
+        Собирает объект requests.Response из записи кэша.
+
+        Args:
+            url(str): полный url запроса
+            entry(dict[str, Any]): запись кэша
+        Returns:
+            requests.Response: ответ со статусом 200 и сохраненным телом.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        return response
+
+    def record(self, hit: bool) -> None:
+        """Учитывает попадание или промах кэша."""
+        with self.__lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Статистика кэша: попадания, промахи, доля попаданий, размер."""
+        with self.__lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.__index),
+                "bytes": self.__size,
+            }
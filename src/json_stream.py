@@ -0,0 +1,174 @@
+import json
+from array import array
+from itertools import compress
+from operator import itemgetter, or_
+from typing import Any, Iterable
+
+from src.series import ContributorWeeks
+
+#  Необязательные ускорители: ijson (потоковый разбор, нужен компилируемый бэкенд yajl2)
+#  и orjson (быстрый разбор тела целиком). Без них используется стандартный json.
+try:
+    import ijson
+    if ijson.backend not in ("yajl2_c", "yajl2_cffi"):
+        #  Чистый Python-бэкенд ijson медленнее json.loads - потоковый разбор с ним не выгоден
+        ijson = None
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAMING = ijson is not None
+BACKEND = f"ijson ({ijson.backend})" if ijson is not None else "orjson" if orjson is not None else "json"
+
+_week_values = itemgetter("w", "a", "d", "c")
+
+
+class ContributorPayload:
+    """
+    Представляет контрибьютора из ответа /stats/contributors, сокращенного до нужных полей:
+    логин, общее количество коммитов и недели в виде четырех колонок array('q')
+    (метка недели, добавленные строки, удаленные строки, коммиты) вместо списка словарей.
+    """
+    __slots__ = ("login", "total", "timestamps", "additions", "deletions", "commits")
+
+    def __init__(self, login: str | None, total: int) -> None:
+        """
+        Конструктор класса ContributorPayload.
+
+        Args:
+            login(str | None): логин контрибьютора (None - автор удален)
+            total(int): общее количество коммитов
+        """
+        self.login = login
+        self.total = total
+        self.timestamps = array("q")
+        self.additions = array("q")
+        self.deletions = array("q")
+        self.commits = array("q")
+
+    @classmethod
+    def from_dict(cls, contributor: dict[str, Any]) -> "ContributorPayload":
+        """Сокращает контрибьютора в формате GitHub до нужных полей."""
+        payload = cls((contributor.get("author") or {}).get("login"), contributor.get("total", 0))
+        weeks = contributor.get("weeks") or ()
+        try:
+            values = list(map(_week_values, weeks))
+        except KeyError:
+            values = [(week.get("w", 0), week.get("a", 0), week.get("d", 0), week.get("c", 0)) for week in weeks]
+        if values:
+            #  Транспонирование и заполнение массивов выполняются в C, без цикла по неделям
+            timestamps, additions, deletions, commits = zip(*values)
+            payload.timestamps = array("q", timestamps)
+            payload.additions = array("q", additions)
+            payload.deletions = array("q", deletions)
+            payload.commits = array("q", commits)
+        return payload
+
+    def __len__(self) -> int:
+        """Количество недель."""
+        return len(self.timestamps)
+
+    def first_week(self) -> tuple[int, int, int, int]:
+        """Первая неделя (w, a, d, c)."""
+        return self.timestamps[0], self.additions[0], self.deletions[0], self.commits[0]
+
+    def series(self, repo_name: str, repo_url: str, contributor_name: str,
+               skip_empty: bool = True) -> ContributorWeeks:
+        """
+        Собирает недельный ряд контрибьютора (колонки передаются в ряд без копирования).
+
+        Args:
+            repo_name(str): наименование репозитория
+            repo_url(str): url статистики репозитория
+            contributor_name(str): логин контрибьютора
+            skip_empty(bool): пропускать недели без изменений и коммитов
+        Returns:
+            ContributorWeeks: недельный ряд.
+        """
+        series = ContributorWeeks(repo_name, repo_url, contributor_name)
+        columns = [self.timestamps, self.additions, self.deletions, self.commits]
+        if skip_empty:
+            #  Значения неотрицательные: неделя пустая, если a | d | c == 0
+            active = list(map(or_, map(or_, self.additions, self.deletions), self.commits))
+            if not all(active):
+                columns = [array("q", compress(column, active)) for column in columns]
+        series.timestamps, series.additions, series.deletions, series.commits = columns
+        return series
+
+    def __repr__(self) -> str:
+        return f"ContributorPayload({self.login!r}, total={self.total}, weeks={len(self)})"
+
+
+class _ChunksReader:
+    """Файлоподобный объект поверх итератора порций байт (для ijson)."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.__chunks = iter(chunks)
+        self.__pending = b""
+        self.nbytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.__pending) < size:
+            chunk = next(self.__chunks, None)
+            if chunk is None:
+                break
+            self.nbytes += len(chunk)
+            self.__pending += chunk
+        if size < 0:
+            data, self.__pending = self.__pending, b""
+        else:
+            data, self.__pending = self.__pending[:size], self.__pending[size:]
+        return data
+
+
+def loads(body: bytes | str) -> Any:
+    """Разбирает JSON целиком самым быстрым доступным бэкендом (orjson или json)."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def decode_contributors(body: bytes | str) -> list[ContributorPayload]:
+    """
+    Разбирает тело ответа /stats/contributors целиком и сокращает контрибьюторов до нужных полей.
+
+    Args:
+        body(bytes | str): тело ответа
+    Returns:
+        list[ContributorPayload]: контрибьюторы (элементы без поля author пропускаются).
+    """
+    return [
+        ContributorPayload.from_dict(contributor) for contributor in loads(body)
+        if isinstance(contributor, dict) and "author" in contributor
+    ]
+
+
+def stream_contributors(chunks: Iterable[bytes]) -> tuple[list[ContributorPayload], int]:
+    """
+    Разбирает ответ /stats/contributors по мере получения порций тела, сохраняя только нужные поля.
+
+    Тело ответа не собирается в памяти целиком: контрибьюторы разбираются по одному
+    и сразу сокращаются до ContributorPayload. Без ijson тело собирается
+    и разбирается через decode_contributors.
+
+    Args:
+        chunks(Iterable[bytes]): порции тела ответа (например, Response.iter_content)
+    Returns:
+        tuple: (контрибьюторы, размер тела в байтах).
+    """
+    if ijson is None:
+        body = b"".join(chunks)
+        return decode_contributors(body), len(body)
+
+    reader = _ChunksReader(chunks)
+    #  ijson собирает объекты в C-бэкенде; в памяти одновременно находится только один контрибьютор
+    contributors = [
+        ContributorPayload.from_dict(contributor) for contributor in ijson.items(reader, "item")
+        if isinstance(contributor, dict) and "author" in contributor
+    ]
+    return contributors, reader.nbytes
+
@@ -0,0 +1,214 @@
+import cProfile
+import io
+import json
+import math
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    Представляет потокобезопасный реестр метрик: счетчики, текущие значения (gauge)
+    и гистограммы длительностей с метками (endpoint, status, table ...).
+
+    Метрики выгружаются в JSON-сводку или в текстовый формат Prometheus.
+    """
+    buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self) -> None:
+        """
+        Конструктор класса Metrics.
+        """
+        self.__lock = threading.Lock()
+        self.__started = time.monotonic()
+        self.__counters: dict[str, dict[LabelKey, float]] = {}
+        self.__gauges: dict[str, dict[LabelKey, float]] = {}
+        self.__histograms: dict[str, dict[LabelKey, dict[str, Any]]] = {}
+
+    @staticmethod
+    def _key(labels: dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Увеличивает счетчик.
+
+        Args:
+            name(str): имя метрики (для счетчиков принято окончание _total)
+            value(float): приращение
+            labels: метки
+        """
+        key = self._key(labels)
+        with self.__lock:
+            series = self.__counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Устанавливает текущее значение (gauge)."""
+        key = self._key(labels)
+        with self.__lock:
+            self.__gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Добавляет наблюдение в гистограмму.
+
+        Args:
+            name(str): имя метрики (для длительностей принято окончание _seconds)
+            value(float): наблюдаемое значение
+            labels: метки
+        """
+        key = self._key(labels)
+        with self.__lock:
+            histogram = self.__histograms.setdefault(name, {}).get(key)
+            if histogram is None:
+                histogram = {"count": 0, "sum": 0.0, "min": math.inf, "max": 0.0,
+                             "buckets": [0] * len(self.buckets)}
+                self.__histograms[name][key] = histogram
+            histogram["count"] += 1
+            histogram["sum"] += value
+            histogram["min"] = min(histogram["min"], value)
+            histogram["max"] = max(histogram["max"], value)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][index] += 1
+                    break
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+        Измеряет длительность блока и добавляет ее в гистограмму name.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Возвращает значение счетчика (сумму по всем меткам, если метки не заданы)."""
+        with self.__lock:
+            series = self.__counters.get(name, {})
+            if labels:
+                return series.get(self._key(labels), 0)
+            return sum(series.values())
+
+    def histogram(self, name: str, **labels: Any) -> dict[str, float]:
+        """Возвращает количество и сумму наблюдений гистограммы (по всем меткам, если метки не заданы)."""
+        with self.__lock:
+            series = self.__histograms.get(name, {})
+            if labels:
+                series = {key: value for key, value in series.items() if key == self._key(labels)}
+            return {"count": sum(item["count"] for item in series.values()),
+                    "sum": sum(item["sum"] for item in series.values())}
+
+    def reset(self) -> None:
+        """Сбрасывает все метрики."""
+        with self.__lock:
+            self.__started = time.monotonic()
+            self.__counters.clear()
+            self.__gauges.clear()
+            self.__histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Возвращает сводку метрик.
+
+        Returns:
+            dict[str, Any]: {"uptime_seconds", "counters", "gauges", "histograms"}; значения каждой
+            метрики - список {"labels": {...}, ...}.
+        """
+        with self.__lock:
+            def series(metrics: dict[str, dict[LabelKey, Any]], render) -> dict[str, list[dict[str, Any]]]:
+                return {
+                    name: [{"labels": dict(key), **render(value)} for key, value in sorted(values.items())]
+                    for name, values in sorted(metrics.items())
+                }
+
+            return {
+                "uptime_seconds": round(time.monotonic() - self.__started, 3),
+                "counters": series(self.__counters, lambda value: {"value": value}),
+                "gauges": series(self.__gauges, lambda value: {"value": value}),
+                "histograms": series(self.__histograms, lambda value: {
+                    "count": value["count"],
+                    "sum": round(value["sum"], 6),
+                    "avg": round(value["sum"] / value["count"], 6) if value["count"] else 0.0,
+                    "min": round(value["min"], 6) if value["count"] else 0.0,
+                    "max": round(value["max"], 6),
+                }),
+            }
+
+    def to_json(self) -> str:
+        """Выгружает сводку метрик в JSON."""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        """Форматирует метки в синтаксисе Prometheus."""
+        pairs = key + extra
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def to_prometheus(self) -> str:
+        """
+        Выгружает метрики в текстовый формат Prometheus (exposition format 0.0.4).
+        """
+        lines = []
+        with self.__lock:
+            for kind, metrics in (("counter", self.__counters), ("gauge", self.__gauges)):
+                for name, values in sorted(metrics.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(values.items()):
+                        lines.append(f"{name}{self._labels(key)} {value}")
+
+            for name, values in sorted(self.__histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, value in sorted(values.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, value["buckets"]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{self._labels(key, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{self._labels(key, (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{self._labels(key)} {value['sum']}")
+                    lines.append(f"{name}_count{self._labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        """
+        Сохраняет метрики в файл: *.prom - в формате Prometheus, иначе - JSON-сводка.
+        """
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix == ".prom" else self.to_json()
+        path.write_text(text, encoding="utf-8")
+
+    @contextmanager
+    def profile(self, path: str | Path | None = None, top: int = 25) -> Iterator[cProfile.Profile]:
+        """
+        Профилирует блок через cProfile.
+
+        Args:
+            path(str | Path | None): файл для сохранения статистики (открывается pstats / snakeviz);
+            если не задан, печатаются top самых затратных функций
+            top(int): сколько функций печатать
+        """
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if path is not None:
+                profiler.dump_stats(str(path))
+                print(f"Профиль сохранен в {path}")
+            else:
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(top)
+                print(output.getvalue())
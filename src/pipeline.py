@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from src.db_manager import AbstractDBManager
+from src.functions import GitHubParser
+from src.records import StatsBatch
+from src.series import ContributorWeeks
+
+_DONE = object()
+
+
+def trim_synced_weeks(state: dict[str, dict[str, Any]], full_name: str,
+                      repo_weeks: list[ContributorWeeks]) -> tuple[list[ContributorWeeks], int | None]:
+    """
+    Отбрасывает недели, уже записанные при прошлой синхронизации репозитория.
+
+    Args:
+        state(dict[str, dict[str, Any]]): состояние синхронизации из AbstractDBManager.get_sync_state
+        full_name(str): владелец/имя репозитория
+        repo_weeks(list[ContributorWeeks]): недельные ряды репозитория
+    Returns:
+        tuple: (недельные ряды начиная с последней записанной недели, новая последняя неделя).
+    """
+    last_week = state.get(full_name, {}).get("last_week")
+    if last_week is not None:
+        #  Неделя last_week могла дополниться - перезаписываем ее вместе с новыми
+        repo_weeks = [series.since(last_week) for series in repo_weeks]
+    last_week = max((series.timestamps[-1] for series in repo_weeks if len(series)), default=last_week)
+    return repo_weeks, last_week
+
+
+class CrawlPipeline:
+    """
+    Представляет конвейер обхода из трех стадий, связанных ограниченными очередями:
+    получение ответов API -> разбор -> пакетная запись в БД.
+
+    Запись в БД идет одновременно с сетевыми запросами, а пиковая память ограничена
+    глубиной очередей, а не размером аккаунта: когда запись не успевает, очереди
+    заполняются и притормаживают предыдущие стадии.
+    """
+
+    def __init__(self, git_hub_api: GitHubParser, db: AbstractDBManager, queue_size: int = 32,
+                 batch_rows: int = 5000, flush_interval: float = 2.0) -> None:
+        """
+        Конструктор класса CrawlPipeline.
+
+        Args:
+            git_hub_api(GitHubParser): клиент GitHub
+            db(AbstractDBManager): БД (запись идет из отдельного потока: PostgresDB нужен режим пула соединений)
+            queue_size(int): емкость каждой очереди между стадиями, репозиториев
+            batch_rows(int): сбрасывать пакет в БД, когда в нем набралось столько строк
+            flush_interval(float): сбрасывать пакет не реже, чем раз в столько секунд
+        """
+        self.git_hub_api = git_hub_api
+        self.db = db
+        self.queue_size = queue_size
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.stats = {"repos": 0, "rows": 0, "weeks": 0, "batches": 0}
+
+    def run(self, jobs: Iterable[tuple[str, list[dict[str, Any]] | None]],
+            on_written: Callable[[str, dict[str, Any]], None] | None = None) -> dict[str, int]:
+        """
+        Выполняет обход.
+
+        Args:
+            jobs(Iterable[tuple]): пары (пользователь, репозитории или None - все репозитории)
+            on_written(Callable | None): вызывается для каждого репозитория после фиксации его данных в БД
+        Returns:
+            dict[str, int]: количество обработанных репозиториев, строк, недель и пакетов.
+        """
+        fetched = queue.Queue(maxsize=self.queue_size)
+        parsed = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors: list[BaseException] = []
+        state = self.db.get_sync_state()
+
+        def put(target: queue.Queue, item: Any) -> bool:
+            """Кладет элемент в очередь, пока конвейер не остановлен из-за ошибки."""
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source: queue.Queue) -> Any:
+            """Берет элемент из очереди; после остановки конвейера возвращает признак конца."""
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def fetch() -> None:
+            try:
+                for username, repos in jobs:
+                    for repo, contributors in self.git_hub_api.iter_repo_payloads(username, repos, ordered=False):
+                        if not put(fetched, (username, repo, contributors)):
+                            return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(fetched, _DONE)
+
+        def parse() -> None:
+            try:
+                while (item := get(fetched)) is not _DONE:
+                    username, repo, contributors = item
+                    repo_stats, repo_weeks = self.git_hub_api.parse_contributors(username, repo["name"], contributors)
+                    full_name = f"{username}/{repo['name']}"
+                    repo_weeks, last_week = trim_synced_weeks(state, full_name, repo_weeks)
+                    if not put(parsed, (username, repo, repo_stats, repo_weeks,
+                                        (full_name, repo.get("pushed_at"), last_week))):
+                        return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                put(parsed, _DONE)
+
+        stages = [threading.Thread(target=fetch, name="pipeline-fetch", daemon=True),
+                  threading.Thread(target=parse, name="pipeline-parse", daemon=True)]
+        for stage in stages:
+            stage.start()
+
+        try:
+            self._write(parsed, stop, on_written)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for stage in stages:
+                stage.join()
+
+        if errors:
+            raise errors[0]
+        return self.stats
+
+    def _write(self, parsed: queue.Queue, stop: threading.Event,
+               on_written: Callable[[str, dict[str, Any]], None] | None) -> None:
+        """
+        Стадия записи: копит репозитории в пакет и сбрасывает его по размеру или по времени.
+        """
+        batch = []
+        batch_rows = 0
+        deadline = time.monotonic() + self.flush_interval
+
+        def flush() -> None:
+            nonlocal batch, batch_rows, deadline
+            if batch:
+                data = StatsBatch.concat(item[2] for item in batch)
+                weeks = [series for item in batch for series in item[3]]
+                self.db.bulk_insert(data, weeks, sync_state=[item[4] for item in batch])
+                self.stats["repos"] += len(batch)
+                self.stats["rows"] += len(data)
+                self.stats["weeks"] += sum(len(series) for series in weeks)
+                self.stats["batches"] += 1
+                if on_written is not None:
+                    for username, repo, *_ in batch:
+                        on_written(username, repo)
+            batch, batch_rows = [], 0
+            deadline = time.monotonic() + self.flush_interval
+
+        while not stop.is_set():
+            try:
+                item = parsed.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                flush()
+                continue
+            if item is _DONE:
+                break
+
+            batch.append(item)
+            batch_rows += len(item[2]) + sum(len(series) for series in item[3])
+            if batch_rows >= self.batch_rows or time.monotonic() >= deadline:
+                flush()
+
+        if not stop.is_set():
+            flush()
@@ -1,73 +1,59 @@
-import json
+import csv
+import io
 import logging
-import os
-from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import Any
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator
 
 import psycopg2
 from psycopg2 import OperationalError, InterfaceError
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
+from src.db_manager import AbstractDBManager
+from src.metrics import Metrics
+from src.records import StatsBatch
+from src.result_cache import ResultCache
 
-class AbstractDBManager(ABC):
+
+class _RowsReader(io.TextIOBase):
     """
-    Представляет абстрактный класс AbstractDBManager.
+    Файлоподобный объект для COPY FROM STDIN: лениво сериализует строки в CSV,
+    не собирая весь набор данных в памяти.
     """
 
-    @abstractmethod
-    def drop_db(self, dbname: str) -> None:
-        """
-        Удаляет БД
-        Args:
-             dbname(str): наименование БД
-        """
-        pass
-
-    @abstractmethod
-    def insert_data_to_table(self, data: list[dict[str, Any]], table: str) -> None:
-        """
-        Заполняет таблицу данными
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        self.__rows = iter(rows)
+        self.__buffer = io.StringIO()
+        self.__writer = csv.writer(self.__buffer, lineterminator="\n")
+        self.__pending = ""
 
-        Args:
-            data(list(dict(str, Any))): список словарей
-            table(str): наименование таблицы
-        """
-        pass
-
-    @abstractmethod
-    def get_data_from_table(self, table: str, count: int) -> list[dict[str, Any]]:
-        """
-        Получает данные из таблицы
-
-        Args:
-            table(str): название таблицы
-            count(int): лимит вывода
-        Returns:
-            list[dict[str, Any]]: список словарей
-        """
-        pass
+    def readable(self) -> bool:
+        return True
 
-    @abstractmethod
-    def export_data_to_JSON(self, table: str) -> None:
-        """
-        Экспортирует файлы из списка словарей, полученного из таблицы, в файл (по ссылке)
-        в формате JSON
-
-        Args:
-             table(str): название таблицы
-        """
-        pass
-
-    @abstractmethod
-    def drop_table(self, table: str) -> None:
-        """
-        Абстрактный метод для удаления таблицы.
-
-        Args:
-             table(str): наименование таблицы.
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.__pending) < size:
+            try:
+                self.__writer.writerow(next(self.__rows))
+            except StopIteration:
+                break
+            if self.__buffer.tell() >= 65536:
+                self.__pending += self.__buffer.getvalue()
+                self.__buffer.seek(0)
+                self.__buffer.truncate()
+        self.__pending += self.__buffer.getvalue()
+        self.__buffer.seek(0)
+        self.__buffer.truncate()
+
+        if size < 0:
+            chunk, self.__pending = self.__pending, ""
+        else:
+            chunk, self.__pending = self.__pending[:size], self.__pending[size:]
+        return chunk
 
-        """
-        pass
+    readline = read
 
 
 class PostgresDB(AbstractDBManager):
@@ -76,47 +62,152 @@ class PostgresDB(AbstractDBManager):
     Реализует методы, чтобы создать таблицу, добавить данные в таблицу,
     экспортировать данные в формат JSON и получить данные из таблицы.
     Наследует функциональность от абстрактного класса AbstractDBManager.
+
+    Строки загружаются через COPY FROM STDIN (или пакетный INSERT ... VALUES)
+    во временную таблицу и переносятся upsert'ом (ON CONFLICT DO UPDATE).
     """
+    first_partition_year = 2008
+    database_error = psycopg2.DatabaseError
+    placeholder = "%s"
+    no_limit = None
+    load_method = "copy"
 
-    def __init__(self, params):
+    health_check_interval = 30.0
+
+    def __init__(self, params, incremental: bool = False, pool_size: int | None = None,
+                 partition_weeks: bool = False, metrics: Metrics | None = None,
+                 result_cache: ResultCache | None = None):
+        """
+        Конструктор класса PostgresDB.
+
+        Args:
+            params(dict): параметры соединения из config()
+            incremental(bool): инкрементальный режим - существующая БД сохраняется
+            (создается, только если ее нет), иначе БД пересоздается
+            pool_size(int | None): размер пула соединений; если задан, каждая операция берет
+            соединение из пула и возвращает его, что позволяет писать и читать из нескольких потоков
+            partition_weeks(bool): секционировать contributor_weeks по годам (RANGE по week_timestamp),
+            чтобы старые данные можно было дешево отсоединить
+            metrics(Metrics | None): реестр метрик (по умолчанию - собственный)
+            result_cache(ResultCache | None): кэш результатов get_data_from_table
+            (по умолчанию - собственный, ResultCache(ttl=0) выключает кэширование)
+        """
         self.dbname: str = params["dbname"]
         self.user: str = params["user"]
         self.password: str = params["password"]
         self.host: str = params["host"]
         self.port: int = params["port"]
+        self.incremental = incremental
+        self.materialized_views = False
+        self.partition_weeks = partition_weeks
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
         self.conn = psycopg2.connect(dbname="postgres", user=self.user, password=self.password,
                                      host=self.host, port=self.port)
         self.conn.autocommit = True
 
         cur = self.conn.cursor()
 
-        cur.execute(f'DROP DATABASE if exists {self.dbname};')
-        cur.execute(f'CREATE DATABASE {self.dbname};')
+        if incremental:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (self.dbname,))
+            if cur.fetchone() is None:
+                cur.execute(f'CREATE DATABASE {self.dbname};')
+                print(f"База данных '{self.dbname}' успешно создана.")
+        else:
+            cur.execute(f'DROP DATABASE if exists {self.dbname};')
+            cur.execute(f'CREATE DATABASE {self.dbname};')
+            print(f"База данных '{self.dbname}' успешно создана.")
 
         cur.close()
-        print(f"База данных '{self.dbname}' успешно создана.")
         self.conn.close()
-        self.conn = psycopg2.connect(dbname=self.dbname, user=self.user, password=self.password,
-                                     host=self.host, port=self.port)
-        self.conn.autocommit = True
+        self.conn = None
+        self.pool = None
+        #  Имена репозиториев и тексты ошибок в crawl_queue не ASCII: кодировку клиента задаем явно,
+        #  иначе на сервере с SQL_ASCII psycopg2 кодирует строки в ASCII и падает
+        if pool_size is None:
+            self.conn = psycopg2.connect(dbname=self.dbname, user=self.user, password=self.password,
+                                         host=self.host, port=self.port, client_encoding="utf8")
+            self.conn.autocommit = True
+        else:
+            self.pool = ThreadedConnectionPool(1, pool_size, dbname=self.dbname, user=self.user,
+                                               password=self.password, host=self.host, port=self.port,
+                                               client_encoding="utf8")
+            #  ThreadedConnectionPool не ждет освобождения соединения, а выбрасывает PoolError
+            self.__pool_slots = threading.BoundedSemaphore(pool_size)
+            self.__last_used: dict[int, float] = {}
         print(f"Соединение БД '{self.dbname}' успешно установлено.")
+        #  Представления, созданные прошлыми запусками, используются сразу
+        self.materialized_views = self._has_materialized_views()
+
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        """
+        Отдает соединение для одной операции.
+
+        Без пула отдается общее соединение self.conn. В режиме пула соединение берется
+        из пула (с ожиданием свободного), проверяется, если долго простаивало,
+        и возвращается после операции; соединение, на котором произошла OperationalError,
+        закрывается, и следующая операция получит новое.
+        """
+        if self.pool is None:
+            yield self.conn
+            return
+
+        self.__pool_slots.acquire()
+        conn = None
+        broken = False
+        try:
+            conn = self._checkout()
+            yield conn
+        except (OperationalError, InterfaceError):
+            broken = True
+            raise
+        finally:
+            if conn is not None:
+                broken = broken or conn.closed != 0
+                self.__last_used[id(conn)] = time.monotonic()
+                self.pool.putconn(conn, close=broken)
+            self.__pool_slots.release()
+
+    def _checkout(self) -> Any:
+        """
+        Берет соединение из пула, при необходимости проверяя его запросом SELECT 1
+        и переподключаясь, если соединение разорвано.
+        """
+        conn = self.pool.getconn()
+        idle = time.monotonic() - self.__last_used.get(id(conn), 0.0)
+        try:
+            if conn.closed:
+                raise InterfaceError("connection already closed")
+            conn.autocommit = True
+            if idle > self.health_check_interval:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1;")
+        except (OperationalError, InterfaceError):
+            logging.warning("Соединение из пула разорвано, выполняется переподключение.")
+            self.pool.putconn(conn, close=True)
+            conn = self.pool.getconn()
+            conn.autocommit = True
+        return conn
 
     def create_table(self, table_name: str) -> None:
         """
         Создание таблиц для сохранения данных
         """
         if table_name == "repos":
-            with self.conn.cursor() as cur:
+            with self._connection() as conn, conn.cursor() as cur:
                 cur.execute("""
                 CREATE TABLE IF NOT EXISTS repos (
                     id SERIAL PRIMARY KEY,
                     repo_name VARCHAR(225) NOT NULL,
-                    repo_url TEXT NOT NULL
+                    repo_url TEXT NOT NULL UNIQUE
                 );
+                CREATE INDEX IF NOT EXISTS repos_repo_name_idx ON repos (repo_name);
                 """)
+            self._migrate_legacy_table("repos")
 
         elif table_name == "contributors":
-            with self.conn.cursor() as cur:
+            with self._connection() as conn, conn.cursor() as cur:
                 cur.execute("""
                 CREATE TABLE IF NOT EXISTS contributors(
                     id SERIAL PRIMARY KEY,
@@ -127,49 +218,274 @@ class PostgresDB(AbstractDBManager):
                     weekly_lines_deleted INTEGER NOT NULL,
                     weekly_commit_count INTEGER NOT NULL,
                     repo_id INTEGER NOT NULL,
-                    FOREIGN KEY (repo_id) REFERENCES repos(id)
+                    FOREIGN KEY (repo_id) REFERENCES repos(id),
+                    UNIQUE (repo_id, contributor_name)
+                );
+                CREATE INDEX IF NOT EXISTS contributors_weekly_lines_added_idx
+                    ON contributors (weekly_lines_added);
+                """)
+                # Индекс по внешнему ключу repo_id - ведущая колонка UNIQUE (repo_id, contributor_name)
+            self._migrate_legacy_table("contributors")
+
+        elif table_name == "contributor_weeks":
+            partitioning = "PARTITION BY RANGE (week_timestamp)" if self.partition_weeks else ""
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS contributor_weeks(
+                    repo_id INTEGER NOT NULL,
+                    contributor_name VARCHAR(100) NOT NULL,
+                    week_timestamp BIGINT NOT NULL,
+                    lines_added INTEGER NOT NULL,
+                    lines_deleted INTEGER NOT NULL,
+                    commit_count INTEGER NOT NULL,
+                    FOREIGN KEY (repo_id) REFERENCES repos(id),
+                    PRIMARY KEY (repo_id, contributor_name, week_timestamp)
+                ) {partitioning};
+                CREATE INDEX IF NOT EXISTS contributor_weeks_week_timestamp_idx
+                    ON contributor_weeks (week_timestamp);
+                """)
+                # Индекс по внешнему ключу repo_id - ведущая колонка первичного ключа
+            if self.partition_weeks:
+                for year in range(self.first_partition_year, datetime.now(timezone.utc).year + 2):
+                    self.add_week_partition(year)
+                with self._connection() as conn, conn.cursor() as cur:
+                    cur.execute("CREATE TABLE IF NOT EXISTS contributor_weeks_default "
+                                "PARTITION OF contributor_weeks DEFAULT;")
+
+        elif table_name == "repo_sync_state":
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                CREATE TABLE IF NOT EXISTS repo_sync_state(
+                    full_name TEXT PRIMARY KEY,
+                    pushed_at TEXT,
+                    last_week BIGINT,
+                    synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
                 );
                 """)
         else:
-            print("Таблицу с таким именем создать нельзя: используйте для создания имена 'repos', 'contributors'")
-        self.conn.commit()
+            print("Таблицу с таким именем создать нельзя: используйте для создания имена "
+                  "'repos', 'contributors', 'contributor_weeks', 'repo_sync_state'")
+
+    def _migrate_legacy_table(self, table_name: str) -> None:
+        """
+        Добавляет ограничение UNIQUE, на которое опираются upsert'ы (ON CONFLICT), в таблицу repos
+        или contributors, созданную версией без инкрементального режима. Такие версии
+        пересоздавали БД при каждом запуске и вставляли репозиторий на каждую строку
+        контрибьютора, поэтому сначала удаляются дубликаты: остается первая запись репозитория
+        (ссылки контрибьюторов переводятся на нее) и последняя запись контрибьютора.
+
+        Args:
+            table_name(str): "repos" или "contributors"
+        """
+        unique = "repo_url" if table_name == "repos" else "repo_id, contributor_name"
+        with self._transaction(operation="migrate") as cur:
+            cur.execute("""
+                SELECT 1 FROM pg_constraint c
+                WHERE c.conrelid = %s::regclass AND c.contype IN ('u', 'p')
+                  AND ARRAY(
+                      SELECT a.attname::text FROM unnest(c.conkey) AS k(attnum)
+                      JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+                      ORDER BY 1
+                  ) = %s::text[];
+            """, (table_name, sorted(unique.split(", "))))
+            if cur.fetchone() is not None:
+                return
+
+            if table_name == "repos":
+                cur.execute("""
+                    CREATE TEMP TABLE repo_duplicates ON COMMIT DROP AS
+                    SELECT id, keep_id FROM (
+                        SELECT id, MIN(id) OVER (PARTITION BY repo_url) AS keep_id FROM repos
+                    ) ids
+                    WHERE id <> keep_id;
+                """)
+                cur.execute("SELECT to_regclass('contributors') IS NOT NULL;")
+                if cur.fetchone()[0]:
+                    cur.execute("""
+                        UPDATE contributors c SET repo_id = d.keep_id
+                        FROM repo_duplicates d WHERE c.repo_id = d.id;
+                    """)
+                cur.execute("DELETE FROM repos r USING repo_duplicates d WHERE r.id = d.id;")
+                removed = cur.rowcount
+                cur.execute(f"ALTER TABLE repos ADD CONSTRAINT repos_repo_url_key UNIQUE ({unique});")
+            else:
+                cur.execute("""
+                    DELETE FROM contributors c USING contributors newer
+                    WHERE c.repo_id = newer.repo_id AND c.contributor_name = newer.contributor_name
+                      AND c.id < newer.id;
+                """)
+                removed = cur.rowcount
+                cur.execute(f"ALTER TABLE contributors ADD CONSTRAINT contributors_repo_id_contributor_name_key "
+                            f"UNIQUE ({unique});")
+        self.result_cache.invalidate(table_name)
+        print(f"Таблица '{table_name}' создана прежней версией: удалено дубликатов - {removed}, "
+              f"добавлено ограничение UNIQUE ({unique}).")
+
+    @staticmethod
+    def _year_bounds(year: int) -> tuple[int, int]:
+        """Границы года в секундах Unix-времени: [начало года, начало следующего года)."""
+        start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+        end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+        return start, end
+
+    def add_week_partition(self, year: int) -> None:
+        """
+        Создает секцию contributor_weeks_y<year> для недель заданного года, если ее еще нет.
 
-    def insert_data_to_table(self, data: list[dict[str, Any]], table: str) -> None:
+        Args:
+            year(int): год
         """
-        Заполняет таблицу данными.
+        start, end = self._year_bounds(year)
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS contributor_weeks_y{year}
+                PARTITION OF contributor_weeks FOR VALUES FROM ({start}) TO ({end});
+            """)
+
+    def detach_week_partitions(self, before_year: int) -> list[str]:
+        """
+        Отсоединяет от contributor_weeks годовые секции до before_year (не включая его).
+        Отсоединенные таблицы остаются в БД и могут быть заархивированы или удалены.
 
         Args:
-             data: list[dict[str, Any]]: список словарей с данными из GitHub
-             table(str): наименование таблицы
-        """
-
-        if table == "repos":
-            with self.conn.cursor() as cur:
-                sql = """
-                INSERT INTO repos (repo_name, repo_url) VALUES (%s, %s);
-            """
-                for item in data:
-                    cur.execute(sql, (item["repo_name"], item["repo_url"]))
-
-            self.conn.commit()
-
-        elif table == "contributors":
-            with self.conn.cursor() as cur:
-                sql = f"""
-                INSERT INTO contributors (contributor_name, total_commits, weekly_timestamp, weekly_lines_added,
-                 weekly_lines_deleted, weekly_commit_count, repo_id)
-                VALUES (%s, %s, %s, %s, %s, %s, %s);
-            """
-                for item in data:
-                    repo_id = self.get_repo_id(item["repo_name"])
-                    cur.execute(sql, (item["contributor_name"], item["total_commits"], item["weekly_timestamp"],
-                                      item["weekly_lines_added"], item["weekly_lines_deleted"],
-                                      item["weekly_commit_count"], repo_id))
-
-            self.conn.commit()
+            before_year(int): первый год, который остается в contributor_weeks
+        Returns:
+            list[str]: имена отсоединенных секций.
+        """
+        detached = []
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'contributor_weeks'::regclass AND c.relname LIKE 'contributor_weeks_y%%';
+            """)
+            for (partition,) in cur.fetchall():
+                if int(partition.removeprefix("contributor_weeks_y")) < before_year:
+                    cur.execute(f"ALTER TABLE contributor_weeks DETACH PARTITION {partition};")
+                    detached.append(partition)
+        self.result_cache.invalidate("contributor_weeks")
+        return sorted(detached)
+
+    @contextmanager
+    def _transaction(self, cursor_name: str | None = None, operation: str = "transaction") -> Iterator[Any]:
+        """
+        Выполняет блок в одной транзакции: фиксирует изменения при успехе
+        и откатывает при ошибке. Отдает курсор (серверный, если задан cursor_name).
+        Длительность транзакции учитывается в метрике db_transaction_seconds с меткой operation.
+        """
+        started = time.perf_counter()
+        status = "error"
+        with self._connection() as conn:
+            autocommit = conn.autocommit
+            conn.autocommit = False
+            try:
+                with conn.cursor(name=cursor_name) as cur:
+                    yield cur
+                conn.commit()
+                status = "ok"
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                if not conn.closed:
+                    conn.autocommit = autocommit
+                self.metrics.observe("db_transaction_seconds", time.perf_counter() - started,
+                                     operation=operation, status=status)
+
+    def _insert_repos(self, cur, data: StatsBatch) -> dict[str, int]:
+        """
+        Пакетно вставляет (или обновляет) репозитории пакета (каждый репозиторий хранится в пакете один раз).
 
+        Returns:
+            dict[str, int]: соответствие url репозитория его идентификатору.
+        """
+        if not data.repos:
+            return {}
+
+        rows = execute_values(cur, """
+            INSERT INTO repos (repo_url, repo_name) VALUES %s
+            ON CONFLICT (repo_url) DO UPDATE SET repo_name = EXCLUDED.repo_name
+            RETURNING repo_url, id;
+        """, [(repo.repo_url, repo.repo_name) for repo in data.repos], page_size=self.batch_size, fetch=True)
+        return dict(rows)
+
+    def _merge_rows(self, cur, table: str, columns: tuple[str, ...], key_columns: tuple[str, ...],
+                    rows: Iterable[tuple], method: str = "copy") -> int:
+        """
+        Загружает строки во временную таблицу и переносит их в table через
+        INSERT ... ON CONFLICT DO UPDATE (COPY сам по себе upsert не поддерживает).
+
+        Returns:
+            int: количество вставленных или обновленных строк table.
+        """
+        staging = f"{table}_staging"
+        column_list = ", ".join(columns)
+        key_list = ", ".join(key_columns)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column not in key_columns)
+
+        cur.execute(f"DROP TABLE IF EXISTS {staging};")
+        cur.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                    f"SELECT {column_list} FROM {table} WITH NO DATA;")
+        with self.metrics.timer("db_load_seconds", table=table, method=method):
+            self._load_rows(cur, staging, columns, rows, method)
+        with self.metrics.timer("db_merge_seconds", table=table):
+            cur.execute(f"""
+                INSERT INTO {table} ({column_list})
+                SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging}
+                ON CONFLICT ({key_list}) DO UPDATE SET {updates};
+            """)
+        rows_count = cur.rowcount
+        cur.execute(f"DROP TABLE {staging};")
+        self.metrics.inc("db_rows_written_total", rows_count, table=table)
+        return rows_count
+
+    def _load_rows(self, cur, table: str, columns: tuple[str, ...], rows: Iterable[tuple],
+                   method: str = "copy") -> None:
+        """
+        Загружает строки в таблицу через COPY FROM STDIN или пакетный INSERT ... VALUES.
+        """
+        columns = ", ".join(columns)
+        if method == "copy":
+            cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", _RowsReader(rows))
+        elif method == "values":
+            execute_values(cur, f"INSERT INTO {table} ({columns}) VALUES %s", rows, page_size=self.batch_size)
         else:
-            raise ValueError(f"Таблица '{table}' не найдена.")
+            raise ValueError(f"Неизвестный способ загрузки: {method}. Допустимые способы: copy, values.")
+
+    def _get_repo_ids(self, cur, repos: Iterable[Any]) -> dict[str, int]:
+        """
+        Получает идентификаторы репозиториев (RepoRef или url) одним запросом.
+        """
+        urls = [repo if isinstance(repo, str) else repo.repo_url for repo in repos]
+        cur.execute("SELECT repo_url, id FROM repos WHERE repo_url = ANY(%s);", (urls,))
+        return dict(cur.fetchall())
+
+    def _update_sync_state(self, cur, sync_state: Iterable[tuple[str, str | None, int | None]]) -> None:
+        """
+        Записывает состояние синхронизации репозиториев (full_name, pushed_at, last_week).
+        """
+        execute_values(cur, """
+            INSERT INTO repo_sync_state (full_name, pushed_at, last_week) VALUES %s
+            ON CONFLICT (full_name) DO UPDATE SET
+                pushed_at = EXCLUDED.pushed_at,
+                last_week = COALESCE(EXCLUDED.last_week, repo_sync_state.last_week),
+                synced_at = now();
+        """, sync_state, page_size=self.batch_size)
+
+    def get_sync_state(self) -> dict[str, dict[str, Any]]:
+        """
+        Получает сохраненное состояние синхронизации репозиториев.
+
+        Returns:
+            dict[str, dict[str, Any]]: full_name репозитория -> {"pushed_at", "last_week"}.
+        """
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT full_name, pushed_at, last_week FROM repo_sync_state;")
+            return {
+                full_name: {"pushed_at": pushed_at, "last_week": last_week}
+                for full_name, pushed_at, last_week in cur.fetchall()
+            }
 
     def get_repo_id(self, repo_name: str) -> int:
         """
@@ -181,7 +497,7 @@ class PostgresDB(AbstractDBManager):
         Returns:
             int: идентификатор репозитория
         """
-        with self.conn.cursor() as cur:
+        with self._connection() as conn, conn.cursor() as cur:
             sql = "SELECT id FROM repos WHERE repo_name = %s;"
             cur.execute(sql, (repo_name,))
             result = cur.fetchone()
@@ -197,11 +513,11 @@ class PostgresDB(AbstractDBManager):
         Args:
              table(str): наименование таблицы.
         """
-        with self.conn.cursor() as cur:
+        with self._connection() as conn, conn.cursor() as cur:
             cur.execute(f"""
                    DROP TABLE IF EXISTS {table};
                """)
-        self.conn.commit()
+        self.result_cache.invalidate(table)
 
     def drop_db(self, dbname: str) -> None:
         """
@@ -210,9 +526,10 @@ class PostgresDB(AbstractDBManager):
         Args:
              dbname(str): наименование БД.
         """
-        # Закрываем текущее соединение, если оно есть
-        if self.conn:
+        # Закрываем текущее соединение (или пул), если оно есть
+        if self.conn or self.pool:
             self.close()
+        self.pool = None
 
         self.conn = psycopg2.connect(dbname="postgres", user=self.user, password=self.password,
                                      host=self.host, port=self.port)
@@ -221,137 +538,104 @@ class PostgresDB(AbstractDBManager):
             # Удаляем базу данных
             cur.execute(f"DROP DATABASE IF EXISTS {dbname};")
         self.conn.commit()  # Фиксируем изменения
+        self.result_cache.invalidate()
         print(f"База данных '{dbname}' успешно удалена, если она существовала.")
 
-    def get_data_from_table(self, table: str, count: int) -> list[dict[str, Any]]:
+    def _query(self, query: str, params: tuple | dict = ()) -> list[dict[str, Any]]:
         """
-        Получает данные из таблицы.
-
-        Args:
-            table (str): название таблицы.
-            count (int): количество записей для получения.
+        Выполняет запрос на чтение и возвращает строки в виде словарей (ключи - имена колонок).
+        """
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            columns = [column.name for column in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
 
-        Returns:
-            list[dict[str, Any]]: список словарей с данными.
+    @contextmanager
+    def _export_rows(self, table: str, columns: tuple[str, ...], itersize: int) -> Iterator[Iterable[tuple]]:
         """
-        # Проверка на допустимые имена таблиц
-        valid_tables = ["repos", "contributors"]
-        if table not in valid_tables:
-            raise ValueError(f"Недопустимое имя таблицы: {table}. Допустимые таблицы: {', '.join(valid_tables)}.")
+        Отдает строки таблицы из серверного (именованного) курсора, который получает их
+        с сервера порциями по itersize, поэтому потребление памяти не зависит от размера таблицы.
+        """
+        with self._transaction(cursor_name=f"export_{table}", operation="export") as cur:
+            cur.itersize = itersize
+            cur.execute(f"SELECT {', '.join(columns)} FROM {table};")
+            yield cur
 
-        try:
-            if table == "repos":
-                with self.conn.cursor() as cur:
-                    # Формируем SQL-запрос с использованием f-строки для имени таблицы
-                    query = f"""
-                        SELECT * FROM {table}
-                        ORDER BY repo_name
-                        LIMIT %s
-                    """
-                    cur.execute(query, (count,))
-                    data = cur.fetchall()
-                    data_dict = [
-                        {
-                            "repo_name": d[1],
-                            "repo_url": d[2]
-                        } for d in data
-                    ]
-                    return data_dict
-            elif table == "contributors":
-                with self.conn.cursor() as cur:
-                    # Формируем SQL-запрос с использованием f-строки для имени таблицы
-                    query = f"""
-                        SELECT * FROM {table}
-                        ORDER BY weekly_lines_added
-                        LIMIT %s
-                    """
-                    cur.execute(query, (count,))
-                    data = cur.fetchall()
-                    data_dict = [
-                        {
-                            "contributor_name": d[1],
-                            "total_commits": d[2],
-                            "weekly_timestamp": d[3],
-                            "weekly_lines_added": d[4],
-                            "weekly_lines_deleted": d[5],
-                            "weekly_commit_count": d[6],
-                            "repo_id": d[7]
-                        } for d in data
-                    ]
-                    return data_dict
-        except psycopg2.DatabaseError as db_error:
-            logging.error(f"Ошибка базы данных при получении данных из таблицы '{table}': {db_error}")
-            return []  # Возвращаем пустой список в случае ошибки
-        except Exception as e:
-            logging.error(f"Неизвестная ошибка при получении данных из таблицы '{table}': {e}")
-            return []  # Возвращаем пустой список в случае ошибки
-
-    def export_data_to_JSON(self, table: str) -> None:
-        """
-        Экспортирует файлы из списка словарей, полученного из таблицы, в файл (по ссылке)
-        в формате JSON
+    def _repo_totals_source(self) -> str:
+        """Итоги по репозиториям читаются из mv_repo_totals, если представление создано."""
+        return "mv_repo_totals" if self.materialized_views else super()._repo_totals_source()
 
-        Args:
-             table(str): название таблицы
+    def _contributor_totals_source(self) -> str:
+        """Итоги по контрибьюторам читаются из mv_contributor_totals, если представление создано."""
+        return "mv_contributor_totals" if self.materialized_views else super()._contributor_totals_source()
+
+    def _weekly_churn_query(self, preceding: int) -> str:
+        """
+        Запрос get_weekly_churn (границу окна Postgres принимает параметром).
+        """
+        return f"""
+            WITH weekly AS (
+                SELECT w.week_timestamp,
+                       SUM(w.lines_added) AS lines_added,
+                       SUM(w.lines_deleted) AS lines_deleted,
+                       SUM(w.lines_added + w.lines_deleted) AS churn,
+                       SUM(w.commit_count) AS commits,
+                       COUNT(DISTINCT w.contributor_name) AS active_contributors
+                FROM contributor_weeks w
+                JOIN repos r ON r.id = w.repo_id
+                WHERE (%(repo_name)s IS NULL OR r.repo_name = %(repo_name)s)
+                  AND w.week_timestamp > (SELECT MAX(week_timestamp) FROM contributor_weeks) - %(span)s
+                GROUP BY w.week_timestamp
+            )
+            SELECT *,
+                   (AVG(churn) OVER (ORDER BY week_timestamp
+                                     ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW))::float8 AS rolling_churn
+            FROM weekly
+            ORDER BY week_timestamp;
         """
-        valid_tables = ["repos", "contributors"]
-        if table not in valid_tables:
-            raise ValueError(f"Недопустимое имя таблицы: {table}. Допустимые таблицы: {', '.join(valid_tables)}.")
 
-        try:
-            if table == "repos":
-                with self.conn.cursor() as cur:
-                    # Формируем SQL-запрос с использованием f-строки для имени таблицы
-                    query = f"""
-                        SELECT * FROM {table};
-                    """
-                    cur.execute(query, )
-                    data = cur.fetchall()
-                    data_dict = [
-                        {
-                            "repo_name": d[1],
-                            "repo_url": d[2]
-                        } for d in data
-                    ]
-
-            elif table == "contributors":
-                with self.conn.cursor() as cur:
-                    # Формируем SQL-запрос с использованием f-строки для имени таблицы
-                    query = f"""
-                        SELECT * FROM {table};
-                    """
-                    cur.execute(query, )
-                    data = cur.fetchall()
-                    data_dict = [
-                        {
-                            "contributor_name": d[1],
-                            "total_commits": d[2],
-                            "weekly_timestamp": d[3],
-                            "weekly_lines_added": d[4],
-                            "weekly_lines_deleted": d[5],
-                            "weekly_commit_count": d[6],
-                            "repo_id": d[7]
-                        } for d in data
-                    ]
-
-        except psycopg2.DatabaseError as db_error:
-            logging.error(f"Ошибка базы данных при получении данных из таблицы '{table}': {db_error}")
-            return []  # Возвращаем пустой список в случае ошибки
-        except Exception as e:
-            logging.error(f"Неизвестная ошибка при получении данных из таблицы '{table}': {e}")
-            return []  # Возвращаем пустой список в случае ошибки
-
-        # Создаем путь к файлу
-        file_path = os.path.join("src", "data", f"{table}.json")
-
-        # Открываем файл для записи
-        with open(file_path, "w") as f:
-            json.dump(data_dict, f, indent=4)
-
-        print(f"Данные успешно сохранены в {file_path}")
+    def _has_materialized_views(self) -> bool:
+        """Проверяет по pg_matviews, созданы ли оба материализованных представления."""
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM pg_matviews WHERE matviewname IN %s;",
+                        (("mv_repo_totals", "mv_contributor_totals"),))
+            return cur.fetchone()[0] == 2
+
+    def create_materialized_views(self) -> None:
+        """
+        Создает материализованные представления mv_repo_totals и mv_contributor_totals.
+        После этого get_repo_totals и get_top_contributors читают из них. Представления
+        не обновляются при каждой записи: их обновляет refresh_materialized_views
+        (main.py вызывает его один раз в конце обхода).
+        """
+        with self._transaction() as cur:
+            cur.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS mv_repo_totals AS {self.repo_totals_query};")
+            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS mv_repo_totals_url_idx ON mv_repo_totals (repo_url);")
+            cur.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS mv_contributor_totals AS "
+                        f"{self.contributor_totals_query};")
+            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS mv_contributor_totals_name_idx "
+                        "ON mv_contributor_totals (contributor_name);")
+        self.materialized_views = True
+
+    def refresh_materialized_views(self) -> None:
+        """
+        Обновляет материализованные представления, не блокируя их чтение (CONCURRENTLY).
+        Полный пересчет агрегатов дорог, поэтому вызывается один раз после серии записей.
+        """
+        if not self.materialized_views:
+            return
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_repo_totals;")
+            cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_contributor_totals;")
 
     def close(self):
-        """Закрывает текущее соединение с базой данных."""
+        """Закрывает текущее соединение (или все соединения пула) с базой данных."""
+        if self.pool is not None and not self.pool.closed:
+            try:
+                self.pool.closeall()
+                print("Пул соединений с базой данных закрыт.")
+            except (OperationalError, InterfaceError) as e:
+                print(f"Ошибка при закрытии пула соединений: {e}")
         if self.conn:
             try:
                 self.conn.close()
@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Mapping, Sequence
+
+from src.scheduler import RetryLater
+
+
+class TokenPool:
+    """
+    Представляет пул API-токенов GitHub с учетом лимита запросов по каждому токену.
+
+    Состояние лимита обновляется по заголовкам X-RateLimit-Limit / X-RateLimit-Remaining /
+    X-RateLimit-Reset. Каждый запрос направляется на токен с наибольшим остатком.
+    Когда остаток токена опускается до reserve, запросы по нему равномерно
+    распределяются по времени до сброса лимита, а не расходуются залпом.
+    """
+    default_limit = 5000
+
+    def __init__(self, tokens: Sequence[str], reserve: int = 100) -> None:
+        """
+        Конструктор класса TokenPool.
+
+        Args:
+            tokens(Sequence[str]): API-токены
+            reserve(int): остаток, начиная с которого запросы по токену равномерно распределяются
+        """
+        if not tokens:
+            raise ValueError("Пул токенов не может быть пустым.")
+        self.__reserve = reserve
+        self.__lock = threading.Lock()
+        self.__state = {
+            token: {"limit": self.default_limit, "remaining": self.default_limit, "reset": 0.0, "next_at": 0.0}
+            for token in tokens
+        }
+
+    def __len__(self) -> int:
+        return len(self.__state)
+
+    def _refresh(self, now: float) -> None:
+        """Восстанавливает остаток токенов, у которых наступило время сброса. Вызывается под блокировкой."""
+        for state in self.__state.values():
+            if state["reset"] and state["reset"] <= now:
+                state["remaining"] = state["limit"]
+                state["reset"] = 0.0
+                state["next_at"] = 0.0
+
+    def acquire(self, block: bool = True) -> str:
+        """
+        Выбирает токен для очередного запроса.
+
+        Args:
+            block(bool): ждать, если все токены исчерпаны; иначе выбросить RetryLater
+        Returns:
+            str: токен с наибольшим остатком лимита.
+        Raises:
+            RetryLater: все токены исчерпаны и block=False.
+        """
+        while True:
+            with self.__lock:
+                now = time.time()
+                self._refresh(now)
+                token, state = max(self.__state.items(), key=lambda item: item[1]["remaining"])
+
+                if state["remaining"] > 0:
+                    state["remaining"] -= 1
+                    if state["remaining"] >= self.__reserve or not state["reset"]:
+                        return token
+
+                    #  Остаток мал: выдаем слоты равномерно до момента сброса лимита
+                    slot = max(now, state["next_at"])
+                    state["next_at"] = slot + max(state["reset"] - slot, 0.0) / (state["remaining"] + 1)
+                    wait_time = slot - now
+                    if wait_time <= 0:
+                        return token
+                    break
+
+                wait_time = self._wait_time(now)
+
+            if not block:
+                raise RetryLater("исчерпан лимит запросов всех токенов", wait_time)
+            time.sleep(wait_time)
+
+        time.sleep(wait_time)
+        return token
+
+    def update(self, token: str, headers: Mapping[str, str]) -> None:
+        """
+        Обновляет состояние лимита токена по заголовкам ответа.
+
+        Args:
+            token(str): токен, которым был выполнен запрос
+            headers(Mapping[str, str]): заголовки ответа
+        """
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset = float(headers.get("X-RateLimit-Reset", 0))
+        limit = int(headers.get("X-RateLimit-Limit", self.default_limit))
+
+        with self.__lock:
+            state = self.__state[token]
+            state["limit"] = limit
+            if reset > state["reset"]:
+                #  Новое окно лимита
+                state["reset"] = reset
+                state["remaining"] = remaining
+            else:
+                #  Ответы параллельных запросов приходят вразнобой - доверяем меньшему остатку
+                state["remaining"] = min(state["remaining"], remaining)
+
+    def _wait_time(self, now: float) -> float:
+        """Время до сброса лимита ближайшего токена. Вызывается под блокировкой."""
+        resets = [state["reset"] for state in self.__state.values() if state["reset"]]
+        return max(min(resets) - now, 0.0) if resets else 1.0
+
+    def wait_time(self) -> float:
+        """
+        Возвращает время в секундах, через которое появится токен с ненулевым остатком.
+        """
+        with self.__lock:
+            now = time.time()
+            self._refresh(now)
+            if any(state["remaining"] > 0 for state in self.__state.values()):
+                return 0.0
+            return self._wait_time(now)
+
+    @property
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Остаток и время сброса лимита по каждому токену (токены маскируются)."""
+        with self.__lock:
+            return {
+                f"...{token[-4:]}": {"remaining": state["remaining"], "limit": state["limit"], "reset": state["reset"]}
+                for token, state in self.__state.items()
+            }
@@ -0,0 +1,201 @@
+import sys
+from array import array
+from typing import Any, Iterable, Iterator
+
+
+class RepoRef:
+    """
+    Представляет ссылку на репозиторий: наименование и url статистики хранятся один раз
+    на репозиторий (строки интернируются), а строки контрибьюторов ссылаются на нее.
+    """
+    __slots__ = ("repo_name", "repo_url")
+
+    def __init__(self, repo_name: str, repo_url: str) -> None:
+        """
+        Конструктор класса RepoRef.
+
+        Args:
+            repo_name(str): наименование репозитория
+            repo_url(str): url статистики репозитория (уникален для репозитория)
+        """
+        self.repo_name = sys.intern(repo_name)
+        self.repo_url = sys.intern(repo_url)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RepoRef) and self.repo_url == other.repo_url
+
+    def __hash__(self) -> int:
+        return hash(self.repo_url)
+
+    def __repr__(self) -> str:
+        return f"RepoRef({self.repo_name!r}, {self.repo_url!r})"
+
+
+class ContributorStats:
+    """
+    Представляет одну строку статистики контрибьютора (отдается при обходе StatsBatch).
+    """
+    __slots__ = ("repo", "contributor_name", "total_commits", "weekly_timestamp", "weekly_lines_added",
+                 "weekly_lines_deleted", "weekly_commit_count")
+
+    def __init__(self, repo: RepoRef, contributor_name: str, total_commits: int, weekly_timestamp: int,
+                 weekly_lines_added: int, weekly_lines_deleted: int, weekly_commit_count: int) -> None:
+        self.repo = repo
+        self.contributor_name = contributor_name
+        self.total_commits = total_commits
+        self.weekly_timestamp = weekly_timestamp
+        self.weekly_lines_added = weekly_lines_added
+        self.weekly_lines_deleted = weekly_lines_deleted
+        self.weekly_commit_count = weekly_commit_count
+
+    def to_dict(self) -> dict[str, Any]:
+        """Возвращает строку в прежнем формате словаря GitHubParser.get_repos_stats."""
+        return {
+            "repo_name": self.repo.repo_name,
+            "repo_url": self.repo.repo_url,
+            "contributor_name": self.contributor_name,
+            "total_commits": self.total_commits,
+            "weekly_timestamp": self.weekly_timestamp,
+            "weekly_lines_added": self.weekly_lines_added,
+            "weekly_lines_deleted": self.weekly_lines_deleted,
+            "weekly_commit_count": self.weekly_commit_count,
+        }
+
+    def __repr__(self) -> str:
+        return f"ContributorStats({self.repo.repo_name!r}, {self.contributor_name!r})"
+
+
+class StatsBatch:
+    """
+    Представляет пакет строк статистики контрибьюторов в колоночном виде.
+
+    Репозитории хранятся один раз в списке repos, строки ссылаются на них по индексу;
+    числовые колонки - массивы array('q'), логины контрибьюторов интернируются.
+    Пакет передается из GitHubParser в PostgresDB вместо списка словарей.
+    """
+    __slots__ = ("repos", "_repo_index", "repo_indexes", "contributor_names", "total_commits",
+                 "weekly_timestamps", "weekly_lines_added", "weekly_lines_deleted", "weekly_commit_counts")
+
+    def __init__(self) -> None:
+        """
+        Конструктор класса StatsBatch.
+        """
+        self.repos: list[RepoRef] = []
+        self._repo_index: dict[str, int] = {}
+        self.repo_indexes = array("l")
+        self.contributor_names: list[str] = []
+        self.total_commits = array("q")
+        self.weekly_timestamps = array("q")
+        self.weekly_lines_added = array("q")
+        self.weekly_lines_deleted = array("q")
+        self.weekly_commit_counts = array("q")
+
+    def add_repo(self, repo_name: str, repo_url: str) -> RepoRef:
+        """
+        Добавляет репозиторий в пакет (повторный вызов с тем же url возвращает прежнюю ссылку).
+
+        Args:
+            repo_name(str): наименование репозитория
+            repo_url(str): url статистики репозитория
+        Returns:
+            RepoRef: ссылка на репозиторий.
+        """
+        index = self._repo_index.get(repo_url)
+        if index is None:
+            return self.repos[self._index(RepoRef(repo_name, repo_url))]
+        return self.repos[index]
+
+    def _index(self, repo: RepoRef) -> int:
+        """Возвращает индекс репозитория в repos, добавляя его при необходимости."""
+        index = self._repo_index.get(repo.repo_url)
+        if index is None:
+            index = len(self.repos)
+            self._repo_index[repo.repo_url] = index
+            self.repos.append(repo)
+        return index
+
+    def append(self, repo: RepoRef, contributor_name: str, total_commits: int, weekly_timestamp: int,
+               weekly_lines_added: int, weekly_lines_deleted: int, weekly_commit_count: int) -> None:
+        """Добавляет строку контрибьютора репозитория repo (репозиторий добавляется при необходимости)."""
+        self.repo_indexes.append(self._index(repo))
+        self.contributor_names.append(sys.intern(contributor_name))
+        self.total_commits.append(total_commits)
+        self.weekly_timestamps.append(weekly_timestamp)
+        self.weekly_lines_added.append(weekly_lines_added)
+        self.weekly_lines_deleted.append(weekly_lines_deleted)
+        self.weekly_commit_counts.append(weekly_commit_count)
+
+    def extend(self, other: "StatsBatch") -> None:
+        """Дописывает в пакет строки другого пакета."""
+        remap = [self._index(repo) for repo in other.repos]
+        self.repo_indexes.extend(remap[index] for index in other.repo_indexes)
+        self.contributor_names.extend(other.contributor_names)
+        self.total_commits.extend(other.total_commits)
+        self.weekly_timestamps.extend(other.weekly_timestamps)
+        self.weekly_lines_added.extend(other.weekly_lines_added)
+        self.weekly_lines_deleted.extend(other.weekly_lines_deleted)
+        self.weekly_commit_counts.extend(other.weekly_commit_counts)
+
+    @classmethod
+    def concat(cls, batches: Iterable["StatsBatch"]) -> "StatsBatch":
+        """Объединяет несколько пакетов в один."""
+        batch = cls()
+        for other in batches:
+            batch.extend(other)
+        return batch
+
+    @classmethod
+    def from_dicts(cls, data: Iterable[dict[str, Any]]) -> "StatsBatch":
+        """
+        Собирает пакет из строк в прежнем формате словарей GitHubParser.get_repos_stats.
+
+        Args:
+            data(Iterable[dict[str, Any]]): строки статистики
+        Returns:
+            StatsBatch: пакет строк.
+        """
+        batch = cls()
+        for item in data:
+            repo = batch.add_repo(item["repo_name"], item["repo_url"])
+            batch.append(repo, item["contributor_name"], item["total_commits"], item["weekly_timestamp"],
+                         item["weekly_lines_added"], item["weekly_lines_deleted"], item["weekly_commit_count"])
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.contributor_names)
+
+    def __iter__(self) -> Iterator[ContributorStats]:
+        for index, repo_index in enumerate(self.repo_indexes):
+            yield ContributorStats(self.repos[repo_index], self.contributor_names[index],
+                                   self.total_commits[index], self.weekly_timestamps[index],
+                                   self.weekly_lines_added[index], self.weekly_lines_deleted[index],
+                                   self.weekly_commit_counts[index])
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Возвращает строки в прежнем формате списка словарей."""
+        return [row.to_dict() for row in self]
+
+    def rows(self, repo_ids: dict[str, int]) -> Iterator[tuple[str, int, int, int, int, int, int]]:
+        """
+        Отдает строки для таблицы contributors.
+
+        Args:
+            repo_ids(dict[str, int]): соответствие url репозитория его идентификатору в БД
+        Returns:
+            Iterator[tuple]: (contributor_name, total_commits, weekly_timestamp, weekly_lines_added,
+            weekly_lines_deleted, weekly_commit_count, repo_id).
+        Raises:
+            ValueError: репозиторий строки отсутствует в repo_ids.
+        """
+        ids = []
+        for repo in self.repos:
+            repo_id = repo_ids.get(repo.repo_url)
+            if repo_id is None:
+                raise ValueError(f"Репозиторий '{repo.repo_name}' не найден.")
+            ids.append(repo_id)
+
+        return zip(self.contributor_names, self.total_commits, self.weekly_timestamps, self.weekly_lines_added,
+                   self.weekly_lines_deleted, self.weekly_commit_counts, (ids[index] for index in self.repo_indexes))
+
+    def __repr__(self) -> str:
+        return f"StatsBatch(repos={len(self.repos)}, rows={len(self)})"
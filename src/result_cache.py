@@ -0,0 +1,159 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class ResultCache:
+    """
+    Представляет LRU-кэш результатов запросов чтения в памяти процесса с TTL и ограничением
+    по количеству записей и по объему.
+
+    Каждая запись помечена версией своей таблицы. Запись в таблицу увеличивает ее версию
+    (invalidate), и все закэшированные результаты по ней перестают отдаваться без обхода кэша.
+    Изменения, сделанные другими процессами, кэш не видит - их давность ограничена TTL.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Конструктор класса ResultCache.
+
+        Args:
+            ttl(float): время жизни записи, секунд (0 - кэш выключен)
+            max_entries(int): максимальное количество записей (0 - кэш выключен)
+            max_bytes(int): ограничение суммарного (оценочного) объема результатов, байт
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[Hashable, tuple[Any, str, int, float, int]] = OrderedDict()
+        self.__versions: dict[str, int] = {}
+        #  Общая версия: увеличивается при сбросе всех таблиц (например, удалении БД)
+        self.__epoch = 0
+        self.__bytes = 0
+        self.__stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0 and self.max_bytes > 0
+
+    def version(self, table: str) -> int:
+        """Текущая версия таблицы."""
+        with self.__lock:
+            return self.__version(table)
+
+    def __version(self, table: str) -> int:
+        return self.__epoch + self.__versions.get(table, 0)
+
+    @staticmethod
+    def sizeof(value: Any) -> int:
+        """
+        Оценивает объем результата в байтах: список (кортеж) словарей или строк и значения в них.
+        """
+        size = sys.getsizeof(value)
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                size += sys.getsizeof(item)
+                if isinstance(item, dict):
+                    size += sum(sys.getsizeof(field) for field in item.values())
+                elif isinstance(item, tuple):
+                    size += sum(sys.getsizeof(field) for field in item)
+        return size
+
+    def get_or_load(self, table: str, key: Hashable, load: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Отдает результат из кэша или вычисляет его через load и сохраняет.
+
+        Args:
+            table(str): таблица, от данных которой зависит результат
+            key(Hashable): ключ запроса (например, (table, query, limit))
+            load(Callable[[], Any]): функция, выполняющая запрос
+        Returns:
+            tuple: (результат, True - получен из кэша).
+        """
+        if not self.enabled:
+            return load(), False
+
+        now = time.monotonic()
+        with self.__lock:
+            version = self.__version(table)
+            entry = self.__entries.get(key)
+            if entry is not None:
+                value, _, entry_version, expires_at, _ = entry
+                if entry_version == version and expires_at > now:
+                    self.__entries.move_to_end(key)
+                    self.__stats["hits"] += 1
+                    return value, True
+                self.__stats["expired" if entry_version == version else "invalidations"] += 1
+                self.__remove(key)
+            self.__stats["misses"] += 1
+
+        value = load()
+        #  Версия запоминается до запроса: если таблица изменилась во время чтения,
+        #  запись сразу окажется устаревшей и не будет отдана
+        self.__put(key, value, table, version)
+        return value, False
+
+    def __put(self, key: Hashable, value: Any, table: str, version: int) -> None:
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (value, table, version, time.monotonic() + self.ttl, size)
+            self.__bytes += size
+            while len(self.__entries) > self.max_entries or self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.__stats["evictions"] += 1
+
+    def __remove(self, key: Hashable) -> None:
+        _, _, _, _, size = self.__entries.pop(key)
+        self.__bytes -= size
+
+    def invalidate(self, *tables: str) -> None:
+        """
+        Увеличивает версии таблиц: закэшированные результаты по ним больше не отдаются.
+        Без аргументов сбрасывает кэш по всем таблицам.
+        """
+        with self.__lock:
+            if tables:
+                for table in tables:
+                    self.__versions[table] = self.__versions.get(table, 0) + 1
+                stale = [key for key, entry in self.__entries.items() if entry[1] in tables]
+            else:
+                self.__epoch += 1
+                stale = list(self.__entries)
+            for key in stale:
+                self.__remove(key)
+            self.__stats["invalidations"] += len(stale)
+
+    def clear(self) -> None:
+        """Очищает кэш и статистику (версии таблиц сохраняются)."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+            self.__stats = dict.fromkeys(self.__stats, 0)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict[str, Any]: попадания, промахи, доля попаданий, вытеснения, устаревшие по TTL
+            и по версии записи, текущее количество записей и их объем.
+        """
+        with self.__lock:
+            lookups = self.__stats["hits"] + self.__stats["misses"]
+            return {
+                **self.__stats,
+                "hit_rate": self.__stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self.__entries),
+                "bytes": self.__bytes,
+            }
+
+    def __repr__(self) -> str:
+        stats = self.stats()
+        return f"ResultCache(entries={stats['entries']}, hit_rate={stats['hit_rate']:.2f})"
@@ -0,0 +1,106 @@
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Hashable
+
+
+class RetryLater(Exception):
+    """
+    Исключение, сигнализирующее, что запрос нужно повторить позже
+    (статистика еще вычисляется или исчерпан лимит запросов).
+    """
+
+    def __init__(self, message: str, delay: float | None = None) -> None:
+        """
+        Args:
+            message(str): описание причины
+            delay(float | None): рекомендуемая задержка в секундах (None - по расписанию backoff)
+        """
+        super().__init__(message)
+        self.delay = delay
+
+
+class RetryScheduler:
+    """
+    Представляет отложенную очередь повторов с экспоненциальной задержкой и джиттером.
+
+    Элементы "паркуются" до момента повтора, а вызывающий код тем временем
+    продолжает обрабатывать другие задачи и периодически забирает готовые элементы.
+    Дедлайн отсчитывается для каждого элемента от его первого откладывания: повторы
+    позже дедлайна не планируются, сколько бы ни длилась обработка остальных элементов.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 30.0, deadline: float = 600.0) -> None:
+        """
+        Конструктор класса RetryScheduler.
+
+        Args:
+            base_delay(float): задержка перед первым повтором, секунд
+            max_delay(float): максимальная задержка между повторами, секунд
+            deadline(float): через сколько секунд от первого откладывания элемента
+            прекращать планировать его повторы
+        """
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+        self.__deadline = deadline
+        self.__heap: list[tuple[float, int, Any]] = []
+        self.__attempts: dict[Hashable, int] = {}
+        self.__first_parked: dict[Hashable, float] = {}
+        self.__counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def park(self, key: Hashable, item: Any, delay: float | None = None) -> bool:
+        """
+        Откладывает элемент до следующей попытки.
+
+        Args:
+            key(Hashable): ключ элемента для подсчета попыток
+            item(Any): откладываемый элемент
+            delay(float | None): явная задержка (например, до сброса лимита запросов)
+        Returns:
+            bool: False, если следующая попытка не успевает до дедлайна.
+        """
+        now = time.monotonic()
+        attempt = self.__attempts.get(key, 0) + 1
+        self.__attempts[key] = attempt
+        first_parked = self.__first_parked.setdefault(key, now)
+
+        if delay is None:
+            #  Экспоненциальная задержка с "равным" джиттером: [d/2, d]
+            delay = min(self.__max_delay, self.__base_delay * 2 ** (attempt - 1))
+            delay = random.uniform(delay / 2, delay)
+
+        ready_at = now + max(delay, 0.0)
+        if ready_at > first_parked + self.__deadline:
+            return False
+
+        heapq.heappush(self.__heap, (ready_at, next(self.__counter), item))
+        return True
+
+    def pop_ready(self) -> list[Any]:
+        """
+        Забирает элементы, время повтора которых наступило.
+
+        Returns:
+            list[Any]: список готовых к повтору элементов.
+        """
+        now = time.monotonic()
+        ready = []
+        while self.__heap and self.__heap[0][0] <= now:
+            ready.append(heapq.heappop(self.__heap)[2])
+        return ready
+
+    def next_delay(self) -> float | None:
+        """
+        Возвращает время в секундах до ближайшего повтора или None, если очередь пуста.
+        """
+        if not self.__heap:
+            return None
+        return max(self.__heap[0][0] - time.monotonic(), 0.0)
+
+    def attempts(self, key: Hashable) -> int:
+        """Возвращает количество отложенных попыток для элемента."""
+        return self.__attempts.get(key, 0)
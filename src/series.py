@@ -0,0 +1,103 @@
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterable, Iterator
+
+
+class ContributorWeeks:
+    """
+    Представляет недельную статистику контрибьютора в репозитории в колоночном виде.
+
+    Недели хранятся в четырех массивах array('q') (метка недели, добавленные строки,
+    удаленные строки, коммиты), поэтому память растет на 32 байта на неделю,
+    а не на размер словаря Python на каждую неделю.
+    """
+    __slots__ = ("repo_name", "repo_url", "contributor_name", "timestamps", "additions", "deletions", "commits")
+
+    def __init__(self, repo_name: str, repo_url: str, contributor_name: str) -> None:
+        """
+        Конструктор класса ContributorWeeks.
+
+        Args:
+            repo_name(str): наименование репозитория
+            repo_url(str): url статистики репозитория (идентифицирует репозиторий вместе с владельцем)
+            contributor_name(str): логин контрибьютора
+        """
+        self.repo_name = repo_name
+        self.repo_url = repo_url
+        self.contributor_name = contributor_name
+        self.timestamps = array("q")
+        self.additions = array("q")
+        self.deletions = array("q")
+        self.commits = array("q")
+
+    @classmethod
+    def from_weeks(cls, repo_name: str, repo_url: str, contributor_name: str, weeks: Iterable[dict[str, Any]],
+                   skip_empty: bool = True) -> "ContributorWeeks":
+        """
+        Собирает ряд из списка недель ответа /stats/contributors.
+
+        Args:
+            repo_name(str): наименование репозитория
+            repo_url(str): url статистики репозитория
+            contributor_name(str): логин контрибьютора
+            weeks(Iterable[dict[str, Any]]): недели в формате GitHub {"w", "a", "d", "c"}
+            skip_empty(bool): пропускать недели без изменений и коммитов
+        Returns:
+            ContributorWeeks: недельный ряд контрибьютора.
+        """
+        series = cls(repo_name, repo_url, contributor_name)
+        for week in weeks:
+            additions, deletions, commits = week.get("a", 0), week.get("d", 0), week.get("c", 0)
+            if skip_empty and not (additions or deletions or commits):
+                continue
+            series.append(week["w"], additions, deletions, commits)
+        return series
+
+    def append(self, timestamp: int, additions: int, deletions: int, commits: int) -> None:
+        """Добавляет неделю в конец ряда."""
+        self.timestamps.append(timestamp)
+        self.additions.append(additions)
+        self.deletions.append(deletions)
+        self.commits.append(commits)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def since(self, timestamp: int) -> "ContributorWeeks":
+        """
+        Возвращает ряд, содержащий только недели начиная с timestamp (включительно).
+
+        Args:
+            timestamp(int): метка недели
+        Returns:
+            ContributorWeeks: хвост ряда.
+        """
+        start = bisect_left(self.timestamps, timestamp)
+        series = ContributorWeeks(self.repo_name, self.repo_url, self.contributor_name)
+        series.timestamps = self.timestamps[start:]
+        series.additions = self.additions[start:]
+        series.deletions = self.deletions[start:]
+        series.commits = self.commits[start:]
+        return series
+
+    def __repr__(self) -> str:
+        return f"ContributorWeeks({self.repo_name!r}, {self.contributor_name!r}, weeks={len(self)})"
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти, занимаемый колонками, байт."""
+        return sum(column.itemsize * len(column)
+                   for column in (self.timestamps, self.additions, self.deletions, self.commits))
+
+    def rows(self, repo_id: int) -> Iterator[tuple[int, str, int, int, int, int]]:
+        """
+        Отдает строки для таблицы contributor_weeks.
+
+        Args:
+            repo_id(int): идентификатор репозитория в БД
+        Returns:
+            Iterator[tuple]: (repo_id, contributor_name, week_timestamp, lines_added, lines_deleted, commit_count).
+        """
+        for timestamp, additions, deletions, commits in zip(self.timestamps, self.additions,
+                                                            self.deletions, self.commits):
+            yield repo_id, self.contributor_name, timestamp, additions, deletions, commits
@@ -0,0 +1,348 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from src.db_manager import AbstractDBManager
+from src.metrics import Metrics
+from src.records import StatsBatch
+from src.result_cache import ResultCache
+
+
+class SQLiteDB(AbstractDBManager):
+    """
+    Представляет класс SQLiteDB - хранение данных в локальном файле SQLite
+    без сервера Postgres (разовые анализы, CI, однопользовательские запуски).
+
+    Схема, запись пакетов, чтение и экспорт общие с PostgresDB (см. AbstractDBManager),
+    здесь реализован только диалект SQLite. Файл открывается в режиме WAL:
+    читатели (например, sqlite3 или аналитика в другом процессе) не блокируют запись.
+    Строки записываются пакетами через executemany с upsert (ON CONFLICT DO UPDATE).
+    Соединение одно на экземпляр, доступ к нему из разных потоков сериализуется блокировкой.
+    """
+    database_error = sqlite3.DatabaseError
+    placeholder = "?"
+    no_limit = -1
+    load_method = "executemany"
+    #  Ограничение на число параметров запроса в старых сборках SQLite - 999
+    max_variables = 900
+
+    def __init__(self, path: str | Path = "github_stat.db", incremental: bool = False,
+                 metrics: Metrics | None = None, result_cache: ResultCache | None = None):
+        """
+        Конструктор класса SQLiteDB.
+
+        Args:
+            path(str | Path): файл БД (":memory:" - БД в памяти)
+            incremental(bool): инкрементальный режим - существующий файл сохраняется,
+            иначе БД создается заново
+            metrics(Metrics | None): реестр метрик (по умолчанию - собственный)
+            result_cache(ResultCache | None): кэш результатов get_data_from_table
+            (по умолчанию - собственный, ResultCache(ttl=0) выключает кэширование)
+        """
+        self.path = str(path)
+        self.incremental = incremental
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.__lock = threading.RLock()
+        self.conn = None
+
+        if not incremental:
+            self._remove_files(self.path)
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        #  В режиме WAL synchronous=NORMAL сохраняет целостность БД и не вызывает fsync на каждый коммит
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
+        self.conn.execute("PRAGMA foreign_keys = ON;")
+        print(f"Соединение БД '{self.path}' успешно установлено.")
+
+    @staticmethod
+    def _remove_files(path: str) -> bool:
+        """Удаляет файл БД вместе с журналами WAL; возвращает True, если файл был."""
+        if path == ":memory:":
+            return False
+        existed = os.path.exists(path)
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+        return existed
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Отдает соединение для одной операции, удерживая блокировку экземпляра.
+        """
+        with self.__lock:
+            yield self.conn
+
+    @contextmanager
+    def _transaction(self, operation: str = "transaction") -> Iterator[sqlite3.Cursor]:
+        """
+        Выполняет блок в одной транзакции (BEGIN IMMEDIATE): фиксирует изменения при успехе
+        и откатывает при ошибке. Длительность транзакции учитывается в метрике
+        db_transaction_seconds с меткой operation.
+        """
+        started = time.perf_counter()
+        status = "error"
+        with self._connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("BEGIN IMMEDIATE;")
+                yield cur
+                conn.commit()
+                status = "ok"
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                cur.close()
+                self.metrics.observe("db_transaction_seconds", time.perf_counter() - started,
+                                     operation=operation, status=status)
+
+    def create_table(self, table_name: str) -> None:
+        """
+        Создание таблиц для сохранения данных
+        """
+        if table_name == "repos":
+            script = """
+            CREATE TABLE IF NOT EXISTS repos (
+                id INTEGER PRIMARY KEY,
+                repo_name VARCHAR(225) NOT NULL,
+                repo_url TEXT NOT NULL UNIQUE
+            );
+            CREATE INDEX IF NOT EXISTS repos_repo_name_idx ON repos (repo_name);
+            """
+        elif table_name == "contributors":
+            script = """
+            CREATE TABLE IF NOT EXISTS contributors(
+                id INTEGER PRIMARY KEY,
+                contributor_name VARCHAR(100) NOT NULL,
+                total_commits INTEGER NOT NULL,
+                weekly_timestamp INTEGER NOT NULL,
+                weekly_lines_added INTEGER NOT NULL,
+                weekly_lines_deleted INTEGER NOT NULL,
+                weekly_commit_count INTEGER NOT NULL,
+                repo_id INTEGER NOT NULL,
+                FOREIGN KEY (repo_id) REFERENCES repos(id),
+                UNIQUE (repo_id, contributor_name)
+            );
+            CREATE INDEX IF NOT EXISTS contributors_weekly_lines_added_idx
+                ON contributors (weekly_lines_added);
+            """
+        elif table_name == "contributor_weeks":
+            #  WITHOUT ROWID: строки хранятся в B-дереве первичного ключа, без отдельного индекса
+            script = """
+            CREATE TABLE IF NOT EXISTS contributor_weeks(
+                repo_id INTEGER NOT NULL,
+                contributor_name VARCHAR(100) NOT NULL,
+                week_timestamp BIGINT NOT NULL,
+                lines_added INTEGER NOT NULL,
+                lines_deleted INTEGER NOT NULL,
+                commit_count INTEGER NOT NULL,
+                FOREIGN KEY (repo_id) REFERENCES repos(id),
+                PRIMARY KEY (repo_id, contributor_name, week_timestamp)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS contributor_weeks_week_timestamp_idx
+                ON contributor_weeks (week_timestamp);
+            """
+        elif table_name == "repo_sync_state":
+            script = """
+            CREATE TABLE IF NOT EXISTS repo_sync_state(
+                full_name TEXT PRIMARY KEY,
+                pushed_at TEXT,
+                last_week BIGINT,
+                synced_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        else:
+            print("Таблицу с таким именем создать нельзя: используйте для создания имена "
+                  "'repos', 'contributors', 'contributor_weeks', 'repo_sync_state'")
+            return
+
+        with self._connection() as conn:
+            conn.executescript(script)
+
+    def _insert_repos(self, cur: sqlite3.Cursor, data: StatsBatch) -> dict[str, int]:
+        """
+        Пакетно вставляет (или обновляет) репозитории пакета.
+
+        Returns:
+            dict[str, int]: соответствие url репозитория его идентификатору.
+        """
+        if not data.repos:
+            return {}
+
+        cur.executemany("""
+            INSERT INTO repos (repo_url, repo_name) VALUES (?, ?)
+            ON CONFLICT (repo_url) DO UPDATE SET repo_name = excluded.repo_name;
+        """, [(repo.repo_url, repo.repo_name) for repo in data.repos])
+        return self._get_repo_ids(cur, data.repos)
+
+    def _get_repo_ids(self, cur: sqlite3.Cursor, repos: Iterable[Any]) -> dict[str, int]:
+        """
+        Получает идентификаторы репозиториев (RepoRef или url) порциями по max_variables url.
+        """
+        urls = [repo if isinstance(repo, str) else repo.repo_url for repo in repos]
+        repo_ids = {}
+        for start in range(0, len(urls), self.max_variables):
+            chunk = urls[start:start + self.max_variables]
+            cur.execute(f"SELECT repo_url, id FROM repos WHERE repo_url IN ({', '.join('?' * len(chunk))});",
+                        chunk)
+            repo_ids.update(cur.fetchall())
+        return repo_ids
+
+    def _merge_rows(self, cur: sqlite3.Cursor, table: str, columns: tuple[str, ...], key_columns: tuple[str, ...],
+                    rows: Iterable[tuple], method: str = "executemany") -> int:
+        """
+        Записывает строки в table через INSERT ... ON CONFLICT DO UPDATE пакетами по batch_size
+        (строки генерируются лениво и не собираются в памяти целиком).
+
+        Returns:
+            int: количество вставленных или обновленных строк table.
+        """
+        if method != "executemany":
+            raise ValueError(f"Неизвестный способ загрузки: {method}. Допустимые способы: executemany.")
+
+        column_list = ", ".join(columns)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key_columns)
+        sql = (f"INSERT INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates};")
+
+        rows = iter(rows)
+        rows_count = 0
+        with self.metrics.timer("db_load_seconds", table=table, method=method):
+            while batch := list(islice(rows, self.batch_size)):
+                cur.executemany(sql, batch)
+                rows_count += len(batch)
+        self.metrics.inc("db_rows_written_total", rows_count, table=table)
+        return rows_count
+
+    def _update_sync_state(self, cur: sqlite3.Cursor, sync_state: Iterable[tuple[str, str | None, int | None]]) -> None:
+        """
+        Записывает состояние синхронизации репозиториев (full_name, pushed_at, last_week).
+        """
+        cur.executemany("""
+            INSERT INTO repo_sync_state (full_name, pushed_at, last_week) VALUES (?, ?, ?)
+            ON CONFLICT (full_name) DO UPDATE SET
+                pushed_at = excluded.pushed_at,
+                last_week = COALESCE(excluded.last_week, repo_sync_state.last_week),
+                synced_at = CURRENT_TIMESTAMP;
+        """, sync_state)
+
+    def get_sync_state(self) -> dict[str, dict[str, Any]]:
+        """
+        Получает сохраненное состояние синхронизации репозиториев.
+
+        Returns:
+            dict[str, dict[str, Any]]: full_name репозитория -> {"pushed_at", "last_week"}.
+        """
+        with self._connection() as conn:
+            return {
+                full_name: {"pushed_at": pushed_at, "last_week": last_week}
+                for full_name, pushed_at, last_week in
+                conn.execute("SELECT full_name, pushed_at, last_week FROM repo_sync_state;")
+            }
+
+    def get_repo_id(self, repo_name: str) -> int:
+        """
+        Получает идентификатор репозитория по его имени.
+
+        Args:
+            repo_name (str): имя репозитория
+
+        Returns:
+            int: идентификатор репозитория
+        """
+        with self._connection() as conn:
+            result = conn.execute("SELECT id FROM repos WHERE repo_name = ?;", (repo_name,)).fetchone()
+        if result:
+            return result[0]
+        raise ValueError(f"Репозиторий '{repo_name}' не найден.")
+
+    def drop_table(self, table: str) -> None:
+        """
+        Удаляет таблицу, если она существует.
+
+        Args:
+             table(str): наименование таблицы.
+        """
+        with self._connection() as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table};")
+        self.result_cache.invalidate(table)
+
+    def drop_db(self, dbname: str | None = None) -> None:
+        """
+        Удаляет файл БД (вместе с журналами WAL), если он существует.
+
+        Args:
+             dbname(str | None): путь к файлу БД (по умолчанию - файл этого экземпляра).
+        """
+        path = self.path if dbname is None else str(dbname)
+        if path == self.path:
+            self.close()
+        self._remove_files(path)
+        self.result_cache.invalidate()
+        print(f"База данных '{path}' успешно удалена, если она существовала.")
+
+    def _query(self, query: str, params: tuple | dict = ()) -> list[dict[str, Any]]:
+        """
+        Выполняет запрос на чтение и возвращает строки в виде словарей (ключи - имена колонок).
+        """
+        with self._connection() as conn:
+            cur = conn.execute(query, params)
+            columns = [column[0] for column in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    @contextmanager
+    def _export_rows(self, table: str, columns: tuple[str, ...], itersize: int) -> Iterator[Iterable[tuple]]:
+        """
+        Отдает строки таблицы порциями по itersize, удерживая соединение до конца выгрузки.
+        """
+        with self._connection() as conn:
+            cur = conn.execute(f"SELECT {', '.join(columns)} FROM {table};")
+
+            def rows() -> Iterator[tuple]:
+                while batch := cur.fetchmany(itersize):
+                    yield from batch
+
+            yield rows()
+
+    def _weekly_churn_query(self, preceding: int) -> str:
+        """
+        Запрос get_weekly_churn (границу окна SQLite принимает только константой, а не параметром).
+        """
+        return f"""
+            WITH weekly AS (
+                SELECT w.week_timestamp,
+                       SUM(w.lines_added) AS lines_added,
+                       SUM(w.lines_deleted) AS lines_deleted,
+                       SUM(w.lines_added + w.lines_deleted) AS churn,
+                       SUM(w.commit_count) AS commits,
+                       COUNT(DISTINCT w.contributor_name) AS active_contributors
+                FROM contributor_weeks w
+                JOIN repos r ON r.id = w.repo_id
+                WHERE (:repo_name IS NULL OR r.repo_name = :repo_name)
+                  AND w.week_timestamp > (SELECT MAX(week_timestamp) FROM contributor_weeks) - :span
+                GROUP BY w.week_timestamp
+            )
+            SELECT *,
+                   CAST(AVG(churn) OVER (ORDER BY week_timestamp
+                                         ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW) AS REAL) AS rolling_churn
+            FROM weekly
+            ORDER BY week_timestamp;
+        """
+
+    def close(self):
+        """Закрывает соединение с базой данных."""
+        if self.conn is not None:
+            with self._connection() as conn:
+                try:
+                    conn.close()
+                    print("Соединение с базой данных закрыто.")
+                except sqlite3.Error as e:
+                    print(f"Ошибка при закрытии соединения: {e}")
+            self.conn = None
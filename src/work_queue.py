@@ -0,0 +1,196 @@
+import os
+import socket
+import threading
+from typing import Any, Iterable
+
+from psycopg2.extras import execute_values
+
+from src.postgres_db import PostgresDB
+
+
+class PostgresWorkQueue:
+    """
+    Представляет очередь репозиториев для распределенного обхода в таблице crawl_queue.
+
+    Воркеры на разных машинах забирают репозитории через SELECT ... FOR UPDATE SKIP LOCKED,
+    получая аренду (lease) на заданное время и продлевая ее фоновым heartbeat.
+    Репозитории с истекшей арендой (воркер упал) снова становятся доступны для захвата.
+    """
+
+    def __init__(self, db: PostgresDB, worker_id: str | None = None, lease: float = 300.0,
+                 max_attempts: int = 5) -> None:
+        """
+        Конструктор класса PostgresWorkQueue.
+
+        Args:
+            db(PostgresDB): БД (для воркера с heartbeat нужен режим пула соединений)
+            worker_id(str | None): идентификатор воркера (по умолчанию - хост и pid)
+            lease(float): длительность аренды репозитория, секунд
+            max_attempts(int): после стольких неудачных попыток репозиторий помечается как failed
+        """
+        self.db = db
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.__heartbeat_stop = threading.Event()
+        self.__heartbeat_thread: threading.Thread | None = None
+
+    def create_table(self) -> None:
+        """
+        Создает таблицу очереди crawl_queue.
+        """
+        with self.db.transaction() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_queue(
+                    username TEXT NOT NULL,
+                    repo_name TEXT NOT NULL,
+                    pushed_at TEXT,
+                    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    lease_until TIMESTAMPTZ,
+                    heartbeat_at TIMESTAMPTZ,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    PRIMARY KEY (username, repo_name)
+                );
+                CREATE INDEX IF NOT EXISTS crawl_queue_status_lease_idx ON crawl_queue (status, lease_until);
+            """)
+
+    def enqueue(self, username: str, repos: Iterable[dict[str, Any]]) -> int:
+        """
+        Ставит репозитории пользователя в очередь. Уже обработанный репозиторий
+        возвращается в очередь, только если изменился его pushed_at.
+
+        Args:
+            username(str): владелец репозиториев
+            repos(Iterable[dict[str, Any]]): репозитории из GitHubParser.iter_repos
+        Returns:
+            int: количество поставленных в очередь репозиториев: добавленных и возвращенных
+            в очередь (репозитории, уже стоящие в очереди или не изменившиеся, не учитываются).
+        """
+        #  Повтор имени в одном INSERT ... ON CONFLICT DO UPDATE - ошибка, оставляем последнее значение
+        rows = list({repo["name"]: (username, repo["name"], repo.get("pushed_at")) for repo in repos}.values())
+        if not rows:
+            return 0
+        with self.db.transaction() as cur:
+            #  RETURNING отдает только вставленные и обновленные строки: строки, отсеянные
+            #  условием WHERE в DO UPDATE, не возвращаются
+            affected = execute_values(cur, """
+                INSERT INTO crawl_queue (username, repo_name, pushed_at) VALUES %s
+                ON CONFLICT (username, repo_name) DO UPDATE
+                SET status = 'pending', pushed_at = EXCLUDED.pushed_at, attempts = 0, last_error = NULL
+                WHERE crawl_queue.status IN ('done', 'failed')
+                  AND crawl_queue.pushed_at IS DISTINCT FROM EXCLUDED.pushed_at
+                RETURNING 1;
+            """, rows, page_size=self.db.batch_size, fetch=True)
+        return len(affected)
+
+    def claim(self, batch_size: int = 10) -> list[dict[str, Any]]:
+        """
+        Захватывает до batch_size свободных репозиториев (ожидающих или с истекшей арендой).
+        Строки, захваченные другими воркерами, пропускаются без ожидания (SKIP LOCKED).
+
+        Args:
+            batch_size(int): максимальное количество репозиториев
+        Returns:
+            list[dict[str, Any]]: захваченные репозитории с ключами "username", "name", "pushed_at".
+        """
+        with self.db.transaction() as cur:
+            cur.execute("""
+                UPDATE crawl_queue q
+                SET status = 'running', worker_id = %(worker_id)s, attempts = q.attempts + 1,
+                    lease_until = now() + make_interval(secs => %(lease)s), heartbeat_at = now()
+                FROM (
+                    SELECT username, repo_name FROM crawl_queue
+                    WHERE status = 'pending' OR (status = 'running' AND lease_until < now())
+                    ORDER BY username, repo_name
+                    LIMIT %(batch_size)s
+                    FOR UPDATE SKIP LOCKED
+                ) free
+                WHERE q.username = free.username AND q.repo_name = free.repo_name
+                RETURNING q.username, q.repo_name, q.pushed_at;
+            """, {"worker_id": self.worker_id, "lease": self.lease, "batch_size": batch_size})
+            return [
+                {"username": username, "name": repo_name, "pushed_at": pushed_at}
+                for username, repo_name, pushed_at in cur.fetchall()
+            ]
+
+    def heartbeat(self) -> int:
+        """
+        Продлевает аренду всех репозиториев, захваченных этим воркером.
+
+        Returns:
+            int: количество продленных репозиториев.
+        """
+        with self.db.transaction() as cur:
+            cur.execute("""
+                UPDATE crawl_queue
+                SET lease_until = now() + make_interval(secs => %s), heartbeat_at = now()
+                WHERE worker_id = %s AND status = 'running';
+            """, (self.lease, self.worker_id))
+            return cur.rowcount
+
+    def complete(self, username: str, repo_name: str) -> None:
+        """Отмечает репозиторий как обработанный."""
+        with self.db.transaction() as cur:
+            cur.execute("""
+                UPDATE crawl_queue SET status = 'done', worker_id = NULL, lease_until = NULL
+                WHERE username = %s AND repo_name = %s AND worker_id = %s;
+            """, (username, repo_name, self.worker_id))
+
+    def fail(self, username: str, repo_name: str, error: str) -> None:
+        """
+        Возвращает репозиторий в очередь после ошибки или помечает его как failed,
+        если исчерпано количество попыток.
+        """
+        with self.db.transaction() as cur:
+            cur.execute("""
+                UPDATE crawl_queue
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    worker_id = NULL, lease_until = NULL, last_error = %s
+                WHERE username = %s AND repo_name = %s AND worker_id = %s;
+            """, (self.max_attempts, error, username, repo_name, self.worker_id))
+
+    def requeue_expired(self) -> int:
+        """
+        Возвращает в очередь репозитории, аренда которых истекла (воркер перестал отправлять heartbeat).
+
+        Returns:
+            int: количество возвращенных репозиториев.
+        """
+        with self.db.transaction() as cur:
+            cur.execute("""
+                UPDATE crawl_queue SET status = 'pending', worker_id = NULL, lease_until = NULL
+                WHERE status = 'running' AND lease_until < now();
+            """)
+            return cur.rowcount
+
+    def stats(self) -> dict[str, int]:
+        """Количество репозиториев в очереди по статусам."""
+        with self.db.transaction() as cur:
+            cur.execute("SELECT status, COUNT(*) FROM crawl_queue GROUP BY status;")
+            return dict(cur.fetchall())
+
+    def start_heartbeat(self) -> None:
+        """Запускает фоновый поток, продлевающий аренду каждую треть ее длительности."""
+        if self.__heartbeat_thread is not None:
+            return
+        self.__heartbeat_stop.clear()
+
+        def beat() -> None:
+            while not self.__heartbeat_stop.wait(self.lease / 3):
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    print(f"Ошибка heartbeat воркера {self.worker_id}: {e}")
+
+        self.__heartbeat_thread = threading.Thread(target=beat, name=f"heartbeat-{self.worker_id}", daemon=True)
+        self.__heartbeat_thread.start()
+
+    def stop_heartbeat(self) -> None:
+        """Останавливает фоновый heartbeat."""
+        if self.__heartbeat_thread is None:
+            return
+        self.__heartbeat_stop.set()
+        self.__heartbeat_thread.join()
+        self.__heartbeat_thread = None
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import pytest
+
+from benchmarks.fake_github import FakeGitHubAPI
+from benchmarks.fixtures import GitHubFixtures
+from src import json_stream
+from src.sqlite_db import SQLiteDB
+
+TABLES = ("repos", "contributors", "contributor_weeks", "repo_sync_state")
+
+
+class StubServer:
+    """
+    Локальный HTTP-сервер с ответами, которые задает тест: handler(method, path, body)
+    возвращает (status, headers, body). Все запросы записываются в calls.
+    """
+
+    def __init__(self, handler: Callable[[str, str, bytes], tuple[int, dict, bytes | dict | list]]) -> None:
+        self.handler = handler
+        self.calls: list[tuple[str, str, float]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _respond(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.calls.append((self.command, self.path, time.monotonic()))
+                status, headers, payload = stub.handler(self.command, self.path, body)
+                if not isinstance(payload, bytes):
+                    payload = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _respond
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+@pytest.fixture
+def stub_server():
+    """Фабрика StubServer; серверы останавливаются после теста."""
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def github_fixtures() -> GitHubFixtures:
+    return GitHubFixtures(users=2, repos=12, contributors=3, weeks=20, seed=1, empty_every=5)
+
+
+@pytest.fixture
+def fake_api(github_fixtures):
+    with FakeGitHubAPI(github_fixtures) as api:
+        yield api
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    db = SQLiteDB(tmp_path / "github_stat.db")
+    for table in TABLES:
+        db.create_table(table)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """
+    Подменяет time.sleep: паузы записываются и не выполняются, а time.monotonic
+    сдвигается на их длительность, как если бы время прошло.
+    """
+    sleeps = []
+    offset = [0.0]
+    monotonic = time.monotonic
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        offset[0] += seconds
+
+    monkeypatch.setattr(time, "sleep", sleep)
+    monkeypatch.setattr(time, "monotonic", lambda: monotonic() + offset[0])
+    return sleeps
+
+
+@pytest.fixture
+def ijson_streaming(monkeypatch):
+    """
+    Включает потоковый разбор через ijson с любым его бэкендом (json_stream отключает
+    медленный чисто Python-бэкенд); без ijson тест пропускается.
+    """
+    ijson = pytest.importorskip("ijson")
+    monkeypatch.setattr(json_stream, "ijson", ijson)
+    monkeypatch.setattr("src.functions.STREAMING", True)
+    return ijson
+
+
+@pytest.fixture
+def postgres_params():
+    """
+    Параметры тестовой БД Postgres из файла, указанного в GITHUB_STAT_TEST_DB
+    (формат database.ini); без переменной тесты с Postgres пропускаются.
+    """
+    path = os.getenv("GITHUB_STAT_TEST_DB")
+    if not path:
+        pytest.skip("GITHUB_STAT_TEST_DB не задана: тесты с Postgres пропущены")
+    from config import config
+    params = config(path)
+    params["dbname"] = "github_stat_test"
+    return params
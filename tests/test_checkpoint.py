@@ -0,0 +1,84 @@
+import json
+
+from src.checkpoint import CrawlCheckpoint
+
+
+def read_records(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_marks_survive_restart(tmp_path):
+    path = tmp_path / "state.json"
+    checkpoint = CrawlCheckpoint(path)
+    assert not path.exists()
+    checkpoint.mark_repo_done("alice", "repo0")
+    checkpoint.mark_repo_done("alice", "repo1")
+    checkpoint.mark_repo_done("alice", "repo0")
+    checkpoint.mark_account_done("bob")
+
+    restored = CrawlCheckpoint(path)
+    assert restored.done_repos("alice") == {"repo0", "repo1"}
+    assert restored.is_account_done("bob")
+    assert not restored.is_account_done("alice")
+    assert restored.done_repos("carol") == set()
+
+
+def test_repo_marks_are_appended(tmp_path):
+    path = tmp_path / "state.json"
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.mark_repo_done("alice", "repo0")
+    checkpoint.mark_repo_done("alice", "repo0")
+    checkpoint.mark_repo_done("alice", "repo1")
+    assert read_records(path) == [{"account": "alice", "repo": "repo0"}, {"account": "alice", "repo": "repo1"}]
+
+
+def test_account_done_compacts_log(tmp_path):
+    path = tmp_path / "state.json"
+    checkpoint = CrawlCheckpoint(path)
+    for index in range(5):
+        checkpoint.mark_repo_done("alice", f"repo{index}")
+    checkpoint.mark_repo_done("bob", "repo0")
+    checkpoint.mark_account_done("alice")
+
+    records = read_records(path)
+    assert {"account": "alice", "done": True} in records
+    assert {"account": "bob", "repo": "repo0"} in records
+    assert len(records) == 2
+    assert checkpoint.done_repos("alice") == set()
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / "state.json"
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.mark_repo_done("alice", "repo0")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"account": "alice", "re')
+
+    restored = CrawlCheckpoint(path)
+    assert restored.done_repos("alice") == {"repo0"}
+    #  Журнал сжат при открытии, и новые отметки не склеиваются с оборванной строкой
+    restored.mark_repo_done("alice", "repo1")
+    assert CrawlCheckpoint(path).done_repos("alice") == {"repo0", "repo1"}
+
+
+def test_legacy_format_is_loaded(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"accounts": {
+        "alice": {"done": True, "repos": []},
+        "bob": {"done": False, "repos": ["repo0", "repo1"]},
+    }}), encoding="utf-8")
+
+    checkpoint = CrawlCheckpoint(path)
+    assert checkpoint.is_account_done("alice")
+    assert checkpoint.done_repos("bob") == {"repo0", "repo1"}
+    assert {"account": "alice", "done": True} in read_records(path)
+
+
+def test_clear_removes_file(tmp_path):
+    path = tmp_path / "state.json"
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.mark_account_done("alice")
+    checkpoint.clear()
+    assert not path.exists()
+    assert not checkpoint.is_account_done("alice")
+    assert not CrawlCheckpoint(path).is_account_done("alice")
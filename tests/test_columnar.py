@@ -0,0 +1,75 @@
+import json
+import struct
+
+import pytest
+
+from src import columnar
+from src.columnar import ColumnarReader, write_columnar
+
+COLUMNS = ("repo_name", "total_commits", "weekly_timestamp")
+ROWS = [("alpha", 3, 100), ("beta", -2, 200), ("alpha", 2 ** 40, 300), ("гамма", 0, 400)]
+
+
+@pytest.fixture(params=["numpy", "memoryview"])
+def reader_backend(request, monkeypatch):
+    """Чтение через NumPy (если установлен) и через memoryview."""
+    if request.param == "numpy":
+        if columnar.numpy is None:
+            pytest.skip("NumPy не установлен")
+    else:
+        monkeypatch.setattr(columnar, "numpy", None)
+    return request.param
+
+
+def test_columnar_round_trip(tmp_path, reader_backend):
+    path = tmp_path / "contributors.col"
+    assert write_columnar(path, "contributors", COLUMNS, iter(ROWS), string_columns=["repo_name"]) == len(ROWS)
+
+    with ColumnarReader(path) as reader:
+        assert reader.table == "contributors"
+        assert len(reader) == len(ROWS)
+        assert reader.columns == list(COLUMNS)
+        assert reader.is_dictionary("repo_name")
+        assert not reader.is_dictionary("total_commits")
+        assert reader.dictionary("repo_name") == ["alpha", "beta", "гамма"]
+        assert list(reader.column("repo_name")) == [0, 1, 0, 2]
+        assert reader.strings("repo_name") == [row[0] for row in ROWS]
+        assert list(reader["total_commits"]) == [row[1] for row in ROWS]
+        assert sum(reader["weekly_timestamp"]) == 1000
+
+
+def test_columnar_sections_are_aligned(tmp_path):
+    path = tmp_path / "repos.col"
+    write_columnar(path, "repos", COLUMNS, ROWS, string_columns=["repo_name"])
+    data = path.read_bytes()
+    assert data.startswith(columnar.MAGIC)
+    (header_size,) = struct.unpack_from("<I", data, len(columnar.MAGIC))
+    start = len(columnar.MAGIC) + 4
+    header = json.loads(data[start:start + header_size])
+    offsets = [column[key] for column in header["columns"] for key in ("codes", "offsets", "data") if key in column]
+    assert len(offsets) == 5
+    assert all(offset % columnar.ALIGNMENT == 0 for offset in offsets)
+    assert min(offsets) >= start + header_size
+
+
+def test_columnar_empty_table(tmp_path):
+    path = tmp_path / "empty.col"
+    assert write_columnar(path, "repos", ("repo_name", "repo_url"), [], string_columns=["repo_name", "repo_url"]) == 0
+    with ColumnarReader(path) as reader:
+        assert len(reader) == 0
+        assert reader.strings("repo_name") == []
+
+
+def test_columnar_rejects_foreign_files_and_unknown_columns(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"[]")
+    with pytest.raises(ValueError):
+        ColumnarReader(path)
+
+    path = tmp_path / "repos.col"
+    write_columnar(path, "repos", COLUMNS, ROWS, string_columns=["repo_name"])
+    with ColumnarReader(path) as reader:
+        with pytest.raises(KeyError):
+            reader.column("missing")
+        with pytest.raises(ValueError):
+            reader.dictionary("total_commits")
@@ -0,0 +1,109 @@
+import pytest
+
+import main
+from benchmarks.fake_github import FakeGitHubAPI
+from src.checkpoint import CrawlCheckpoint
+from src.functions import GitHubParser
+
+
+class FlakyGitHubAPI(FakeGitHubAPI):
+    """Имитатор API, отвечающий 502 на запросы статистики репозиториев из broken."""
+
+    def __init__(self, *args, broken: tuple[str, ...] = (), **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.broken = set(broken)
+
+    def _stats(self, request, username: str, repo_name: str) -> None:
+        if repo_name in self.broken:
+            self._count("server_error")
+            self._send(request, 502, b'{"message": "Server Error"}')
+            return
+        super()._stats(request, username, repo_name)
+
+
+def crawl(mode: str, usernames: list[str], api_url: str, db, checkpoint: CrawlCheckpoint,
+          graphql: bool = False) -> GitHubParser:
+    parser = GitHubParser("token", url=api_url, max_workers=3, graphql=graphql)
+    if mode == "pipeline":
+        main.crawl_pipeline(usernames, parser, db, checkpoint)
+    else:
+        for username in usernames:
+            if not checkpoint.is_account_done(username):
+                main.crawl_account(username, parser, db, checkpoint)
+    return parser
+
+
+@pytest.mark.parametrize("mode", ["sequential", "pipeline"])
+def test_crawl_writes_all_repos_and_marks_accounts(mode, fake_api, github_fixtures, sqlite_db, tmp_path):
+    checkpoint = CrawlCheckpoint(tmp_path / "state.json")
+    crawl(mode, ["user0", "user1"], fake_api.url, sqlite_db, checkpoint)
+
+    state = sqlite_db.get_sync_state()
+    assert len(state) == 2 * github_fixtures.repos
+    assert state["user0/repo1"]["pushed_at"] == github_fixtures.listing("user0")[1]["pushed_at"]
+    assert checkpoint.is_account_done("user0") and checkpoint.is_account_done("user1")
+    with sqlite_db.transaction() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM contributors;").fetchone()[0] == github_fixtures.rows
+
+    #  Повторный обход не запрашивает статистику неизменившихся репозиториев
+    stats_calls = fake_api.counters["stats"]
+    crawl(mode, ["user0", "user1"], fake_api.url, sqlite_db, CrawlCheckpoint(tmp_path / "again.json"))
+    assert fake_api.counters["stats"] == stats_calls
+
+
+@pytest.mark.parametrize("mode", ["sequential", "pipeline"])
+def test_failed_repo_is_not_marked_synced(mode, github_fixtures, sqlite_db, tmp_path):
+    """Регрессия: ошибка API записывалась как пустая статистика с текущим pushed_at."""
+    checkpoint = CrawlCheckpoint(tmp_path / "state.json")
+    with FlakyGitHubAPI(github_fixtures, broken=("repo3",)) as api:
+        crawl(mode, ["user0"], api.url, sqlite_db, checkpoint)
+    assert "user0/repo3" not in sqlite_db.get_sync_state()
+    assert "repo3" not in checkpoint.done_repos("user0")
+    assert not checkpoint.is_account_done("user0")
+
+    #  Следующий запуск запрашивает только пропущенный репозиторий
+    with FakeGitHubAPI(github_fixtures) as api:
+        crawl(mode, ["user0"], api.url, sqlite_db, checkpoint)
+        assert api.counters["stats"] == 1
+    assert "user0/repo3" in sqlite_db.get_sync_state()
+    assert checkpoint.is_account_done("user0")
+
+
+@pytest.mark.parametrize("graphql", [False, True])
+@pytest.mark.parametrize("mode", ["sequential", "pipeline"])
+def test_unknown_account_does_not_abort_crawl(mode, graphql, fake_api, github_fixtures, sqlite_db, tmp_path):
+    """Регрессия: 404 (или NOT_FOUND в GraphQL) при получении списка одного аккаунта прерывал весь обход."""
+    checkpoint = CrawlCheckpoint(tmp_path / "state.json")
+    crawl(mode, ["nobody", "user0"], fake_api.url, sqlite_db, checkpoint, graphql=graphql)
+
+    assert not checkpoint.is_account_done("nobody")
+    assert checkpoint.is_account_done("user0")
+    assert len(sqlite_db.get_sync_state()) == github_fixtures.repos
+
+
+def test_list_changed_repos_reports_listing_errors(fake_api, sqlite_db):
+    parser = GitHubParser("token", url=fake_api.url)
+    assert main.list_changed_repos("nobody", parser, sqlite_db) is None
+    repos = main.list_changed_repos("user0", parser, sqlite_db, done_repos={"repo0"})
+    assert [repo["name"] for repo in repos][:2] == ["repo1", "repo2"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("tok1", ["tok1"]),
+    ("tok1, tok2", ["tok1", "tok2"]),
+    (" tok1,tok2,\n", ["tok1", "tok2"]),
+])
+def test_read_api_keys_strips_tokens(monkeypatch, value, expected):
+    monkeypatch.setenv("GITHUB_API_KEY", value)
+    assert main.read_api_keys() == expected
+
+
+@pytest.mark.parametrize("value", [None, "", " , ,"])
+def test_read_api_keys_requires_a_token(monkeypatch, value):
+    """Регрессия: без GITHUB_API_KEY запуск падал с AttributeError, а пустые токены уходили в запросы."""
+    if value is None:
+        monkeypatch.delenv("GITHUB_API_KEY", raising=False)
+    else:
+        monkeypatch.setenv("GITHUB_API_KEY", value)
+    with pytest.raises(SystemExit, match="GITHUB_API_KEY"):
+        main.read_api_keys()
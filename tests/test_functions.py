@@ -0,0 +1,291 @@
+import threading
+import time
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from benchmarks.fake_github import FakeGitHubAPI
+from benchmarks.fixtures import GitHubFixtures
+from src.functions import GitHubParser
+from src.json_stream import stream_contributors
+from src.scheduler import RetryLater
+
+
+SECONDARY_LIMIT = {"message": "You have exceeded a secondary rate limit. Please wait a few minutes."}
+
+
+def counter(parser: GitHubParser, name: str) -> float:
+    """Сумма значений счетчика метрик по всем меткам."""
+    return sum(item["value"] for item in parser.metrics.snapshot()["counters"].get(name, []))
+
+
+def collect(parser: GitHubParser, username: str = "user0") -> dict[str, list[dict]]:
+    return {repo["name"]: stats.to_dicts() for repo, stats, _ in parser.iter_repo_data(username)}
+
+
+def test_iter_repo_data_matches_fixtures(fake_api, github_fixtures):
+    parser = GitHubParser("token", url=fake_api.url, max_workers=4)
+    repos = list(parser.iter_repo_data("user0"))
+    parser.close()
+
+    assert [repo["name"] for repo, _, _ in repos] == [repo["name"] for repo in github_fixtures.listing("user0")]
+    for repo, stats, weeks in repos:
+        payload = github_fixtures.payload("user0", repo["name"])
+        assert len(stats) == len(payload)
+        assert [row.total_commits for row in stats] == [item["total"] for item in payload]
+        assert [series.contributor_name for series in weeks] == [item["author"]["login"] for item in payload]
+    assert parser.unresolved_repos == []
+
+
+def test_iter_repos_follows_link_pages(fake_api, github_fixtures):
+    parser = GitHubParser("token", url=fake_api.url)
+    parser.per_page = 5
+    repos = parser.iter_repos("user0")
+    assert next(repos)["name"] == "repo0"
+    #  Следующая страница запрашивается только после того, как отдана текущая
+    assert fake_api.counters["listing"] == 1
+    assert [repo["name"] for repo in repos] == [repo["name"] for repo in github_fixtures.listing("user0")][1:]
+    assert fake_api.counters["listing"] == 3
+
+
+def test_stream_and_full_decoding_agree(fake_api, ijson_streaming, monkeypatch):
+    streamed_bodies = []
+
+    def stream(chunks):
+        contributors, nbytes = stream_contributors(chunks)
+        streamed_bodies.append(nbytes)
+        return contributors, nbytes
+
+    monkeypatch.setattr("src.functions.stream_contributors", stream)
+    decoded = collect(GitHubParser("token", url=fake_api.url, stream_json=False))
+    assert streamed_bodies == []
+    streamed = GitHubParser("token", url=fake_api.url, stream_json=True)
+    assert collect(streamed) == decoded
+    assert len(streamed_bodies) == len(decoded)
+
+
+def test_retry_deadline_is_counted_per_repo():
+    """Регрессия: после retry_deadline от начала обхода репозитории с 202 отбрасывались без повтора."""
+    fixtures = GitHubFixtures(users=1, repos=24, contributors=1, weeks=5, seed=2)
+    with FakeGitHubAPI(fixtures, latency=0.05, accepted_every=1) as api:
+        parser = GitHubParser("token", url=api.url, max_workers=4, retry_deadline=1.0)
+        assert len(collect(parser)) == fixtures.repos
+        assert parser.unresolved_repos == []
+        assert api.counters["accepted"] == fixtures.repos
+
+
+def test_accepted_repos_are_retried(fake_api, github_fixtures):
+    fake_api.accepted_every = 4
+    parser = GitHubParser("token", url=fake_api.url, max_workers=4, retry_deadline=30)
+    assert len(collect(parser)) == github_fixtures.repos
+    assert fake_api.counters["accepted"] == 3
+    assert counter(parser, "github_accepted_total") == 3
+
+
+def test_conditional_requests_reuse_cached_bodies(fake_api, github_fixtures, tmp_path):
+    first = collect(GitHubParser("token", url=fake_api.url, cache_dir=tmp_path))
+    assert fake_api.counters["not_modified"] == 0
+
+    parser = GitHubParser("token", url=fake_api.url, cache_dir=tmp_path)
+    assert collect(parser) == first
+    assert fake_api.counters["not_modified"] == github_fixtures.repos
+    assert parser.cache.stats["hits"] == github_fixtures.repos
+
+
+def test_graphql_listing_skips_empty_repos(fake_api, github_fixtures):
+    parser = GitHubParser("token", url=fake_api.url, graphql=True)
+    parser.graphql_page_size = 5
+
+    repos = list(parser.iter_repos("user0"))
+    assert [repo["name"] for repo in repos] == [repo["name"] for repo in github_fixtures.listing("user0")]
+    assert fake_api.counters["graphql"] == 3
+    empty = {repo["name"] for repo in repos if repo["is_empty"]}
+    assert empty == {"repo0", "repo5", "repo10"}
+    assert all(repo["default_branch_commits"] for repo in repos if repo["name"] not in empty)
+
+    results = collect(parser)
+    assert len(results) == github_fixtures.repos
+    assert all(results[name] == [] for name in empty)
+    assert fake_api.counters["stats"] == github_fixtures.repos - len(empty)
+    assert counter(parser, "github_stats_skipped_total") == len(empty)
+    assert counter(parser, "github_graphql_cost_total") == 6
+
+
+def test_graphql_unknown_owner_raises(fake_api):
+    parser = GitHubParser("token", url=fake_api.url, graphql=True)
+    with pytest.raises(requests.HTTPError, match="Could not resolve"):
+        list(parser.iter_repos("nobody"))
+
+
+def make_response(status: int, headers: dict[str, str], text: str = "") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = text.encode()
+    response.encoding = "utf-8"
+    return response
+
+
+def test_check_rate_limit_delays():
+    parser = GitHubParser("token", url="http://127.0.0.1:9")
+    with pytest.raises(RetryLater) as error:
+        parser._check_rate_limit(make_response(429, {"Retry-After": "7"}))
+    assert error.value.delay == 7.0
+
+    #  Основной лимит исчерпан - ждем сброса окна
+    parser.tokens.update("token", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "9999999999"})
+    with pytest.raises(RetryLater) as error:
+        parser._check_rate_limit(make_response(403, {"X-RateLimit-Remaining": "0"}))
+    assert error.value.delay > 3600
+
+    #  Обычный 403 (нет доступа) не считается лимитом
+    parser._check_rate_limit(make_response(403, {"X-RateLimit-Remaining": "4000"}, "Resource not accessible"))
+
+
+def test_secondary_rate_limit_without_retry_after_is_not_retried_immediately(stub_server):
+    """Регрессия: wait_time() равен 0, пока остаток не исчерпан, и 403 повторялся без паузы."""
+    server = stub_server(lambda method, path, body: (403, {"X-RateLimit-Remaining": "4000"}, SECONDARY_LIMIT))
+    parser = GitHubParser("token", url=server.url, retry_deadline=5)
+
+    with pytest.raises(RetryLater) as error:
+        parser._check_rate_limit(parser._get(f"{server.url}/repos/owner/repo/stats/contributors"))
+    assert error.value.delay == GitHubParser.secondary_rate_limit_delay
+
+    server.calls.clear()
+    assert list(parser.iter_repo_data("owner", [{"name": "repo"}])) == []
+    #  Пауза в 60 с не укладывается в дедлайн: репозиторий откладывается до следующего запуска
+    assert len(server.calls) == 1
+    assert parser.unresolved_repos == [("owner", "repo")]
+
+
+@pytest.mark.parametrize("status, body", [(500, b"{}"), (404, b"{}"), (409, b"{}"), (200, b"")])
+def test_failed_stats_fetch_is_unresolved_not_empty(stub_server, status, body):
+    """Регрессия: ошибки API превращались в пустую статистику, и репозиторий считался синхронизированным."""
+    def handler(method, path, request_body):
+        if "/broken/" in path:
+            return status, {}, body
+        return 200, {}, []
+
+    server = stub_server(handler)
+    parser = GitHubParser("token", url=server.url)
+    repos = [{"name": "good"}, {"name": "broken"}]
+    results = {repo["name"]: stats for repo, stats, _ in parser.iter_repo_data("owner", repos)}
+
+    assert list(results) == ["good"]
+    assert parser.unresolved_repos == [("owner", "broken")]
+    assert counter(parser, "github_fetch_errors_total") == 1
+
+
+def test_no_content_stats_are_empty(stub_server):
+    server = stub_server(lambda method, path, body: (204, {}, b""))
+    parser = GitHubParser("token", url=server.url)
+    results = list(parser.iter_repo_data("owner", [{"name": "empty"}]))
+    assert [(repo["name"], len(stats)) for repo, stats, _ in results] == [("empty", 0)]
+    assert parser.unresolved_repos == []
+
+
+def make_parked_head_fetch(retries: int):
+    """fetch, у которого первый репозиторий retries раз отвечает RetryLater, а остальные - сразу."""
+    started = []
+    lock = threading.Lock()
+    parked = []
+
+    def fetch(username, repo_name, fetch_stats=True):
+        with lock:
+            if repo_name == "repo0" and len(parked) < retries:
+                parked.append(repo_name)
+                raise RetryLater("статистика еще вычисляется", 0.05)
+            started.append(repo_name)
+        return repo_name
+
+    return fetch, started
+
+
+def test_ordered_results_buffer_is_bounded():
+    """Регрессия: отложенный первый репозиторий заставлял буферизовать весь аккаунт."""
+    parser = GitHubParser("token", url="http://127.0.0.1:9", max_workers=2)
+    fetch, started = make_parked_head_fetch(retries=3)
+    repos = [{"name": f"repo{index}"} for index in range(50)]
+
+    results = parser._iter_repo_results("owner", fetch, repos)
+    assert next(results) == (repos[0], "repo0")
+    assert len(started) <= 2 * parser.max_workers
+    assert [repo["name"] for repo, _ in results] == [f"repo{index}" for index in range(1, 50)]
+
+
+def test_unordered_results_do_not_wait_for_parked_repo():
+    parser = GitHubParser("token", url="http://127.0.0.1:9", max_workers=2)
+    fetch, _ = make_parked_head_fetch(retries=3)
+    repos = [{"name": f"repo{index}"} for index in range(50)]
+
+    names = [repo["name"] for repo, _ in parser._iter_repo_results("owner", fetch, repos, ordered=False)]
+    assert names[0] != "repo0"
+    assert sorted(names) == sorted(repo["name"] for repo in repos)
+
+
+def graphql_rate_limited(method, path, body):
+    return 200, {"X-RateLimit-Remaining": "4000"}, {
+        "data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}],
+    }
+
+
+def test_graphql_rate_limit_backs_off_and_gives_up(stub_server, no_sleep, monkeypatch):
+    """Регрессия: RATE_LIMITED при ненулевом остатке повторялся без паузы и без ограничения."""
+    #  Джиттер отключен: задержка равна верхней границе
+    monkeypatch.setattr("src.scheduler.random.uniform", lambda low, high: high)
+    server = stub_server(graphql_rate_limited)
+    parser = GitHubParser("token", url=server.url, graphql=True)
+
+    with pytest.raises(requests.HTTPError, match="попытки повтора исчерпаны"):
+        list(parser.iter_repos("owner"))
+    assert len(server.calls) == GitHubParser.graphql_max_attempts
+    assert len(no_sleep) == GitHubParser.graphql_max_attempts - 1
+    assert no_sleep == [pytest.approx(delay, abs=0.1) for delay in (1.0, 2.0, 4.0, 8.0)]
+
+
+def test_graphql_primary_limit_waits_for_graphql_pool_reset(stub_server, no_sleep):
+    """Регрессия: задержка бралась из пула REST (0 с), а ожидание сброса в acquire() не ограничивалось."""
+    reset = str(int(time.time()) + 3600)
+    server = stub_server(lambda method, path, body: (
+        403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}, {"message": "API rate limit exceeded"}
+    ))
+    parser = GitHubParser("token", url=server.url, graphql=True, retry_deadline=600)
+
+    with pytest.raises(requests.HTTPError, match="попытки повтора исчерпаны"):
+        list(parser.iter_repos("owner"))
+    #  До сброса лимита дольше дедлайна: без повторов и без ожидания
+    assert len(server.calls) == 1
+    assert no_sleep == []
+
+    #  Пул GraphQL исчерпан заранее - запрос не отправляется и не блокируется до сброса
+    server.calls.clear()
+    with pytest.raises(requests.HTTPError, match="попытки повтора исчерпаны"):
+        list(parser.iter_repos("owner"))
+    assert server.calls == []
+    assert no_sleep == []
+
+
+def test_graphql_honours_retry_after(stub_server, no_sleep, fake_api):
+    responses = iter([(403, {"Retry-After": "7", "X-RateLimit-Remaining": "4000"}, SECONDARY_LIMIT)])
+
+    def handler(method, path, body):
+        #  Второй запрос проксируется в имитатор API
+        response = next(responses, None)
+        if response is not None:
+            return response
+        answer = requests.post(f"{fake_api.url}/graphql", data=body)
+        return answer.status_code, {}, answer.content
+
+    server = stub_server(handler)
+    parser = GitHubParser("token", url=server.url, graphql=True)
+    assert len(list(parser.iter_repos("user0"))) == 12
+    assert no_sleep == [pytest.approx(7.0, abs=0.1)]
+
+
+def test_fake_api_rate_limit_with_retry_after(github_fixtures):
+    with FakeGitHubAPI(github_fixtures, rate_limit_every=5, retry_after=0.05) as api:
+        parser = GitHubParser("token", url=api.url, max_workers=3, retry_deadline=30)
+        assert len(collect(parser)) == github_fixtures.repos
+        assert api.counters["rate_limited"] >= 1
+        assert counter(parser, "github_rate_limited_total") == api.counters["rate_limited"]
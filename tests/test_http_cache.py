@@ -0,0 +1,55 @@
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.http_cache import ResponseCache
+
+
+def make_response(body: bytes, etag: str | None = '"v1"', status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict({"ETag": etag} if etag else {})
+    response._content = body
+    return response
+
+
+def test_response_cache_round_trip_and_conditional_headers(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("https://api/a", make_response(b"[1]"))
+    entry = cache.get("https://api/a")
+    assert entry["body"] == b"[1]"
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    assert cache.to_response("https://api/a", entry).json() == [1]
+
+
+def test_response_cache_skips_uncacheable_responses(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("https://api/no-validators", make_response(b"[]", etag=None))
+    cache.put("https://api/accepted", make_response(b"", status=202))
+    assert cache.get("https://api/no-validators") is None
+    assert cache.get("https://api/accepted") is None
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=25)
+    cache.put("https://api/a", make_response(b"a" * 10))
+    cache.put("https://api/b", make_response(b"b" * 10))
+    #  Обращение к a делает самой старой запись b
+    assert cache.get("https://api/a") is not None
+    cache.put("https://api/c", make_response(b"c" * 10))
+
+    assert cache.get("https://api/b") is None
+    assert cache.get("https://api/a") is not None
+    assert cache.get("https://api/c") is not None
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["bytes"] == 20
+
+
+def test_response_cache_expires_by_age_and_survives_restart(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("https://api/a", make_response(b"[]"))
+    #  Индекс восстанавливается из файлов на диске
+    assert ResponseCache(tmp_path).get("https://api/a") is not None
+    assert ResponseCache(tmp_path, max_age=0).get("https://api/a") is None
+    assert ResponseCache(tmp_path).stats["entries"] == 0
@@ -0,0 +1,50 @@
+import json
+
+from src import json_stream
+from src.json_stream import ContributorPayload, _ChunksReader, decode_contributors, stream_contributors
+from tests.test_records import CONTRIBUTORS
+
+
+def test_contributor_payload_from_dict_keeps_columns():
+    payload = ContributorPayload.from_dict(CONTRIBUTORS[0])
+    assert payload.login == "alice"
+    assert payload.total == 3
+    assert len(payload) == 3
+    assert payload.first_week() == (100, 5, 1, 2)
+
+    series = payload.series("repo", "url", "alice")
+    #  Пустая неделя 200 пропускается
+    assert list(series.timestamps) == [100, 300]
+    assert list(series.additions) == [5, 7]
+    assert len(payload.series("repo", "url", "alice", skip_empty=False)) == 3
+
+
+def test_decode_and_stream_contributors_agree(ijson_streaming):
+    body = json.dumps(CONTRIBUTORS).encode()
+    decoded = decode_contributors(body)
+    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+    streamed, nbytes = stream_contributors(chunks)
+
+    assert nbytes == len(body)
+    #  Элемент без author пропускается, удаленный автор (None) сохраняется
+    assert [payload.login for payload in decoded] == ["alice", None, "bob"]
+    assert [(p.login, p.total, list(p.timestamps)) for p in streamed] == \
+           [(p.login, p.total, list(p.timestamps)) for p in decoded]
+
+
+def test_stream_contributors_without_ijson_decodes_whole_body(monkeypatch):
+    monkeypatch.setattr(json_stream, "ijson", None)
+    body = json.dumps(CONTRIBUTORS).encode()
+    contributors, nbytes = stream_contributors([body[:10], body[10:]])
+    assert nbytes == len(body)
+    assert [payload.login for payload in contributors] == ["alice", None, "bob"]
+
+
+def test_chunks_reader_reads_across_chunk_boundaries():
+    reader = _ChunksReader([b"abc", b"", b"defg", b"h"])
+    assert reader.read(2) == b"ab"
+    assert reader.read(4) == b"cdef"
+    assert reader.nbytes == 7
+    assert reader.read() == b"gh"
+    assert reader.read(5) == b""
+    assert reader.nbytes == 8
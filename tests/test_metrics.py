@@ -0,0 +1,49 @@
+import json
+
+from src.metrics import Metrics
+
+
+def test_counters_and_histograms_by_labels():
+    metrics = Metrics()
+    metrics.inc("github_requests_total", endpoint="stats", status=200)
+    metrics.inc("github_requests_total", 2, endpoint="stats", status=202)
+    metrics.observe("db_write_seconds", 0.02, table="contributors")
+    metrics.observe("db_write_seconds", 3.0, table="contributors")
+
+    assert metrics.counter("github_requests_total") == 3
+    assert metrics.counter("github_requests_total", endpoint="stats", status=202) == 2
+    assert metrics.histogram("db_write_seconds") == {"count": 2, "sum": 3.02}
+
+    snapshot = json.loads(metrics.to_json())
+    assert snapshot["counters"]["github_requests_total"][0] == \
+           {"labels": {"endpoint": "stats", "status": "200"}, "value": 1}
+    histogram = snapshot["histograms"]["db_write_seconds"][0]
+    assert (histogram["min"], histogram["max"], histogram["avg"]) == (0.02, 3.0, 1.51)
+
+
+def test_timer_records_duration():
+    metrics = Metrics()
+    with metrics.timer("stage_seconds", stage="parse"):
+        pass
+    assert metrics.histogram("stage_seconds", stage="parse")["count"] == 1
+    assert metrics.histogram("stage_seconds", stage="write")["count"] == 0
+
+
+def test_prometheus_format(tmp_path):
+    metrics = Metrics()
+    metrics.inc("github_requests_total", status='a"b')
+    metrics.set("queue_size", 4)
+    metrics.observe("db_write_seconds", 0.02)
+
+    text = metrics.to_prometheus()
+    assert '# TYPE github_requests_total counter\ngithub_requests_total{status="a\\"b"} 1' in text
+    assert "queue_size 4" in text
+    assert 'db_write_seconds_bucket{le="0.01"} 0' in text
+    assert 'db_write_seconds_bucket{le="0.025"} 1' in text
+    assert 'db_write_seconds_bucket{le="+Inf"} 1' in text
+    assert "db_write_seconds_count 1" in text
+
+    metrics.write(tmp_path / "metrics.prom")
+    assert (tmp_path / "metrics.prom").read_text(encoding="utf-8") == text
+    metrics.reset()
+    assert metrics.counter("github_requests_total") == 0
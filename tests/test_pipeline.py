@@ -0,0 +1,40 @@
+from src.functions import GitHubParser
+from src.pipeline import CrawlPipeline, trim_synced_weeks
+from src.series import ContributorWeeks
+
+
+def make_series(timestamps: list[int]) -> ContributorWeeks:
+    series = ContributorWeeks("repo", "url", "alice")
+    for timestamp in timestamps:
+        series.append(timestamp, 1, 1, 1)
+    return series
+
+
+def test_trim_synced_weeks_keeps_last_written_week():
+    state = {"owner/repo": {"pushed_at": "x", "last_week": 200}}
+    weeks, last_week = trim_synced_weeks(state, "owner/repo", [make_series([100, 200, 300]), make_series([100])])
+    #  Неделя 200 могла дополниться - она перезаписывается вместе с новыми
+    assert [list(series.timestamps) for series in weeks] == [[200, 300], []]
+    assert last_week == 300
+
+
+def test_trim_synced_weeks_without_state_and_without_new_weeks():
+    weeks, last_week = trim_synced_weeks({}, "owner/repo", [make_series([100, 200])])
+    assert list(weeks[0].timestamps) == [100, 200]
+    assert last_week == 200
+
+    state = {"owner/repo": {"last_week": 500}}
+    weeks, last_week = trim_synced_weeks(state, "owner/repo", [make_series([100, 200])])
+    assert len(weeks[0]) == 0
+    assert last_week == 500
+
+
+def test_pipeline_batches_and_reports_written_repos(fake_api, github_fixtures, sqlite_db):
+    parser = GitHubParser("token", url=fake_api.url, max_workers=3)
+    written = []
+    stats = CrawlPipeline(parser, sqlite_db, queue_size=2, batch_rows=10).run(
+        [("user0", None)], on_written=lambda username, repo: written.append(repo["name"])
+    )
+    assert stats["repos"] == github_fixtures.repos
+    assert stats["batches"] > 1
+    assert sorted(written) == sorted(repo["name"] for repo in github_fixtures.listing("user0"))
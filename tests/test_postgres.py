@@ -0,0 +1,273 @@
+import gzip
+import json
+import threading
+from datetime import datetime, timezone
+
+import psycopg2
+import pytest
+
+import main
+from src.functions import GitHubParser
+from src.postgres_db import PostgresDB
+from src.records import StatsBatch
+from src.series import ContributorWeeks
+from src.work_queue import PostgresWorkQueue
+from tests.conftest import TABLES
+from tests.test_crawl import FlakyGitHubAPI
+
+
+@pytest.fixture
+def postgres_db(postgres_params):
+    db = PostgresDB(postgres_params, pool_size=4)
+    for table in TABLES:
+        db.create_table(table)
+    yield db
+    db.drop_db(postgres_params["dbname"])
+    db.close()
+
+
+def make_batch(total_commits: int, repo_name: str = "repo0") -> StatsBatch:
+    batch = StatsBatch()
+    repo = batch.add_repo(repo_name, f"https://api/repos/owner/{repo_name}")
+    batch.append(repo, "alice", total_commits, 100, 5, 1, 2)
+    batch.append(repo, "bob", 1, 100, 1, 0, 1)
+    return batch
+
+
+def make_weeks(repo_name: str, timestamps: list[int]) -> list[ContributorWeeks]:
+    series = ContributorWeeks(repo_name, f"https://api/repos/owner/{repo_name}", "alice")
+    for timestamp in timestamps:
+        series.append(timestamp, 10, 1, 1)
+    return [series]
+
+
+def count(db: PostgresDB, table: str) -> int:
+    with db.transaction() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table};")
+        return cur.fetchone()[0]
+
+
+def queue_rows(db: PostgresDB) -> dict[str, tuple]:
+    with db.transaction() as cur:
+        cur.execute("SELECT username || '/' || repo_name, status, attempts FROM crawl_queue;")
+        return {name: (status, attempts) for name, status, attempts in cur.fetchall()}
+
+
+@pytest.mark.parametrize("method", ["copy", "values"])
+def test_bulk_insert_upserts_in_one_transaction(postgres_db, method):
+    postgres_db.bulk_insert(make_batch(3), make_weeks("repo0", [100, 200]), method=method,
+                            sync_state=[("owner/repo0", "2024-01-01", 200)])
+    postgres_db.bulk_insert(make_batch(10), make_weeks("repo0", [200, 300]), method=method)
+
+    assert count(postgres_db, "repos") == 1
+    assert count(postgres_db, "contributors") == 2
+    assert count(postgres_db, "contributor_weeks") == 3
+    rows = {row["contributor_name"]: row for row in postgres_db.get_data_from_table("contributors", 10)}
+    assert rows["alice"]["total_commits"] == 10
+    assert postgres_db.get_sync_state() == {"owner/repo0": {"pushed_at": "2024-01-01", "last_week": 200}}
+
+
+def test_bulk_insert_rolls_back_on_error(postgres_db):
+    weeks = make_weeks("repo0", [100])
+    weeks[0].repo_url = "https://api/repos/owner/unknown"
+    #  При COPY ошибка чтения строк приходит от сервера как QueryCanceled
+    with pytest.raises((ValueError, psycopg2.Error)):
+        postgres_db.bulk_insert(make_batch(3), weeks, sync_state=[("owner/repo0", "x", 100)])
+    assert count(postgres_db, "repos") == 0
+    assert postgres_db.get_sync_state() == {}
+
+
+def test_legacy_tables_get_unique_constraints(postgres_db):
+    """Регрессия: в БД прежней версии нет UNIQUE, и первый bulk_insert падал на ON CONFLICT."""
+    postgres_db.drop_table("contributors")
+    postgres_db.drop_table("contributor_weeks")
+    postgres_db.drop_table("repos")
+    with postgres_db.transaction() as cur:
+        #  Схема и данные версии, пересоздававшей БД при каждом запуске: репозиторий на каждую строку
+        cur.execute("""
+            CREATE TABLE repos (id SERIAL PRIMARY KEY, repo_name VARCHAR(225) NOT NULL, repo_url TEXT NOT NULL);
+            CREATE TABLE contributors(
+                id SERIAL PRIMARY KEY, contributor_name VARCHAR(100) NOT NULL, total_commits INTEGER NOT NULL,
+                weekly_timestamp INTEGER NOT NULL, weekly_lines_added INTEGER NOT NULL,
+                weekly_lines_deleted INTEGER NOT NULL, weekly_commit_count INTEGER NOT NULL,
+                repo_id INTEGER NOT NULL, FOREIGN KEY (repo_id) REFERENCES repos(id)
+            );
+            INSERT INTO repos (repo_name, repo_url) VALUES
+                ('repo0', 'https://api/repos/owner/repo0'), ('repo0', 'https://api/repos/owner/repo0'),
+                ('repo1', 'https://api/repos/owner/repo1');
+            INSERT INTO contributors (contributor_name, total_commits, weekly_timestamp, weekly_lines_added,
+                                      weekly_lines_deleted, weekly_commit_count, repo_id) VALUES
+                ('alice', 1, 100, 1, 0, 1, 1), ('bob', 2, 100, 1, 0, 1, 2), ('alice', 5, 100, 1, 0, 1, 2),
+                ('carol', 3, 100, 1, 0, 1, 3);
+        """)
+
+    for table in TABLES:
+        postgres_db.create_table(table)
+    assert count(postgres_db, "repos") == 2
+    rows = {(row["contributor_name"], row["repo_id"]): row["total_commits"]
+            for row in postgres_db.get_data_from_table("contributors", 10)}
+    assert rows == {("alice", 1): 5, ("bob", 1): 2, ("carol", 3): 3}
+
+    postgres_db.bulk_insert(make_batch(7))
+    assert count(postgres_db, "repos") == 2
+    assert count(postgres_db, "contributors") == 3
+    #  Повторный запуск не мигрирует таблицы снова
+    postgres_db.create_table("repos")
+    postgres_db.create_table("contributors")
+    assert count(postgres_db, "contributors") == 3
+
+
+def test_pool_serves_concurrent_writers(postgres_db):
+    errors = []
+
+    def write(index: int) -> None:
+        try:
+            for attempt in range(3):
+                postgres_db.bulk_insert(make_batch(attempt, f"repo{index}"))
+                postgres_db.get_data_from_table("repos", 100)
+        except Exception as e:
+            errors.append(e)
+
+    #  Потоков больше, чем соединений в пуле: лишние ждут освобождения соединения
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert count(postgres_db, "repos") == 8
+    assert count(postgres_db, "contributors") == 16
+
+
+@pytest.mark.parametrize("fmt, compress", [("json", False), ("ndjson", False), ("ndjson", True)])
+def test_export_data_to_json_streams_all_rows(postgres_db, tmp_path, monkeypatch, fmt, compress):
+    monkeypatch.chdir(tmp_path)
+    for index in range(5):
+        postgres_db.bulk_insert(make_batch(index, f"repo{index}"))
+    postgres_db.export_data_to_JSON("contributors", fmt=fmt, compress=compress, itersize=3)
+
+    path = tmp_path / "src" / "data" / (f"contributors.{fmt}" + (".gz" if compress else ""))
+    text = gzip.open(path, "rt", encoding="utf-8").read() if compress else path.read_text(encoding="utf-8")
+    rows = json.loads(text) if fmt == "json" else [json.loads(line) for line in text.splitlines()]
+    assert len(rows) == 10
+    assert set(rows[0]) == set(PostgresDB.contributor_columns)
+    assert not list(path.parent.glob("*.tmp"))
+    with pytest.raises(ValueError):
+        postgres_db.export_data_to_JSON("repo_sync_state")
+
+
+def test_read_paths_are_indexed(postgres_db):
+    with postgres_db.transaction() as cur:
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public';")
+        indexes = {name for (name,) in cur.fetchall()}
+    assert {"repos_repo_name_idx", "contributors_weekly_lines_added_idx",
+            "contributor_weeks_week_timestamp_idx"} <= indexes
+
+
+def test_week_partitions_by_year(postgres_params):
+    params = dict(postgres_params, dbname=f"{postgres_params['dbname']}_partitioned")
+    db = PostgresDB(params, partition_weeks=True)
+    try:
+        for table in TABLES:
+            db.create_table(table)
+        timestamps = [int(datetime(year, 6, 1, tzinfo=timezone.utc).timestamp()) for year in (2015, 2016, 2024)]
+        db.bulk_insert(make_batch(3), make_weeks("repo0", timestamps))
+        with db.transaction() as cur:
+            cur.execute("SELECT COUNT(*) FROM contributor_weeks_y2016;")
+            assert cur.fetchone()[0] == 1
+
+        assert db.detach_week_partitions(2016)[-1] == "contributor_weeks_y2015"
+        assert len(db.detach_week_partitions(2016)) == 0
+        assert count(db, "contributor_weeks") == 2
+    finally:
+        db.drop_db(params["dbname"])
+        db.close()
+
+
+def test_materialized_views_refresh_once_and_are_detected(postgres_db, postgres_params):
+    """Регрессия: представления пересчитывались при каждой записи и не находились после перезапуска."""
+    assert not postgres_db.materialized_views
+    postgres_db.create_materialized_views()
+    postgres_db.bulk_insert(make_batch(3))
+    #  Запись не пересчитывает представления
+    assert postgres_db.get_repo_totals() == []
+
+    postgres_db.refresh_materialized_views()
+    assert postgres_db.get_repo_totals()[0]["total_commits"] == 3 + 1
+
+    reopened = PostgresDB(postgres_params, incremental=True)
+    try:
+        assert reopened.materialized_views
+        reopened.bulk_insert(make_batch(7))
+        assert reopened.get_repo_totals()[0]["total_commits"] == 3 + 1
+        reopened.refresh_materialized_views()
+        assert reopened.get_repo_totals()[0]["total_commits"] == 7 + 1
+    finally:
+        reopened.close()
+
+
+def test_enqueue_counts_inserted_and_requeued_repos(postgres_db):
+    """Регрессия: enqueue возвращал размер входного списка, а не число поставленных в очередь."""
+    queue = PostgresWorkQueue(postgres_db, worker_id="w1")
+    queue.create_table()
+    repos = [{"name": f"repo{index}", "pushed_at": "a"} for index in range(5)]
+    assert queue.enqueue("alice", repos) == 5
+    assert queue.enqueue("alice", repos) == 0
+
+    for item in queue.claim(2):
+        queue.complete(item["username"], item["name"])
+    #  Обработанные и не изменившиеся репозитории в очередь не возвращаются
+    assert queue.enqueue("alice", repos) == 0
+    changed = [{"name": "repo0", "pushed_at": "b"}, {"name": "repo0", "pushed_at": "b"}, {"name": "new"}]
+    assert queue.enqueue("alice", changed) == 2
+    assert queue.enqueue("alice", []) == 0
+
+
+def test_local_workers_process_each_repo_once(postgres_db, fake_api, github_fixtures):
+    queue = PostgresWorkQueue(postgres_db)
+    queue.create_table()
+    for username in github_fixtures.usernames:
+        assert queue.enqueue(username, github_fixtures.listing(username)) == github_fixtures.repos
+
+    completed = []
+    lock = threading.Lock()
+
+    def work(worker_id: str) -> None:
+        worker_queue = PostgresWorkQueue(postgres_db, worker_id=worker_id)
+        complete = worker_queue.complete
+
+        def record(username: str, repo_name: str) -> None:
+            with lock:
+                completed.append((worker_id, f"{username}/{repo_name}"))
+            complete(username, repo_name)
+
+        worker_queue.complete = record
+        parser = GitHubParser("token", url=fake_api.url, max_workers=2)
+        main.run_worker(parser, postgres_db, worker_queue, batch_size=3, poll=0)
+
+    workers = [threading.Thread(target=work, args=(f"worker{index}",)) for index in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    total = len(github_fixtures.usernames) * github_fixtures.repos
+    names = [name for _, name in completed]
+    assert len(names) == len(set(names)) == total
+    assert set(queue_rows(postgres_db).values()) == {("done", 1)}
+    assert len(postgres_db.get_sync_state()) == total
+
+
+def test_worker_requeues_repo_whose_stats_fetch_failed(postgres_db, github_fixtures):
+    """Регрессия: ошибка API записывалась как пустая статистика, и репозиторий отмечался done."""
+    queue = PostgresWorkQueue(postgres_db, worker_id="w1")
+    queue.create_table()
+    queue.enqueue("user0", github_fixtures.listing("user0"))
+
+    with FlakyGitHubAPI(github_fixtures, broken=("repo3",)) as api:
+        main.run_worker(GitHubParser("token", url=api.url), postgres_db, queue, batch_size=5, poll=0)
+
+    rows = queue_rows(postgres_db)
+    assert rows.pop("user0/repo3")[0] == "failed"
+    assert set(rows.values()) == {("done", 1)}
+    assert "user0/repo3" not in postgres_db.get_sync_state()
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from src.rate_limit import TokenPool
+from src.scheduler import RetryLater
+
+
+def test_token_pool_prefers_token_with_most_remaining():
+    pool = TokenPool(["first", "second"])
+    reset = str(int(time.time()) + 3600)
+    pool.update("first", {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": reset})
+    pool.update("second", {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": reset})
+    assert pool.acquire() == "second"
+    assert pool.wait_time() == 0.0
+
+
+def test_token_pool_keeps_smaller_remaining_within_window():
+    pool = TokenPool(["token"])
+    reset = str(int(time.time()) + 3600)
+    pool.update("token", {"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": reset})
+    #  Ответ более раннего запроса пришел позже - остаток не увеличивается
+    pool.update("token", {"X-RateLimit-Remaining": "150", "X-RateLimit-Reset": reset})
+    assert pool.stats["...oken"]["remaining"] == 100
+
+
+def test_token_pool_exhausted_waits_until_reset():
+    pool = TokenPool(["token"])
+    pool.update("token", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 30)})
+    assert 25 < pool.wait_time() <= 30
+    with pytest.raises(RetryLater) as error:
+        pool.acquire(block=False)
+    assert 25 < error.value.delay <= 30
+
+
+def test_token_pool_restores_budget_after_reset():
+    pool = TokenPool(["token"])
+    pool.update("token", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) - 1)})
+    assert pool.wait_time() == 0.0
+    assert pool.acquire(block=False) == "token"
+
+
+def test_token_pool_paces_requests_below_reserve():
+    pool = TokenPool(["token"], reserve=100)
+    pool.update("token", {"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": str(time.time() + 1.5)})
+    started = time.monotonic()
+    for _ in range(3):
+        pool.acquire()
+    #  Три оставшихся запроса распределяются по времени до сброса (слоты через 0.5 с), а не уходят залпом
+    assert time.monotonic() - started >= 0.9
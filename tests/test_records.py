@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from src.functions import GitHubParser
+from src.json_stream import decode_contributors
+from src.records import StatsBatch
+
+CONTRIBUTORS = [
+    {"author": {"login": "alice"}, "total": 3,
+     "weeks": [{"w": 100, "a": 5, "d": 1, "c": 2}, {"w": 200, "a": 0, "d": 0, "c": 0},
+               {"w": 300, "a": 7, "d": 2, "c": 1}]},
+    {"author": None, "total": 1, "weeks": [{"w": 100, "a": 1, "d": 0, "c": 1}]},
+    {"total": 9, "weeks": []},
+    {"author": {"login": "bob"}, "total": 0, "weeks": []},
+]
+
+
+def test_parse_contributors_round_trip_through_stats_batch():
+    parser = GitHubParser("token", url="https://api.example")
+    contributors = decode_contributors(json.dumps(CONTRIBUTORS).encode())
+    batch, weeks = parser.parse_contributors("owner", "repo", contributors)
+
+    url = "https://api.example/repos/owner/repo/stats/contributors"
+    assert batch.to_dicts() == [
+        {"repo_name": "repo", "repo_url": url, "contributor_name": "alice", "total_commits": 3,
+         "weekly_timestamp": 100, "weekly_lines_added": 5, "weekly_lines_deleted": 1, "weekly_commit_count": 2},
+        {"repo_name": "repo", "repo_url": url, "contributor_name": "Unknown contributor", "total_commits": 1,
+         "weekly_timestamp": 100, "weekly_lines_added": 1, "weekly_lines_deleted": 0, "weekly_commit_count": 1},
+    ]
+    assert [series.contributor_name for series in weeks] == ["alice", "Unknown contributor"]
+
+    #  Разбор словарей в формате GitHub дает тот же пакет
+    same_batch, _ = parser.parse_contributors("owner", "repo", CONTRIBUTORS)
+    assert same_batch.to_dicts() == batch.to_dicts()
+    assert StatsBatch.from_dicts(batch.to_dicts()).to_dicts() == batch.to_dicts()
+    parser.close()
+
+
+def test_stats_batch_stores_repo_once_and_maps_ids():
+    first, second = StatsBatch(), StatsBatch()
+    repo = first.add_repo("a", "url-a")
+    first.append(repo, "alice", 1, 100, 1, 0, 1)
+    first.append(repo, "bob", 2, 100, 2, 0, 1)
+    second.append(second.add_repo("b", "url-b"), "alice", 3, 200, 3, 1, 1)
+    second.append(second.add_repo("a", "url-a"), "carol", 4, 200, 4, 1, 1)
+
+    batch = StatsBatch.concat([first, second])
+    assert len(batch) == 4
+    assert [repo.repo_url for repo in batch.repos] == ["url-a", "url-b"]
+    assert [row[-1] for row in batch.rows({"url-a": 10, "url-b": 20})] == [10, 10, 20, 10]
+    with pytest.raises(ValueError):
+        list(batch.rows({"url-a": 10}))
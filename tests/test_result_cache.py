@@ -0,0 +1,53 @@
+import time
+
+from src.result_cache import ResultCache
+
+
+def test_result_cache_hits_until_table_invalidated():
+    cache = ResultCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return [{"repo_name": "a"}]
+
+    assert cache.get_or_load("repos", ("repos", 1), load) == ([{"repo_name": "a"}], False)
+    assert cache.get_or_load("repos", ("repos", 1), load)[1] is True
+    cache.invalidate("contributors")
+    assert cache.get_or_load("repos", ("repos", 1), load)[1] is True
+    cache.invalidate("repos")
+    assert cache.get_or_load("repos", ("repos", 1), load)[1] is False
+    assert len(loads) == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_result_cache_ttl_and_lru_limits():
+    cache = ResultCache(ttl=0.05, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_load("repos", key, lambda: [key])
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get_or_load("repos", "c", lambda: ["c"])[1] is False
+    assert cache.stats()["expired"] == 1
+
+
+def test_result_cache_drops_results_changed_during_load():
+    cache = ResultCache()
+
+    def load():
+        #  Запись в таблицу во время чтения: результат не должен отдаваться из кэша
+        cache.invalidate("repos")
+        return ["stale"]
+
+    cache.get_or_load("repos", "key", load)
+    assert cache.get_or_load("repos", "key", lambda: ["fresh"]) == (["fresh"], False)
+
+
+def test_result_cache_disabled_with_zero_ttl():
+    cache = ResultCache(ttl=0)
+    assert not cache.enabled
+    cache.get_or_load("repos", "key", lambda: [1])
+    assert cache.get_or_load("repos", "key", lambda: [2]) == ([2], False)
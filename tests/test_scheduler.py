@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from src.scheduler import RetryLater, RetryScheduler
+
+
+def test_retry_scheduler_exponential_backoff(monkeypatch):
+    bounds = []
+    monkeypatch.setattr("src.scheduler.random.uniform", lambda low, high: bounds.append((low, high)) or high)
+    scheduler = RetryScheduler(base_delay=1.0, max_delay=4.0, deadline=600.0)
+    for _ in range(5):
+        assert scheduler.park("repo", "repo")
+    #  Задержка удваивается до max_delay, джиттер выбирается из [d/2, d]
+    assert bounds == [(0.5, 1.0), (1.0, 2.0), (2.0, 4.0), (2.0, 4.0), (2.0, 4.0)]
+    assert scheduler.attempts("repo") == 5
+
+
+def test_retry_scheduler_jitter_within_bounds():
+    scheduler = RetryScheduler(base_delay=1.0)
+    scheduler.park("repo", "repo")
+    assert 0.45 <= scheduler.next_delay() <= 1.0
+
+
+def test_retry_scheduler_pop_ready_in_time_order():
+    scheduler = RetryScheduler()
+    scheduler.park("slow", "slow", 0.2)
+    scheduler.park("fast", "fast", 0.0)
+    assert scheduler.pop_ready() == ["fast"]
+    assert len(scheduler) == 1
+    assert 0 < scheduler.next_delay() <= 0.2
+    time.sleep(0.25)
+    assert scheduler.pop_ready() == ["slow"]
+    assert scheduler.next_delay() is None
+
+
+def test_retry_scheduler_refuses_retry_after_deadline():
+    scheduler = RetryScheduler(deadline=1.0)
+    assert scheduler.park("a", "a", 0.5)
+    assert not scheduler.park("b", "b", 5.0)
+    assert len(scheduler) == 1
+
+
+def test_retry_scheduler_deadline_counts_from_first_park_of_each_key(no_sleep):
+    """Регрессия: дедлайн отсчитывался от создания планировщика, и поздние репозитории не повторялись ни разу."""
+    scheduler = RetryScheduler(deadline=10.0)
+    assert scheduler.park("a", "a", 1.0)
+    time.sleep(20.0)
+    #  Первый 202 у "b" пришел через 20 с после создания - повтор все равно планируется
+    assert scheduler.park("b", "b", 1.0)
+    assert scheduler.pop_ready() == ["a"]
+    #  У "a" дедлайн истек: 10 с от первого откладывания
+    assert not scheduler.park("a", "a", 1.0)
+    time.sleep(5.0)
+    assert scheduler.park("b", "b", 4.0)
+    assert not scheduler.park("b", "b", 6.0)
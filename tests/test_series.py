@@ -0,0 +1,26 @@
+from src.series import ContributorWeeks
+
+WEEKS = [
+    {"w": 100, "a": 5, "d": 1, "c": 2},
+    {"w": 200, "a": 0, "d": 0, "c": 0},
+    {"w": 300, "a": 7, "d": 2, "c": 1},
+    {"w": 400, "a": 1, "d": 0, "c": 1},
+]
+
+
+def test_from_weeks_skips_empty_weeks():
+    series = ContributorWeeks.from_weeks("repo", "url", "alice", WEEKS)
+    assert list(series.timestamps) == [100, 300, 400]
+    assert list(series.additions) == [5, 7, 1]
+    assert series.nbytes == 4 * 8 * 3
+    assert len(ContributorWeeks.from_weeks("repo", "url", "alice", WEEKS, skip_empty=False)) == 4
+
+
+def test_since_and_rows():
+    series = ContributorWeeks.from_weeks("repo", "url", "alice", WEEKS)
+    tail = series.since(300)
+    assert list(tail.timestamps) == [300, 400]
+    assert list(tail.rows(7)) == [(7, "alice", 300, 7, 2, 1), (7, "alice", 400, 1, 0, 1)]
+    assert len(series.since(500)) == 0
+    #  Исходный ряд не меняется
+    assert len(series) == 3
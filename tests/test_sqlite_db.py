@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from src.columnar import ColumnarReader
+from src.records import StatsBatch
+from src.series import ContributorWeeks
+from src.sqlite_db import SQLiteDB
+
+
+def make_batch(total_commits: int = 3, repos: int = 1) -> StatsBatch:
+    batch = StatsBatch()
+    for index in range(repos):
+        repo = batch.add_repo(f"repo{index}", f"https://api/repos/owner/repo{index}")
+        batch.append(repo, "alice", total_commits, 100, 5, 1, 2)
+        batch.append(repo, "bob", 1, 200, 1, 0, 1)
+    return batch
+
+
+def make_weeks(additions: int = 5) -> list[ContributorWeeks]:
+    series = ContributorWeeks("repo0", "https://api/repos/owner/repo0", "alice")
+    series.append(100, additions, 1, 2)
+    series.append(200, 3, 0, 1)
+    return [series]
+
+
+def count(db: SQLiteDB, table: str) -> int:
+    with db.transaction() as cur:
+        return cur.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+
+
+def test_bulk_insert_upserts_rows(sqlite_db):
+    sqlite_db.bulk_insert(make_batch(), make_weeks(), sync_state=[("owner/repo0", "2024-01-01", 200)])
+    sqlite_db.bulk_insert(make_batch(total_commits=10), make_weeks(additions=50),
+                          sync_state=[("owner/repo0", "2024-02-01", None)])
+
+    assert count(sqlite_db, "repos") == 1
+    assert count(sqlite_db, "contributors") == 2
+    assert count(sqlite_db, "contributor_weeks") == 2
+    rows = {row["contributor_name"]: row for row in sqlite_db.get_data_from_table("contributors", 10)}
+    assert rows["alice"]["total_commits"] == 10
+    assert sqlite_db.get_weekly_churn(weeks=10)[0]["lines_added"] == 50
+    #  last_week=None не затирает записанную неделю
+    assert sqlite_db.get_sync_state() == {"owner/repo0": {"pushed_at": "2024-02-01", "last_week": 200}}
+
+
+def test_bulk_insert_handles_more_repos_than_sqlite_variables(sqlite_db):
+    sqlite_db.bulk_insert(make_batch(repos=SQLiteDB.max_variables + 50))
+    assert count(sqlite_db, "repos") == SQLiteDB.max_variables + 50
+    assert count(sqlite_db, "contributors") == 2 * (SQLiteDB.max_variables + 50)
+
+
+def test_insert_data_to_table_and_insert_weeks(sqlite_db):
+    batch = make_batch()
+    sqlite_db.insert_data_to_table(batch, "repos")
+    sqlite_db.insert_data_to_table(batch.to_dicts(), "contributors")
+    sqlite_db.insert_weeks(make_weeks())
+    assert sqlite_db.get_repo_id("repo0") == 1
+    assert count(sqlite_db, "contributors") == 2
+    assert count(sqlite_db, "contributor_weeks") == 2
+    with pytest.raises(ValueError):
+        sqlite_db.insert_data_to_table(batch, "unknown")
+    with pytest.raises(ValueError):
+        sqlite_db.get_repo_id("missing")
+
+
+def test_failed_transaction_is_rolled_back(sqlite_db):
+    weeks = make_weeks()
+    weeks[0].repo_url = "https://api/repos/owner/unknown"
+    with pytest.raises(ValueError):
+        #  Ряд ссылается на репозиторий не из пакета - вся транзакция откатывается
+        sqlite_db.bulk_insert(make_batch(), weeks, sync_state=[("owner/repo0", "x", 200)])
+    assert count(sqlite_db, "repos") == 0
+    assert sqlite_db.get_sync_state() == {}
+
+
+def test_get_data_from_table_cache_invalidated_by_writes(sqlite_db):
+    sqlite_db.bulk_insert(make_batch())
+    first = sqlite_db.get_data_from_table("repos", 10)
+    first[0]["repo_name"] = "changed by caller"
+    assert sqlite_db.get_data_from_table("repos", 10)[0]["repo_name"] == "repo0"
+    assert sqlite_db.result_cache.stats()["hits"] == 1
+
+    sqlite_db.bulk_insert(make_batch(repos=2))
+    assert len(sqlite_db.get_data_from_table("repos", 10)) == 2
+
+
+def test_analytics_queries(sqlite_db):
+    sqlite_db.bulk_insert(make_batch(repos=2), make_weeks())
+    totals = sqlite_db.get_repo_totals()
+    assert [(row["repo_name"], row["contributors"], row["total_commits"]) for row in totals] == \
+           [("repo0", 2, 4), ("repo1", 2, 4)]
+    top = sqlite_db.get_top_contributors(1)
+    assert top[0]["contributor_name"] == "alice"
+    assert top[0]["total_commits"] == 6
+
+
+def test_export_columnar_matches_table(sqlite_db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sqlite_db.bulk_insert(make_batch(repos=3))
+    path = sqlite_db.export_data_to_columnar("contributors", itersize=2)
+    with ColumnarReader(path) as reader:
+        assert len(reader) == 6
+        assert sorted(set(reader.strings("contributor_name"))) == ["alice", "bob"]
+        assert sum(reader["total_commits"]) == 3 * (3 + 1)
+
+
+def test_incremental_reopen_keeps_data(tmp_path):
+    path = tmp_path / "stat.db"
+    db = SQLiteDB(path)
+    db.create_table("repos")
+    db.create_table("contributors")
+    db.insert_data_to_table(make_batch(), "repos")
+    db.close()
+
+    db = SQLiteDB(path, incremental=True)
+    assert count(db, "repos") == 1
+    db.close()
+    db = SQLiteDB(path)
+    db.create_table("repos")
+    assert count(db, "repos") == 0
+    db.close()
+
+
+def test_sqlite_backend_does_not_need_psycopg2(tmp_path):
+    """Регрессия: SQLiteDB брал схему и код записи у PostgresDB и без psycopg2 не импортировался."""
+    script = textwrap.dedent("""
+        import sys
+        sys.modules["psycopg2"] = None
+        from src.sqlite_db import SQLiteDB
+        from tests.test_sqlite_db import make_batch, make_weeks
+        db = SQLiteDB(":memory:")
+        for table in ("repos", "contributors", "contributor_weeks", "repo_sync_state"):
+            db.create_table(table)
+        db.bulk_insert(make_batch(), make_weeks())
+        db.export_data_to_JSON("contributor_weeks", fmt="ndjson")
+        print(len(db.get_data_from_table("contributors", 10)), len(db.get_weekly_churn(window=2)))
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[1])})
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-2:] == ["2", "2"]
+    assert len((tmp_path / "src" / "data" / "contributor_weeks.ndjson").read_text().splitlines()) == 2